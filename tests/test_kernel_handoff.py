@@ -0,0 +1,120 @@
+"""
+Startup tests for `ensure_correct_kernel` (setup/utils/general_tools.py).
+
+The template's setup package is copied to a temporary project, and PYTHON in its .env
+points at a symlink to the running interpreter, so the handoff path is exercised without
+creating a second environment.
+"""
+import os
+import sys
+import site
+import shutil
+import pathlib
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import unittest
+
+TEMPLATE_DIR = pathlib.Path(__file__).resolve().parent.parent / "{{cookiecutter.repo_name}}"
+HANDOFF_MESSAGE = "Restarting with the correct Python kernel"
+MODULE = "utils.virenv_tools"
+
+# The handoff may cost one more start of the entry point, plus this much slack (seconds)
+HANDOFF_SLACK = 1.0
+
+
+@unittest.skipIf(platform.system().lower() == "windows", "the handoff test relies on os.execv and symlinks")
+class KernelHandoffTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._tmp = tempfile.TemporaryDirectory()
+        tmp_dir = pathlib.Path(cls._tmp.name)
+
+        cls.project = tmp_dir / "project"
+        shutil.copytree(TEMPLATE_DIR / "setup", cls.project / "setup", ignore=shutil.ignore_patterns("__pycache__", "*.egg-info"))
+        (cls.project / ".cookiecutter").write_text("PROGRAMMING_LANGUAGE=python\n", encoding="utf-8")
+
+        # Console script wrapper, as pip generates for [project.scripts]
+        cls.wrapper = cls.project / "virenv-tools"
+        cls.wrapper.write_text(f"import sys\nfrom {MODULE} import main\nsys.exit(main())\n", encoding="utf-8")
+
+        # Other interpreter paths that resolve to the running one
+        cls.kernel_dir = tmp_dir / "kernel" / "bin"
+        cls.kernel_dir.mkdir(parents=True)
+        cls.kernel = cls.kernel_dir / "python"
+        cls.versioned_kernel = cls.kernel_dir / f"python{sys.version_info[0]}.{sys.version_info[1]}"
+        os.symlink(sys.executable, cls.kernel)
+        os.symlink(sys.executable, cls.versioned_kernel)
+
+        # The symlinked interpreters do not see the site-packages of a virtual environment
+        cls.env = os.environ.copy()
+        cls.env.pop("SETUP_KERNEL_HANDOFF", None)
+        python_path = [str(cls.project / "setup")] + site.getsitepackages()
+        cls.env["PYTHONPATH"] = os.pathsep.join(python_path + ([cls.env["PYTHONPATH"]] if cls.env.get("PYTHONPATH") else []))
+
+        # Warm-up run so byte-compiling the copied package is not timed
+        cls.set_kernel(None)
+        cls.run_command([sys.executable, "-m", MODULE, "--help"])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._tmp.cleanup()
+
+    @classmethod
+    def set_kernel(cls, python_kernel):
+        with open(cls.project / ".env", "w", encoding="utf-8") as f:
+            if python_kernel:
+                f.write(f"PYTHON={python_kernel}\n")
+
+    @classmethod
+    def run_command(cls, command):
+        return subprocess.run(command, capture_output=True, text=True, env=cls.env, cwd=str(cls.project), timeout=120)
+
+    def assert_handoff(self, result):
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn(HANDOFF_MESSAGE, result.stdout)
+        self.assertNotIn("ImportError", result.stderr)
+        self.assertIn("usage:", result.stdout)
+
+    def median_runtime(self, command, repeat=3):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = self.run_command(command)
+            timings.append(time.perf_counter() - start)
+            self.assertEqual(result.returncode, 0, result.stderr)
+        return statistics.median(timings), result
+
+    def test_module_execution_is_handed_off_with_dash_m(self):
+        self.set_kernel(self.kernel)
+        self.assert_handoff(self.run_command([sys.executable, "-m", MODULE, "--help"]))
+
+    def test_console_script_is_handed_off(self):
+        self.set_kernel(self.kernel)
+        self.assert_handoff(self.run_command([sys.executable, str(self.wrapper), "--help"]))
+
+    def test_versioned_interpreter_name_matches_kernel_folder(self):
+        self.set_kernel(self.kernel_dir)
+        result = self.run_command([str(self.versioned_kernel), "-m", MODULE, "--help"])
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertNotIn(HANDOFF_MESSAGE, result.stdout)
+
+    def test_mismatched_kernel_startup_latency(self):
+        self.set_kernel(sys.executable)
+        matched, result = self.median_runtime([sys.executable, "-m", MODULE, "--help"])
+        self.assertNotIn(HANDOFF_MESSAGE, result.stdout)
+
+        self.set_kernel(self.kernel)
+        mismatched, result = self.median_runtime([sys.executable, "-m", MODULE, "--help"])
+        self.assert_handoff(result)
+
+        # os.execv replaces the process: one more start of the entry point, no parent kept waiting
+        self.assertLess(mismatched, 2 * matched + HANDOFF_SLACK,
+                        f"handoff took {mismatched:.3f}s against {matched:.3f}s without it")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -195,23 +195,25 @@ remote_backup = "{{cookiecutter.remote_backup}}"
 programming_language, authors, orcids = correct_format(programming_language, authors, orcids)
 programming_language, python_env_manager, r_env_manager, code_repo, remote_storage, conda_r_version, conda_python_version  = set_options(programming_language,version_control)
 
-# Set project info to .cookiecutter
-save_to_env(project_name,"PROJECT_NAME",".cookiecutter")
-save_to_env(repo_name,"REPO_NAME",".cookiecutter")
-save_to_env(project_description,"PROJECT_DESCRIPTION",".cookiecutter")
-save_to_env(version,"VERSION",".cookiecutter")
-save_to_env(authors,"AUTHORS",".cookiecutter")
-save_to_env(orcids,"ORCIDS",".cookiecutter")
-save_to_env(email,"EMAIL",".cookiecutter")
-save_to_env(code_license,"CODE_LICENSE",".cookiecutter")
-save_to_env(doc_license,"DOC_LICENSE",".cookiecutter")
-save_to_env(data_license,"DATA_LICENSE",".cookiecutter")
-save_to_env(programming_language,"PROGRAMMING_LANGUAGE",".cookiecutter")
-save_to_env(python_env_manager,"PYTHON_ENV_MANAGER",".cookiecutter")
-save_to_env(version_control,"VERSION_CONTROL",".cookiecutter")
-save_to_env(remote_backup,"REMOTE_BACKUP",".cookiecutter")
-save_to_env(remote_storage,"REMOTE_STORAGE",".cookiecutter")
-save_to_env(code_repo,"CODE_REPO",".cookiecutter")
+# Set project info to .cookiecutter (single write)
+save_dict_to_env({
+    "PROJECT_NAME": project_name,
+    "REPO_NAME": repo_name,
+    "PROJECT_DESCRIPTION": project_description,
+    "VERSION": version,
+    "AUTHORS": authors,
+    "ORCIDS": orcids,
+    "EMAIL": email,
+    "CODE_LICENSE": code_license,
+    "DOC_LICENSE": doc_license,
+    "DATA_LICENSE": data_license,
+    "PROGRAMMING_LANGUAGE": programming_language,
+    "PYTHON_ENV_MANAGER": python_env_manager,
+    "VERSION_CONTROL": version_control,
+    "REMOTE_BACKUP": remote_backup,
+    "REMOTE_STORAGE": remote_storage,
+    "CODE_REPO": code_repo,
+}, ".cookiecutter")
 
 # Set git user info
 git_user_info(version_control)
@@ -1,18 +1,57 @@
 # utils/__init__.py
-from .general_tools import *
-from .backup_tools import *
-from .repo_tools import *
-from .versioning_tools import *
-from .virenv_tools import *
-from .ci_tools import *
+"""
+Lazy package facade for the `setup` CLI tools.
 
-from .code_templates import *
-from .readme_templates import *
-from .readme_sections import *
-from .example_templates import *
-from .ci_tools import *
+Submodules are only imported when one of their attributes is first requested
+(PEP 562). Each console script in `setup/pyproject.toml` points directly at its
+own module (e.g. `utils.backup_tools:main`), so running a command only imports
+that module and the modules it imports itself.
+"""
+import importlib
 
-from .deic_storage_download import *
-from .get_dependencies import *
-from .install_dependencies import *
-from .set_dataset import *
\ No newline at end of file
+# Submodules in the order the old star-imports loaded them. Attribute lookups
+# are resolved against the first submodule that defines the name.
+_SUBMODULES = (
+    "general_tools",
+    "backup_tools",
+    "repo_tools",
+    "versioning_tools",
+    "virenv_tools",
+    "ci_tools",
+    "code_templates",
+    "readme_templates",
+    "readme_sections",
+    "example_templates",
+    "deic_storage_download",
+    "get_dependencies",
+    "install_dependencies",
+    "set_dataset",
+    "hash_tools",
+    "dataset_registry",
+    "watch_tools",
+    "file_stats",
+    "import_resolver",
+    "notebook_tools",
+    "static_dependencies",
+    "lock_tools",
+    "benchmark_tools",
+)
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+
+    if name.startswith("__"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    for module_name in _SUBMODULES:
+        module = importlib.import_module(f".{module_name}", __name__)
+        if hasattr(module, name):
+            value = getattr(module, name)
+            globals()[name] = value  # Cache so later lookups skip __getattr__
+            return value
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(_SUBMODULES))
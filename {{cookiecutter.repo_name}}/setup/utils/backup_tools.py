@@ -8,6 +8,7 @@ import tempfile
 
 from .general_tools import *
 from .versioning_tools import *
+from .file_stats import *
 
 def load_rclone_json(remote_name: str, json_path="./bin/rclone_remote.json") -> str:
     
@@ -97,7 +98,7 @@ def rclone_sync(remote_name: str = None, folder_to_backup: str = None):
     if not os.path.exists(folder_to_backup):
         print(f"Error: The folder '{folder_to_backup}' does not exist.")
         return
-    _ , exclude_patterns = toml_ignore(folder = folder_to_backup, toml_path = "project.toml" ,  ignore_filename = ".rcloneignore",tool_name = "rcloneignore",toml_key = "patterns")
+    exclude_patterns = get_project_config(folder_to_backup).rcloneignore
 
     exclude_args = []
     for pattern in exclude_patterns:
@@ -343,6 +344,34 @@ def generate_diff_report(remote_name):
     else:
         run_diff(remote_name)
 
+def backup_plan(folder_to_backup: str = None, top: int = 10):
+    """
+    Summarises what a push would back up: the files left after the .rcloneignore patterns,
+    their total size, the largest file formats and a size histogram. Uses one scandir walk.
+
+    Returns:
+        FileStats: The files that would be synchronised.
+    """
+    if folder_to_backup is None:
+        folder_to_backup = str(pathlib.Path(__file__).resolve().parent.parent.parent)
+
+    stats = scan_files(folder_to_backup, ignore_spec=get_project_config(folder_to_backup).rcloneignore_spec)
+    print(f"📦 {len(stats)} file(s), {format_bytes(stats.total_bytes)} in '{folder_to_backup}' (after .rcloneignore)")
+
+    formats = list(stats.by_extension().items())
+    if formats:
+        print("\nLargest file formats:")
+        for ext, totals in formats[:top]:
+            print(f"  {ext or '(none)':<12} {totals['files']:>8} file(s) {format_bytes(totals['bytes']):>10}")
+        if len(formats) > top:
+            print(f"  ... and {len(formats) - top} more format(s)")
+
+        print("\nFile sizes:")
+        for label, totals in stats.size_histogram().items():
+            if totals["files"]:
+                print(f"  {label:<12} {totals['files']:>8} file(s) {format_bytes(totals['bytes']):>10}")
+    return stats
+
 def pull_backup(remote_name: str = None, destination_folder: str = None):
     import subprocess
 
@@ -365,7 +394,7 @@ def pull_backup(remote_name: str = None, destination_folder: str = None):
     if not os.path.exists(destination_folder):
         os.makedirs(destination_folder)
 
-    _ , exclude_patterns = toml_ignore(folder = destination_folder, toml_path = "project.toml" ,  ignore_filename = ".rcloneignore",tool_name = "rcloneignore",toml_key = "patterns")
+    exclude_patterns = get_project_config(destination_folder).rcloneignore
   
     exclude_args = []
     for pattern in exclude_patterns:
@@ -400,6 +429,9 @@ def main():
     diff = subparsers.add_parser("diff", help="Generate a diff report for a remote")
     diff.add_argument("--remote", required=True)
 
+    plan = subparsers.add_parser("plan", help="Show how much a push would back up, by file format and size")
+    plan.add_argument("--folder", default=None)
+
     types = subparsers.add_parser("types", help="List supported rclone remote types")
 
     pull = subparsers.add_parser("pull", help="Pull backup from a remote")
@@ -419,6 +451,8 @@ def main():
         delete_remote(args.remote)
     elif args.command == "diff":
         generate_diff_report(args.remote)
+    elif args.command == "plan":
+        backup_plan(args.folder)
     elif args.command == "types":
         list_supported_remote_types()
     elif args.command == "pull":
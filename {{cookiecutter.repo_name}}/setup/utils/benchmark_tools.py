@@ -0,0 +1,572 @@
+import os
+import sys
+import time
+import json
+import argparse
+import platform
+import statistics
+import subprocess
+import pathlib
+import shutil
+import site
+import tempfile
+from datetime import datetime
+
+from .general_tools import *
+
+# Runs one console script with '--help' inside a fresh interpreter and reports how many modules it imported.
+_STARTUP_SNIPPET = """
+import sys, importlib
+name, target = sys.argv[1], sys.argv[2]
+module_name, func_name = target.split(":")
+sys.argv = [name, "--help"]
+try:
+    getattr(importlib.import_module(module_name), func_name)()
+except SystemExit:
+    pass
+sys.stderr.write("\\nmodules_loaded=%d\\n" % len(sys.modules))
+"""
+
+def load_entry_points(pyproject_file: str = None):
+    """
+    Loads the console scripts registered under [project.scripts] in setup/pyproject.toml.
+
+    Args:
+        pyproject_file (str): Path to pyproject.toml. Defaults to the one of the setup package.
+
+    Returns:
+        dict: Mapping of command name to 'module:function'.
+    """
+    if sys.version_info < (3, 11):
+        import toml
+    else:
+        import tomllib as toml
+
+    if not pyproject_file:
+        pyproject_file = str(pathlib.Path(__file__).resolve().parent.parent / "pyproject.toml")
+
+    try:
+        with open(pyproject_file, "rb") as f:
+            config = toml.load(f)
+    except TypeError:
+        # The 'toml' package reads text, 'tomllib' reads bytes
+        with open(pyproject_file, "r", encoding="utf-8") as f:
+            config = toml.load(f)
+
+    return config.get("project", {}).get("scripts", {})
+
+def save_benchmark(name: str, results, output_dir: str = "./bin/benchmarks"):
+    """
+    Saves benchmark results together with basic interpreter information as JSON.
+
+    Returns:
+        str: Path to the written JSON file.
+    """
+    output_dir = pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_file = output_dir / f"{name}.json"
+
+    record = {
+        "benchmark": name,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "executable": sys.executable,
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=2)
+
+    print(f"Benchmark results saved to {output_file}")
+    return str(output_file)
+
+def time_command(command: list, repeat: int = 3, env: dict = None, cwd: str = None):
+    """
+    Runs a command `repeat` times and returns the wall times in seconds and the last completed process.
+    """
+    timings = []
+    result = None
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        result = subprocess.run(command, capture_output=True, text=True, env=env, cwd=cwd)
+        timings.append(time.perf_counter() - start)
+    return timings, result
+
+def benchmark_startup(repeat: int = 3, commands: list = None):
+    """
+    Records the wall time of every console script in setup/pyproject.toml running '--help'.
+
+    Each command is started in a fresh interpreter so the timings include the full
+    import graph of the command, just as when it is launched from the terminal.
+
+    Args:
+        repeat (int): Number of runs per command.
+        commands (list): Optional subset of commands to benchmark.
+
+    Returns:
+        list: One result dict per command.
+    """
+    project_root = pathlib.Path(__file__).resolve().parent.parent.parent
+    setup_dir = str(project_root / "setup")
+
+    env = os.environ.copy()
+    env["PYTHONPATH"] = setup_dir + (os.pathsep + env["PYTHONPATH"] if env.get("PYTHONPATH") else "")
+
+    entry_points = load_entry_points()
+    if commands:
+        entry_points = {name: target for name, target in entry_points.items() if name in commands}
+
+    # Bare interpreter startup as reference point
+    baseline, _ = time_command([sys.executable, "-c", "pass"], repeat=repeat, env=env, cwd=str(project_root))
+
+    results = [{
+        "command": "python -c pass",
+        "target": None,
+        "min_s": round(min(baseline), 4),
+        "median_s": round(statistics.median(baseline), 4),
+        "modules_loaded": None,
+        "returncode": 0,
+    }]
+
+    for name, target in entry_points.items():
+        timings, result = time_command([sys.executable, "-c", _STARTUP_SNIPPET, name, target], repeat=repeat, env=env, cwd=str(project_root))
+
+        modules_loaded = _read_modules_loaded(result.stderr)
+
+        results.append({
+            "command": f"{name} --help",
+            "target": target,
+            "min_s": round(min(timings), 4),
+            "median_s": round(statistics.median(timings), 4),
+            "modules_loaded": modules_loaded,
+            "returncode": result.returncode,
+        })
+
+    print(f"\n{'Command':<36} {'Min (s)':>9} {'Median (s)':>11} {'Modules':>8}")
+    for row in results:
+        modules = row["modules_loaded"] if row["modules_loaded"] is not None else "-"
+        status = "" if row["returncode"] == 0 else f"  (exit {row['returncode']})"
+        print(f"{row['command']:<36} {row['min_s']:>9} {row['median_s']:>11} {modules:>8}{status}")
+
+    save_benchmark("startup", results)
+    return results
+
+def _read_modules_loaded(stderr: str):
+    modules_loaded = None
+    for line in stderr.splitlines():
+        if line.startswith("modules_loaded="):
+            modules_loaded = int(line.split("=", 1)[1])
+    return modules_loaded
+
+def benchmark_kernel(repeat: int = 5, command: str = "set-dataset"):
+    """
+    Records the startup latency of a console script when PYTHON is unset, matches the
+    running interpreter, and points at another interpreter (the os.execv handoff path).
+
+    The mismatched interpreter is a symlink to the running one in a temporary folder, so
+    the handoff is measured without creating a new environment. The command runs in a
+    temporary copy of the project so the project's own .env is left untouched.
+
+    Args:
+        repeat (int): Number of runs per scenario.
+        command (str): Console script from setup/pyproject.toml to run with '--help'.
+
+    Returns:
+        list: One result dict per scenario.
+    """
+    if platform.system().lower() == "windows":
+        print("⚠️ The kernel benchmark relies on os.execv and symlinks and is not supported on Windows.")
+        return []
+
+    entry_points = load_entry_points()
+    if command not in entry_points:
+        print(f"❌ Unknown command '{command}'. Choose from: {', '.join(entry_points)}")
+        return []
+    target = entry_points[command]
+
+    project_root = pathlib.Path(__file__).resolve().parent.parent.parent
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_dir = pathlib.Path(tmp_dir)
+        tmp_project = tmp_dir / "project"
+        shutil.copytree(project_root / "setup", tmp_project / "setup", ignore=shutil.ignore_patterns("__pycache__", "*.egg-info"))
+        if (project_root / ".cookiecutter").exists():
+            shutil.copy2(project_root / ".cookiecutter", tmp_project / ".cookiecutter")
+
+        # A second interpreter path that resolves to the running one
+        kernel_dir = tmp_dir / "kernel" / "bin"
+        kernel_dir.mkdir(parents=True)
+        other_kernel = kernel_dir / "python"
+        os.symlink(sys.executable, other_kernel)
+
+        # The symlinked interpreter does not see the site-packages of a virtual environment
+        python_path = [str(tmp_project / "setup")] + site.getsitepackages()
+        env = os.environ.copy()
+        env.pop("SETUP_KERNEL_HANDOFF", None)
+        env["PYTHONPATH"] = os.pathsep.join(python_path + ([env["PYTHONPATH"]] if env.get("PYTHONPATH") else []))
+
+        # Warm-up run so byte-compiling the copied package is not counted
+        time_command([sys.executable, "-c", _STARTUP_SNIPPET, command, target], repeat=1, env=env, cwd=str(tmp_project))
+
+        scenarios = [
+            ("PYTHON unset", None),
+            ("PYTHON matches", sys.executable),
+            ("PYTHON mismatched (handoff)", str(other_kernel)),
+        ]
+        for label, python_kernel in scenarios:
+            env_file = tmp_project / ".env"
+            with open(env_file, "w", encoding="utf-8") as f:
+                if python_kernel:
+                    f.write(f"PYTHON={python_kernel}\n")
+
+            timings, result = time_command([sys.executable, "-c", _STARTUP_SNIPPET, command, target], repeat=repeat, env=env, cwd=str(tmp_project))
+
+            results.append({
+                "scenario": label,
+                "command": f"{command} --help",
+                "min_s": round(min(timings), 4),
+                "median_s": round(statistics.median(timings), 4),
+                "modules_loaded": _read_modules_loaded(result.stderr),
+                "handoff": "Restarting with the correct Python kernel" in result.stdout,
+                "returncode": result.returncode,
+            })
+
+    print(f"\n{'Scenario':<30} {'Min (s)':>9} {'Median (s)':>11} {'Handoff':>8}")
+    for row in results:
+        status = "" if row["returncode"] == 0 else f"  (exit {row['returncode']})"
+        print(f"{row['scenario']:<30} {row['min_s']:>9} {row['median_s']:>11} {str(row['handoff']):>8}{status}")
+
+    save_benchmark("kernel", results)
+    return results
+
+def _create_env(env_path: str, use_uv: bool):
+    if use_uv:
+        subprocess.run([sys.executable, "-m", "uv", "venv", env_path], check=True, capture_output=True)
+    else:
+        subprocess.run([sys.executable, "-m", "venv", env_path], check=True, capture_output=True)
+
+def _install_env(env_path: str, requirements: list, use_uv: bool, source_args: list):
+    from .virenv_tools import venv_python
+
+    python_exe = venv_python(env_path)
+    if use_uv:
+        command = [sys.executable, "-m", "uv", "pip", "install", "--python", python_exe, "--no-cache"]
+    else:
+        command = [python_exe, "-m", "pip", "install", "--no-cache-dir"]
+    return subprocess.run(command + source_args + requirements, capture_output=True, text=True)
+
+def benchmark_wheels(repeat: int = 1, requirement_files: list = None, find_links: str = None):
+    """
+    Compares cold and warm creation of a virtual environment from the project requirements.
+
+    Cold installs download from the index (or, with `find_links`, read a local wheel set
+    without an index so the benchmark runs offline) with caches disabled. Warm installs
+    only read the project wheelhouse built by 'env cache'.
+
+    Args:
+        repeat (int): Number of environments created per scenario.
+        requirement_files (list): Requirement files, defaults to requirements.txt and dependencies.txt.
+        find_links (str): Optional local wheel folder used for the cold runs instead of the index.
+
+    Returns:
+        list: One result dict per scenario.
+    """
+    from .virenv_tools import build_wheelhouse, read_wheelhouse_requirements
+
+    project_root = pathlib.Path(__file__).resolve().parent.parent.parent
+    if not requirement_files:
+        requirement_files = ["requirements.txt", "dependencies.txt", "setup/dependencies.txt"]
+    requirements = read_wheelhouse_requirements([str(project_root / f) for f in requirement_files])
+    if not requirements:
+        print("❌ No requirements found to benchmark.")
+        return []
+
+    wheel_dir = build_wheelhouse(requirement_files, find_links=find_links)
+    if not wheel_dir:
+        return []
+
+    try:
+        import uv  # noqa: F401
+        use_uv = True
+    except ImportError:
+        use_uv = False
+
+    cold_args = ["--no-index", "--find-links", os.path.abspath(find_links)] if find_links else []
+    scenarios = [
+        ("cold (local wheel set)" if find_links else "cold (index)", cold_args),
+        ("warm (wheelhouse)", ["--no-index", "--find-links", wheel_dir]),
+    ]
+
+    results = []
+    for label, source_args in scenarios:
+        create_times, install_times = [], []
+        returncode = 0
+        for _ in range(max(1, repeat)):
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                env_path = os.path.join(tmp_dir, ".venv")
+
+                start = time.perf_counter()
+                _create_env(env_path, use_uv)
+                create_times.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                result = _install_env(env_path, requirements, use_uv, source_args)
+                install_times.append(time.perf_counter() - start)
+                returncode = returncode or result.returncode
+                if result.returncode != 0:
+                    print(result.stderr.strip()[-2000:])
+
+        results.append({
+            "scenario": label,
+            "installer": "uv" if use_uv else "pip",
+            "requirements": len(requirements),
+            "create_s": round(statistics.median(create_times), 3),
+            "install_s": round(statistics.median(install_times), 3),
+            "total_s": round(statistics.median(create_times) + statistics.median(install_times), 3),
+            "returncode": returncode,
+        })
+
+    print(f"\n{'Scenario':<26} {'Create (s)':>11} {'Install (s)':>12} {'Total (s)':>10}")
+    for row in results:
+        status = "" if row["returncode"] == 0 else f"  (exit {row['returncode']})"
+        print(f"{row['scenario']:<26} {row['create_s']:>11} {row['install_s']:>12} {row['total_s']:>10}{status}")
+
+    save_benchmark("wheels", results)
+    return results
+
+def _synthetic_entries(count: int, data_type: str = "00_raw"):
+    """Builds registry entries for `count` synthetic single-file datasets."""
+    created = datetime.now().strftime("%Y-%m-%dT%H:%M")
+    entries = []
+    for i in range(count):
+        destination = f"./data/{data_type}/file_{i:07d}.csv"
+        entries.append({
+            "data_name": f"file_{i:07d}.csv",
+            "data_type": data_type,
+            "destination": destination,
+            "hash": f"{i:040x}",
+            "number_of_files": 1,
+            "total_size_mb": 0,
+            "file_formats": [".csv"],
+            "created": created,
+            "lastest_change": None,
+            "data_files": [destination],
+            "data_size": [0],
+            "source": None,
+            "run_command": None,
+            "DOI": None,
+            "citation": None,
+            "license": None,
+        })
+    return entries
+
+def benchmark_registry(sizes: list = None, legacy_sample: int = 1000):
+    """
+    Times registering N synthetic files in datasets.json with the batch API (one load and
+    one write) and the SQLite backend, against the per-file add_to_json path (one load and
+    write per file).
+
+    The per-file path is quadratic, so it is only timed on the first `legacy_sample` files
+    of each size and the full cost is extrapolated.
+
+    Args:
+        sizes (list): Numbers of synthetic files (default: 10k and 100k).
+        legacy_sample (int): Files timed with the per-file path (0 to skip it).
+
+    Returns:
+        list: One result dict per size.
+    """
+    import contextlib
+    import io
+    from .set_dataset import add_entries_to_json, add_to_json
+    from .dataset_registry import SQLiteRegistry
+
+    sizes = sizes or [10_000, 100_000]
+    results = []
+
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            json_file = os.path.join(tmp_dir, "datasets.json")
+            entries = _synthetic_entries(size)
+
+            # Batch: initial registration and a re-scan of an unchanged registry
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                add_entries_to_json(json_file, [dict(e) for e in entries], verbose=False)
+            batch_insert = time.perf_counter() - start
+
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                add_entries_to_json(json_file, [dict(e) for e in entries], verbose=False)
+            batch_rescan = time.perf_counter() - start
+
+            # SQLite backend: initial registration, re-scan, and export of the datasets.json layout
+            registry = SQLiteRegistry(os.path.join(tmp_dir, "datasets.db"))
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                with registry:
+                    registry.upsert_entries([dict(e) for e in entries], verbose=False)
+                sqlite_insert = time.perf_counter() - start
+
+                start = time.perf_counter()
+                with registry:
+                    registry.upsert_entries([dict(e) for e in entries], verbose=False)
+                sqlite_rescan = time.perf_counter() - start
+
+                start = time.perf_counter()
+                with registry:
+                    registry.export_json(os.path.join(tmp_dir, "export.json"))
+                sqlite_export = time.perf_counter() - start
+
+            legacy_s = None
+            legacy_estimate = None
+            sample = min(legacy_sample, size)
+            if sample:
+                legacy_file = os.path.join(tmp_dir, "legacy.json")
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    for entry in entries[:sample]:
+                        add_to_json(legacy_file, dict(entry))
+                legacy_s = time.perf_counter() - start
+                # Cost grows with the registry size, so scale quadratically
+                legacy_estimate = legacy_s * (size / sample) ** 2
+
+            results.append({
+                "files": size,
+                "batch_insert_s": round(batch_insert, 3),
+                "batch_rescan_s": round(batch_rescan, 3),
+                "registry_mb": round(os.path.getsize(json_file) / (1024 * 1024), 1),
+                "sqlite_insert_s": round(sqlite_insert, 3),
+                "sqlite_rescan_s": round(sqlite_rescan, 3),
+                "sqlite_export_s": round(sqlite_export, 3),
+                "per_file_sample": sample,
+                "per_file_sample_s": round(legacy_s, 3) if legacy_s is not None else None,
+                "per_file_estimate_s": round(legacy_estimate, 1) if legacy_estimate is not None else None,
+            })
+
+    print(f"\n{'Files':>8} {'Batch (s)':>10} {'Re-scan (s)':>12} {'SQLite (s)':>11} {'SQLite re-scan (s)':>19} {'Export (s)':>11} {'Per-file est. (s)':>18}")
+    for row in results:
+        estimate = row["per_file_estimate_s"] if row["per_file_estimate_s"] is not None else "-"
+        print(f"{row['files']:>8} {row['batch_insert_s']:>10} {row['batch_rescan_s']:>12} {row['sqlite_insert_s']:>11} {row['sqlite_rescan_s']:>19} {row['sqlite_export_s']:>11} {estimate:>18}")
+
+    save_benchmark("registry", results)
+    return results
+
+def _synthetic_notebook(path: str, size_mb: float, cells: int = 40, compact: bool = False):
+    """Writes an output-heavy notebook: small code cells, each with a large base64 'plot'."""
+    import base64
+
+    per_cell = int(size_mb * 1024 * 1024 / cells)
+    png = base64.b64encode(os.urandom(per_cell * 3 // 4)).decode("ascii")
+    notebook = {"cells": [], "metadata": {"kernelspec": {"name": "python3"}}, "nbformat": 4, "nbformat_minor": 5}
+    for i in range(cells):
+        notebook["cells"].append({
+            "cell_type": "code", "execution_count": i + 1, "id": f"cell-{i}", "metadata": {},
+            "outputs": [{"output_type": "display_data", "data": {"image/png": png, "text/plain": ["<Figure>"]}, "metadata": {}}],
+            "source": ["import numpy as np\n", f"plt.plot(np.arange({i}))"],
+        })
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(notebook, f, indent=None if compact else 1)
+
+def benchmark_notebooks(sizes: list = None, repeat: int = 3):
+    """
+    Compares extracting the code of output-heavy notebooks with nbformat.read (if installed),
+    json.load and the streaming extractor in notebook_tools: wall time and peak Python memory.
+    """
+    import tracemalloc
+    from .notebook_tools import iter_notebook_sources
+
+    sizes = sizes or [10, 50]
+
+    def _json_load(path):
+        with open(path, "r", encoding="utf-8") as f:
+            nb = json.load(f)
+        return ["".join(c["source"]) for c in nb["cells"] if c["cell_type"] == "code"]
+
+    methods = {"streaming": lambda path: list(iter_notebook_sources(path)), "json.load": _json_load}
+    try:
+        import nbformat
+        methods["nbformat.read"] = lambda path: [c.source for c in nbformat.read(path, as_version=4).cells if c.cell_type == "code"]
+    except ImportError:
+        print("nbformat is not installed; skipping it.")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size_mb in sizes:
+            path = os.path.join(tmp_dir, f"notebook_{size_mb}mb.ipynb")
+            _synthetic_notebook(path, size_mb)
+            expected = methods["streaming"](path)
+
+            for name, extract in methods.items():
+                timings = []
+                for _ in range(max(1, repeat)):
+                    start = time.perf_counter()
+                    sources = extract(path)
+                    timings.append(time.perf_counter() - start)
+                if sources != expected:
+                    print(f"⚠️ {name} extracted different code for {size_mb} MB")
+
+                tracemalloc.start()
+                extract(path)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+                results.append({
+                    "notebook_mb": round(os.path.getsize(path) / (1024 * 1024), 1),
+                    "method": name,
+                    "median_s": round(statistics.median(timings), 3),
+                    "peak_mb": round(peak / (1024 * 1024), 1),
+                })
+
+    print(f"\n{'Notebook (MB)':>14} {'Method':<14} {'Median (s)':>11} {'Peak memory (MB)':>17}")
+    for row in results:
+        print(f"{row['notebook_mb']:>14} {row['method']:<14} {row['median_s']:>11} {row['peak_mb']:>17}")
+
+    save_benchmark("notebooks", results)
+    return results
+
+@ensure_correct_kernel
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks for the setup CLI tools")
+    subparsers = parser.add_subparsers(dest="command")
+
+    startup = subparsers.add_parser("startup", help="Time every console script running '--help'")
+    startup.add_argument("--repeat", type=int, default=3, help="Runs per command (default: 3)")
+    startup.add_argument("--only", nargs="+", default=None, help="Only benchmark these commands")
+
+    kernel = subparsers.add_parser("kernel", help="Time the interpreter handoff of ensure_correct_kernel")
+    kernel.add_argument("--repeat", type=int, default=5, help="Runs per scenario (default: 5)")
+    kernel.add_argument("--cmd", default="set-dataset", help="Console script to run with '--help' (default: set-dataset)")
+
+    wheels = subparsers.add_parser("wheels", help="Compare cold and warm (wheelhouse) environment creation")
+    wheels.add_argument("requirement_files", nargs="*", help="Requirement files (default: requirements.txt and dependencies.txt)")
+    wheels.add_argument("--repeat", type=int, default=1, help="Environments per scenario (default: 1)")
+    wheels.add_argument("--find-links", default=None, help="Local wheel folder for the cold runs (fully offline)")
+
+    registry = subparsers.add_parser("registry", help="Time batch datasets.json updates on synthetic files")
+    registry.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000], help="Numbers of synthetic files (default: 10000 100000)")
+    registry.add_argument("--legacy-sample", type=int, default=1000, help="Files timed with the per-file path (default: 1000, 0 to skip)")
+
+    notebooks = subparsers.add_parser("notebooks", help="Compare notebook code extraction on large output-heavy notebooks")
+    notebooks.add_argument("--sizes", type=float, nargs="+", default=[10, 50], help="Notebook sizes in MB (default: 10 50)")
+    notebooks.add_argument("--repeat", type=int, default=3, help="Runs per method (default: 3)")
+
+    args = parser.parse_args()
+
+    if args.command == "startup":
+        benchmark_startup(repeat=args.repeat, commands=args.only)
+    elif args.command == "kernel":
+        benchmark_kernel(repeat=args.repeat, command=args.cmd)
+    elif args.command == "registry":
+        benchmark_registry(sizes=args.sizes, legacy_sample=args.legacy_sample)
+    elif args.command == "notebooks":
+        benchmark_notebooks(sizes=args.sizes, repeat=args.repeat)
+    elif args.command == "wheels":
+        benchmark_wheels(repeat=args.repeat, requirement_files=args.requirement_files or None, find_links=args.find_links)
+    else:
+        parser.print_help()
+
+if __name__ == "__main__":
+    os.chdir(pathlib.Path(__file__).resolve().parent.parent.parent)
+    main()
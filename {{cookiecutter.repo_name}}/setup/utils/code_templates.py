@@ -3,17 +3,22 @@ import pathlib
 import os
 from textwrap import dedent
 import pathlib
+import argparse
 
 from .general_tools import *
 
-package_installer(required_libraries = ['nbformat','jinja2'])
-
-
-template_env = set_jinja_templates("j2_templates/code_templates")
+_template_env = None
 
+def get_template_env():
+    """Build the code template environment on first use and reuse it afterwards."""
+    global _template_env
+    if _template_env is None:
+        package_installer(required_libraries = ['nbformat','jinja2'])
+        _template_env = set_jinja_templates("j2_templates/code_templates")
+    return _template_env
 
 def create_script_from_template(programming_language, folder_path, template_name, script_name, context, subdir=None):
-    template = template_env.get_template(f"{programming_language}/{template_name}")
+    template = get_template_env().get_template(f"{programming_language}/{template_name}")
     rendered = template.render(**context)
     extension = template_name.split(".")[-2]
     if subdir:
@@ -84,6 +89,9 @@ def create_scripts(programming_language):
 
 @ensure_correct_kernel
 def main():
+    parser = argparse.ArgumentParser(description="Reset the code templates for the project language.")
+    parser.parse_args()
+
     # Ensure the working directory is the project root
     project_root = pathlib.Path(__file__).resolve().parent.parent.parent
     os.chdir(project_root)
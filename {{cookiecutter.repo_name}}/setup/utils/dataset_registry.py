@@ -0,0 +1,497 @@
+import os
+import io
+import json
+import gzip
+import hashlib
+import sqlite3
+import pathlib
+
+# Entry fields copied into their own (indexed) columns; the full entry is stored as JSON
+_COLUMNS = ("destination", "data_name", "data_type", "hash", "created", "lastest_change")
+# Per-file fields kept in the 'files' table (only a placeholder stays in the JSON, to keep the key order)
+_FILE_FIELDS = ("data_files", "data_size")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS datasets (
+    id INTEGER PRIMARY KEY,
+    destination TEXT NOT NULL UNIQUE,
+    data_name TEXT,
+    data_type TEXT,
+    hash TEXT,
+    created TEXT,
+    lastest_change TEXT,
+    entry TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_datasets_data_type ON datasets (data_type);
+CREATE INDEX IF NOT EXISTS idx_datasets_hash ON datasets (hash);
+
+CREATE TABLE IF NOT EXISTS files (
+    dataset_id INTEGER NOT NULL REFERENCES datasets (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER,
+    PRIMARY KEY (dataset_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_files_path ON files (path);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Datasets with at least this many files keep their file list in a manifest instead of the entry
+MANIFEST_MIN_FILES = 2
+_MANIFEST_DIR = "./.datasets"
+
+def _project_root():
+    return pathlib.Path(__file__).resolve().parent.parent.parent
+
+def manifest_path(destination: str, suffix: str = ".jsonl.gz"):
+    """Returns the manifest path (relative to the project root) for a dataset destination."""
+    name = os.path.basename(os.path.normpath(destination)) or "dataset"
+    digest = hashlib.sha1(os.path.normpath(destination).encode("utf-8")).hexdigest()[:12]
+    return f"{_MANIFEST_DIR}/{name}-{digest}{suffix}"
+
+def tree_path(destination: str):
+    """Returns the path (relative to the project root) of the Merkle tree saved for a folder dataset."""
+    return manifest_path(destination, suffix=".tree.json.gz")
+
+def _write_gzip(relative_path: str, lines):
+    """
+    Writes text lines gzip-compressed with an atomic rename. The gzip header carries no
+    timestamp, so unchanged content produces identical bytes and the file is not rewritten.
+    """
+    target = _project_root() / relative_path
+
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode="wb", mtime=0) as gz:
+        for line in lines:
+            gz.write(line.encode("utf-8"))
+    content = buffer.getvalue()
+
+    try:
+        with open(target, "rb") as f:
+            if f.read() == content:
+                return relative_path
+    except OSError:
+        pass
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = target.with_name(target.name + ".tmp")
+    with open(tmp_file, "wb") as f:
+        f.write(content)
+    os.replace(tmp_file, target)
+    return relative_path
+
+def write_manifest(destination: str, records: list):
+    """
+    Writes the file list of a dataset as gzip JSONL, one {"path", "bytes", "hash"} object per line.
+
+    The gzip header carries no timestamp, so an unchanged file list produces identical bytes
+    and the file is not rewritten.
+
+    Returns:
+        str: The manifest path relative to the project root.
+    """
+    return _write_gzip(manifest_path(destination),
+                       (json.dumps(record, separators=(",", ":")) + "\n" for record in records))
+
+def iter_manifest(manifest: str):
+    """Yields the {"path", "bytes", "hash"} records of a manifest, streaming from disk."""
+    with gzip.open(_project_root() / manifest, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def write_tree(destination: str, tree: dict):
+    """
+    Saves a folder dataset's Merkle tree (`MerkleTree.to_dict`) next to its manifest, so the
+    registry only holds its path.
+
+    Returns:
+        str: The tree path relative to the project root.
+    """
+    return _write_gzip(tree_path(destination), [json.dumps(tree, separators=(",", ":"))])
+
+def read_tree(entry: dict):
+    """Returns the saved `MerkleTree.to_dict` data of a dataset entry, or None."""
+    tree = entry.get("tree")
+    if not isinstance(tree, str):
+        return None  # No tree, or a legacy inline {folder: digest} mapping
+    try:
+        with gzip.open(_project_root() / tree, "rt", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def remove_manifest(destination: str):
+    """Deletes the manifest and the saved tree of a dataset."""
+    for relative_path in (manifest_path(destination), tree_path(destination)):
+        try:
+            os.remove(_project_root() / relative_path)
+        except OSError:
+            pass
+
+def dataset_files(entry: dict):
+    """
+    Yields (path, size in MB) for every file of a dataset, reading its manifest lazily if it has one.
+    """
+    if entry.get("manifest"):
+        for record in iter_manifest(entry["manifest"]):
+            yield record["path"], record["bytes"] / (1024 * 1024)
+        return
+
+    files = entry.get("data_files") or []
+    sizes = list(entry.get("data_size") or [])
+    if len(sizes) < len(files):
+        sizes += ["?"] * (len(files) - len(sizes))
+    yield from zip(files, sizes)
+
+def file_count(entry: dict):
+    if entry.get("manifest"):
+        return entry.get("number_of_files") or 0
+    return len(entry.get("data_files") or [])
+
+def is_provided(entry: dict):
+    return bool(entry.get("manifest") or entry.get("data_files"))
+
+def verify_manifest(entry: dict):
+    """
+    Re-checks the files of a dataset against its manifest (size first, then hash).
+
+    Returns:
+        list: Paths that are missing or whose size or hash differs.
+    """
+    from .hash_tools import hash_files
+
+    if not entry.get("manifest"):
+        return []
+
+    mismatched = []
+    to_hash = {}
+    for record in iter_manifest(entry["manifest"]):
+        try:
+            size = os.path.getsize(record["path"])
+        except OSError:
+            mismatched.append(record["path"])
+            continue
+        if size != record["bytes"]:
+            mismatched.append(record["path"])
+        elif record.get("hash"):
+            to_hash[record["path"]] = record["hash"]
+
+    digests = hash_files(list(to_hash))
+    mismatched.extend(path for path, digest in to_hash.items() if digests.get(path) != digest)
+    return mismatched
+
+def merge_entry(existing_entry: dict, entry: dict):
+    """
+    Merges a freshly collected dataset entry into an existing one in place.
+
+    The entry counts as changed if its hash differs or any non-empty field differs (except
+    'created'). A changed entry keeps its original 'created' and records 'lastest_change'.
+
+    Returns:
+        bool: True if the existing entry was updated.
+    """
+    changed = False
+    if entry.get("hash") and existing_entry.get("hash") != entry["hash"]:
+        changed = True
+    elif not all(existing_entry.get(k) == v for k, v in entry.items() if v is not None and k != "created"):
+        changed = True
+
+    if changed:
+        entry["lastest_change"] = entry["created"]
+        entry["created"] = existing_entry["created"]
+        for k, v in entry.items():
+            if v is not None:
+                existing_entry[k] = v
+        if entry.get("manifest"):
+            # The file list moved to the manifest
+            existing_entry.pop("data_files", None)
+            existing_entry.pop("data_size", None)
+
+    # The dataset shrank below MANIFEST_MIN_FILES (its file list is inline again) or is no longer a folder
+    for key in ("manifest", "tree"):
+        if not entry.get(key) and existing_entry.get(key):
+            stale = existing_entry.pop(key)
+            if isinstance(stale, str):
+                try:
+                    os.remove(_project_root() / stale)
+                except OSError:
+                    pass
+            changed = True
+    return changed
+
+class SQLiteRegistry:
+    """
+    Dataset registry stored in a local SQLite file (./bin/datasets.db by default).
+
+    Datasets are indexed on destination, data_type and hash, and their files live in a
+    'files' child table, so lookups and updates do not rewrite the whole registry.
+    `export_json` writes the `datasets.json` layout ('datasets' plus '__hide_fields__')
+    used by `generate_dataset_table` and the DCAS output.
+
+    The digest of the last exported or imported `datasets.json` is kept in the database. If
+    the file no longer matches it (hand edits, or writes by the JSON backend), `sync_json`
+    re-imports it, so the most recent `datasets.json` always wins.
+
+    Use as a context manager; changes are committed in one transaction on exit.
+    """
+
+    def __init__(self, db_file: str = "./bin/datasets.db"):
+        self.db_file = pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path(db_file)
+        self.conn = None
+        self.changed = False
+
+    def __enter__(self):
+        return self if self.conn is not None else self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.conn.commit()
+        else:
+            self.conn.rollback()
+        self.close()
+
+    def open(self):
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_file)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self.changed = False
+        return self
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def is_empty(self):
+        return self.conn.execute("SELECT 1 FROM datasets LIMIT 1").fetchone() is None
+
+    # Metadata
+    def _meta(self, key: str):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def hide_fields(self):
+        value = self._meta("__hide_fields__")
+        return json.loads(value) if value else []
+
+    def set_hide_fields(self, fields: list):
+        value = json.dumps(list(fields))
+        if value != self._meta("__hide_fields__"):
+            self._set_meta("__hide_fields__", value)
+            self.changed = True
+
+    # Entries
+    def _row_to_entry(self, row, files: list = None):
+        dataset_id, entry_json = row
+        entry = json.loads(entry_json)
+        if entry.get("data_files") is not None:
+            if files is None:
+                files = self.conn.execute(
+                    "SELECT path, size FROM files WHERE dataset_id = ? ORDER BY position", (dataset_id,)
+                ).fetchall()
+            entry["data_files"] = [path for path, _ in files]
+            entry["data_size"] = [size for _, size in files]
+        return entry
+
+    def get(self, destination: str):
+        """Returns the entry registered for a destination, or None."""
+        row = self.conn.execute("SELECT id, entry FROM datasets WHERE destination = ?", (destination,)).fetchone()
+        return self._row_to_entry(row) if row else None
+
+    def find_by_hash(self, hash: str):
+        rows = self.conn.execute("SELECT id, entry FROM datasets WHERE hash = ?", (hash,)).fetchall()
+        return [self._row_to_entry(row) for row in rows]
+
+    def _write(self, entry: dict, dataset_id: int = None):
+        self.changed = True
+        # File lists are replaced by an empty placeholder that keeps the key order
+        stored = {k: ([] if k in _FILE_FIELDS and v is not None else v) for k, v in entry.items()}
+        has_files = entry.get("data_files") is not None
+        values = [entry.get(k) for k in _COLUMNS] + [json.dumps(stored)]
+
+        if dataset_id is None:
+            cursor = self.conn.execute(
+                f"INSERT INTO datasets ({', '.join(_COLUMNS)}, entry) VALUES ({', '.join('?' * (len(_COLUMNS) + 1))})", values
+            )
+            dataset_id = cursor.lastrowid
+        else:
+            assignments = ", ".join(f"{k} = ?" for k in _COLUMNS)
+            self.conn.execute(f"UPDATE datasets SET {assignments}, entry = ? WHERE id = ?", values + [dataset_id])
+            self.conn.execute("DELETE FROM files WHERE dataset_id = ?", (dataset_id,))
+
+        if has_files:
+            files = entry.get("data_files") or []
+            sizes = list(entry.get("data_size") or [])
+            sizes += [None] * (len(files) - len(sizes))
+            self.conn.executemany(
+                "INSERT INTO files (dataset_id, position, path, size) VALUES (?, ?, ?, ?)",
+                [(dataset_id, i, path, size if isinstance(size, int) else None) for i, (path, size) in enumerate(zip(files, sizes))],
+            )
+        return dataset_id
+
+    def upsert(self, entry: dict, verbose: bool = True):
+        """
+        Inserts or updates one entry with the same rules as the JSON registry.
+
+        Returns:
+            str | None: "added", "updated" or None if the existing entry is unchanged.
+        """
+        row = self.conn.execute("SELECT id, entry FROM datasets WHERE destination = ?", (entry.get("destination"),)).fetchone()
+
+        if row:
+            existing_entry = self._row_to_entry(row)
+            if not merge_entry(existing_entry, entry):
+                return None
+            self._write(existing_entry, dataset_id=row[0])
+            if verbose:
+                print(f"Updated existing dataset entry for {entry['data_name']}.")
+            return "updated"
+
+        if not entry.get("data_name"):
+            entry["data_name"] = os.path.basename(entry["destination"])
+        self._write(entry)
+        if verbose:
+            print(f"Added new dataset entry for {entry['data_name']}.")
+        return "added"
+
+    def upsert_entries(self, entries: list, verbose: bool = True):
+        """
+        Returns:
+            dict: Counts of added, updated and unchanged entries.
+        """
+        counts = {"added": 0, "updated": 0, "unchanged": 0}
+        for entry in entries:
+            counts[self.upsert(entry, verbose=verbose) or "unchanged"] += 1
+        return counts
+
+    def remove_missing(self):
+        """Removes entries whose destination no longer exists. Returns the number removed."""
+        missing = [
+            (dataset_id, destination) for dataset_id, destination in self.conn.execute("SELECT id, destination FROM datasets")
+            if not destination or not os.path.exists(destination)
+        ]
+        self.conn.executemany("DELETE FROM datasets WHERE id = ?", [(dataset_id,) for dataset_id, _ in missing])
+        self.changed = self.changed or bool(missing)
+        for _, destination in missing:
+            if destination:
+                remove_manifest(destination)
+
+        if missing:
+            print(f"Removed {len(missing)} dataset(s) with missing destinations.")
+        else:
+            print("No missing dataset destinations found.")
+        return len(missing)
+
+    def entries(self):
+        """Yields all entries ordered by data_type, then registration order."""
+        # Read the files of all datasets in one scan instead of one query per dataset
+        files = {}
+        for dataset_id, path, size in self.conn.execute("SELECT dataset_id, path, size FROM files ORDER BY dataset_id, position"):
+            files.setdefault(dataset_id, []).append((path, size))
+
+        cursor = self.conn.execute("SELECT id, entry FROM datasets ORDER BY COALESCE(data_type, ''), id")
+        for row in cursor.fetchall():
+            yield self._row_to_entry(row, files.get(row[0], []))
+
+    # Import / export
+    def import_json(self, json_file_path: str, replace: bool = False):
+        """
+        Loads a datasets.json (new or legacy list layout) into the registry.
+
+        Args:
+            replace (bool): Drop the current entries first, so the file becomes the registry.
+        """
+        with open(json_file_path, "rb") as f:
+            content = f.read()
+        data = json.loads(content)
+        if isinstance(data, list):
+            data = {"datasets": data, "__hide_fields__": []}
+
+        if replace:
+            self.conn.execute("DELETE FROM datasets")
+        for entry in data.get("datasets", []):
+            if entry.get("destination") and self.get(entry["destination"]) is None:
+                self._write(entry)
+        self.set_hide_fields(data.get("__hide_fields__", []))
+
+        # The registry now matches the file; nothing needs to be exported
+        self._set_meta("json_digest", hashlib.sha256(content).hexdigest())
+        self.changed = False
+
+    def sync_json(self, json_file_path: str):
+        """
+        Re-imports `json_file_path` if it changed since it was last exported or imported.
+
+        Returns:
+            bool: True if the registry was reloaded from the file.
+        """
+        digest = _file_sha256(json_file_path)
+        if digest is None or digest == self._meta("json_digest"):
+            return False
+        if not self.is_empty():
+            print(f"♻️ {os.path.basename(json_file_path)} was changed outside the registry; re-importing it.")
+        self.import_json(json_file_path, replace=True)
+        return True
+
+    def to_dict(self, normalize: bool = True):
+        datasets = list(self.entries())
+        if normalize:
+            all_keys = set(k for entry in datasets for k in entry.keys())
+            for entry in datasets:
+                for key in all_keys:
+                    if key not in entry:
+                        entry[key] = None
+        return {"datasets": datasets, "__hide_fields__": self.hide_fields()}
+
+    def export_json(self, json_file_path: str, normalize: bool = True):
+        """
+        Writes the registry in the datasets.json layout with an atomic rename, only if the
+        registry changed or the file no longer matches the last export.
+        """
+        current_digest = _file_sha256(json_file_path)
+        if not self.changed and current_digest is not None and current_digest == self._meta("json_digest"):
+            print(f"{json_file_path} is up to date.")
+            return json_file_path
+
+        content = json.dumps(self.to_dict(normalize=normalize), indent=4).encode("utf-8")
+        digest = hashlib.sha256(content).hexdigest()
+        if digest != current_digest:
+            tmp_file_path = f"{json_file_path}.tmp"
+            with open(tmp_file_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_file_path, json_file_path)
+            print(f"Metadata saved to {json_file_path}")
+        self._set_meta("json_digest", digest)
+        self.changed = False
+        return json_file_path
+
+def _file_sha256(file_path: str):
+    try:
+        with open(file_path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+def open_sqlite_registry(json_file_path: str = None, db_file: str = "./bin/datasets.db"):
+    """
+    Opens the SQLite registry and (re-)imports `json_file_path` if it is new or was changed
+    since the registry last wrote or read it.
+
+    Returns:
+        SQLiteRegistry: An open registry (use it as a context manager to commit and close).
+    """
+    registry = SQLiteRegistry(db_file).open()
+    if json_file_path:
+        registry.sync_json(json_file_path)
+    return registry
@@ -1,16 +1,12 @@
-import requests
 import re
 import os
 import multiprocessing
 import argparse
 import pathlib
+import urllib.parse
 
 from .general_tools import *
 
-package_installer(required_libraries = ['beautifulsoup4'],pip_install=True)
-
-from bs4 import BeautifulSoup
-
 def links_deic_storage(url):
     """
     Prints all the links (URLs) found in the given web page URL.
@@ -18,6 +14,10 @@ def links_deic_storage(url):
     Parameters:
         url (str): The URL of the web page to scan for links.
     """
+    package_installer(required_libraries = ['requests','beautifulsoup4'],pip_install=True)
+    import requests
+    from bs4 import BeautifulSoup
+
     try:
         # Send a GET request to the URL
         response = requests.get(url)
@@ -56,6 +56,8 @@ def extract_file_paths(html_contents):
 
 def download_file_worker(file_path, save_dir):
     """ Worker function for downloading a single file """
+    import requests
+
     print(f"Downloading file from: {file_path}")
     
     # Construct the full URL to the file
@@ -1,14 +1,22 @@
 import os
 import pathlib
+import argparse
 
 from .general_tools import *
 from .readme_templates import main as update_readme_main
 from .get_dependencies import main as get_setup_dependencies_main
 
-template_env = set_jinja_templates("j2_templates/example_templates")
+_template_env = None
+
+def get_template_env():
+    """Build the example template environment on first use and reuse it afterwards."""
+    global _template_env
+    if _template_env is None:
+        _template_env = set_jinja_templates("j2_templates/example_templates")
+    return _template_env
 
 def render_template(language, template_name, context):
-    template = template_env.get_template(f"{language}/{template_name}")
+    template = get_template_env().get_template(f"{language}/{template_name}")
     return template.render(**context)
 
 def create_example(project_language):
@@ -34,6 +42,8 @@ def create_example(project_language):
 
 @ensure_correct_kernel
 def main():
+    parser = argparse.ArgumentParser(description="Create code examples for the project language.")
+    parser.parse_args()
 
     # Ensure the working directory is the project root
     project_root = pathlib.Path(__file__).resolve().parent.parent.parent
@@ -0,0 +1,154 @@
+import os
+import bisect
+from array import array
+
+# Upper bounds (bytes) and labels of the size histogram buckets
+_HISTOGRAM_BOUNDS = (1024, 1024 ** 2, 10 * 1024 ** 2, 100 * 1024 ** 2, 1024 ** 3)
+_HISTOGRAM_LABELS = ("<1 KB", "1 KB-1 MB", "1-10 MB", "10-100 MB", "100 MB-1 GB", ">=1 GB")
+
+MB = 1024 * 1024
+
+
+def format_bytes(n: int):
+    """Returns a short human readable size, e.g. '3.4 MB'."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(n) < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} TB"
+
+
+class FileStats:
+    """
+    Stats of many files kept in array-backed columns: path, size in bytes, mtime_ns, mode,
+    device, inode and an extension id into `extensions`. Filled from the stat results
+    `os.scandir` already returns, so every file is stat'ed once and hashing (which keys its
+    cache on device, inode, size and mtime) can reuse them.
+    """
+
+    def __init__(self):
+        self.paths = []
+        self.bytes = array("q")
+        self.mtime_ns = array("q")
+        self.modes = array("L")
+        self.devs = array("Q")
+        self.inodes = array("Q")
+        self.ext_ids = array("I")
+        self.extensions = []
+        self._ext_index = {}
+
+    def append(self, path: str, stat: os.stat_result):
+        ext = os.path.splitext(path)[1].lower()
+        ext_id = self._ext_index.get(ext)
+        if ext_id is None:
+            ext_id = self._ext_index[ext] = len(self.extensions)
+            self.extensions.append(ext)
+        self.paths.append(path)
+        self.bytes.append(stat.st_size)
+        self.mtime_ns.append(stat.st_mtime_ns)
+        self.modes.append(stat.st_mode)
+        self.devs.append(stat.st_dev)
+        self.inodes.append(stat.st_ino)
+        self.ext_ids.append(ext_id)
+
+    @classmethod
+    def from_paths(cls, paths):
+        """Stats a given list of files (e.g. the new files found after a run command)."""
+        stats = cls()
+        for path in paths:
+            stats.append(path, os.stat(path))
+        return stats
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __iter__(self):
+        """Yields (path, bytes, mtime_ns)."""
+        return zip(self.paths, self.bytes, self.mtime_ns)
+
+    def sorted(self):
+        """Returns a copy ordered by path."""
+        result = FileStats()
+        result.extensions = list(self.extensions)
+        result._ext_index = dict(self._ext_index)
+        for i in sorted(range(len(self.paths)), key=self.paths.__getitem__):
+            result.paths.append(self.paths[i])
+            result.bytes.append(self.bytes[i])
+            result.mtime_ns.append(self.mtime_ns[i])
+            result.modes.append(self.modes[i])
+            result.devs.append(self.devs[i])
+            result.inodes.append(self.inodes[i])
+            result.ext_ids.append(self.ext_ids[i])
+        return result
+
+    def stat_key(self, i: int):
+        """The (dev, inode, size, mtime_ns) key of file `i`, as used by the hash cache."""
+        return [self.devs[i], self.inodes[i], self.bytes[i], self.mtime_ns[i]]
+
+    def is_executable(self, i: int):
+        return bool(self.modes[i] & 0o111)
+
+    @property
+    def total_bytes(self):
+        return sum(self.bytes)
+
+    def by_extension(self):
+        """Returns {extension: {"files": count, "bytes": total}} sorted by total size."""
+        counts = [0] * len(self.extensions)
+        totals = [0] * len(self.extensions)
+        for ext_id, size in zip(self.ext_ids, self.bytes):
+            counts[ext_id] += 1
+            totals[ext_id] += size
+        order = sorted((i for i in range(len(self.extensions)) if counts[i]), key=lambda i: (-totals[i], self.extensions[i]))
+        return {self.extensions[i]: {"files": counts[i], "bytes": totals[i]} for i in order}
+
+    def size_histogram(self):
+        """Returns {bucket label: {"files": count, "bytes": total}} from small to large files."""
+        counts = [0] * len(_HISTOGRAM_LABELS)
+        totals = [0] * len(_HISTOGRAM_LABELS)
+        for size in self.bytes:
+            bucket = bisect.bisect_right(_HISTOGRAM_BOUNDS, size)
+            counts[bucket] += 1
+            totals[bucket] += size
+        return {label: {"files": counts[i], "bytes": totals[i]} for i, label in enumerate(_HISTOGRAM_LABELS)}
+
+
+def scan_files(root: str, ignore_spec=None, skip_hidden: bool = False):
+    """
+    Walks `root` with os.scandir and records every file's stats once.
+
+    Args:
+        root (str): Folder (or single file) to scan.
+        ignore_spec (PathSpec): Optional gitwildmatch spec matched against paths relative to `root`.
+        skip_hidden (bool): Skip files and folders starting with '.'.
+
+    Returns:
+        FileStats: The files, in scan order.
+    """
+    stats = FileStats()
+    if os.path.isfile(root):
+        stats.append(root, os.stat(root))
+        return stats
+
+    stack = [(root, "")]
+    while stack:
+        folder, rel_folder = stack.pop()
+        try:
+            with os.scandir(folder) as it:
+                for entry in it:
+                    if skip_hidden and entry.name.startswith("."):
+                        continue
+                    rel = f"{rel_folder}{entry.name}"
+                    try:
+                        if entry.is_dir():
+                            if entry.is_symlink():
+                                continue  # Folder symlinks are not followed (as in os.walk)
+                            if ignore_spec is None or not ignore_spec.match_file(rel + "/"):
+                                stack.append((entry.path, rel + "/"))
+                        elif ignore_spec is None or not ignore_spec.match_file(rel):
+                            stats.append(entry.path, entry.stat())
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return stats
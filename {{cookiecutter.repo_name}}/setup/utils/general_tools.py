@@ -10,6 +10,10 @@ import pathlib
 import getpass
 import importlib.metadata
 import json
+import hashlib
+import sysconfig
+import re
+import time
 
 
 def set_packages(version_control,programming_language):
@@ -55,57 +59,303 @@ def install_uv():
         except subprocess.CalledProcessError as e:
             print(f"Failed to install 'uv' via pip: {e}")
 
-def package_installer(required_libraries: list = None, pip_install: bool = False):
-    if not required_libraries:
+# Environment fingerprints that are known to satisfy a set of required libraries
+_package_stamp = None
+
+def _package_stamp_file():
+    return pathlib.Path(__file__).resolve().parent.parent.parent / "bin" / "package_stamp.json"
+
+def environment_fingerprint(required_libraries: list):
+    """
+    Computes a fingerprint of the current Python environment and a set of required libraries.
+
+    The fingerprint combines the interpreter path and version, the mtimes of the
+    site-packages directories (which change whenever a distribution is installed or
+    removed) and the required package set. Computing it only costs a few `os.stat` calls.
+
+    Args:
+        required_libraries (list): Requirement strings passed to `package_installer`.
+
+    Returns:
+        str: Hex digest identifying the environment/requirement combination.
+    """
+    site_dirs = {sysconfig.get_paths().get("purelib"), sysconfig.get_paths().get("platlib")}
+    site_dirs.update(p for p in sys.path if os.path.basename(p) in ("site-packages", "dist-packages"))
+
+    site_mtimes = []
+    for site_dir in sorted(d for d in site_dirs if d):
+        try:
+            site_mtimes.append((site_dir, os.stat(site_dir).st_mtime_ns))
+        except OSError:
+            continue
+
+    payload = json.dumps({
+        "executable": sys.executable,
+        "version": sys.version,
+        "site_packages": site_mtimes,
+        "required": sorted(set(required_libraries)),
+    }, sort_keys=True)
+
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def load_package_stamp():
+    """Loads the set of satisfied environment fingerprints from ./bin/package_stamp.json (once per process)."""
+    global _package_stamp
+    if _package_stamp is None:
+        _package_stamp = set()
+        try:
+            with open(_package_stamp_file(), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("executable") == sys.executable:
+                _package_stamp = set(data.get("fingerprints", []))
+        except (OSError, ValueError, AttributeError):
+            pass
+    return _package_stamp
+
+def save_package_stamp(fingerprint: str):
+    """Records a satisfied environment fingerprint in ./bin/package_stamp.json."""
+    fingerprints = load_package_stamp()
+    if fingerprint in fingerprints:
         return
+    fingerprints.add(fingerprint)
 
+    stamp_file = _package_stamp_file()
     try:
-        installed_pkgs = {
-            name.lower()
-            for dist in importlib.metadata.distributions()
-            if (name := dist.metadata.get("Name")) is not None
-        }
+        stamp_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = stamp_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({"executable": sys.executable, "fingerprints": sorted(fingerprints)}, f, indent=2)
+        os.replace(tmp_file, stamp_file)
+    except OSError:
+        pass  # The stamp is only an optimisation
+
+_REQUIREMENT_RE = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(\[[^\]]*\])?\s*([^;]*)(?:;(.*))?$")
+
+def normalize_package_name(name: str):
+    """Normalizes a distribution name as described in PEP 503 (e.g. 'Py_YAML' -> 'py-yaml')."""
+    return re.sub(r"[-_.]+", "-", name).lower().strip()
+
+def _packaging():
+    """Returns the 'packaging' modules (standalone or vendored by pip), or None."""
+    try:
+        from packaging.requirements import Requirement
+        from packaging.version import Version
+    except ImportError:
+        try:
+            from pip._vendor.packaging.requirements import Requirement
+            from pip._vendor.packaging.version import Version
+        except ImportError:
+            return None
+    return Requirement, Version
+
+def parse_requirement(requirement: str):
+    """
+    Splits a requirement string into its normalized name, version specifier and environment marker.
+
+    Returns:
+        tuple | None: (name, specifier, marker) or None if the string is not a requirement.
+    """
+    match = _REQUIREMENT_RE.match(requirement)
+    if not match:
+        return None
+    name, _, specifier, marker = match.groups()
+    return normalize_package_name(name), specifier.strip(), (marker or "").strip()
+
+def installed_distributions():
+    """Returns a mapping of PEP 503 normalized distribution name to installed version."""
+    installed = {}
+    for dist in importlib.metadata.distributions():
+        name = dist.metadata.get("Name")
+        if name:
+            installed.setdefault(normalize_package_name(name), dist.version)
+    return installed
+
+def requirement_satisfied(requirement: str, installed_version: str):
+    """
+    Checks an installed version against the specifier of a requirement.
+
+    Uses 'packaging' when available (it ships with pip), otherwise only '==' pins are compared.
+    """
+    if installed_version is None:
+        return False
+
+    packaging = _packaging()
+    if packaging:
+        Requirement, Version = packaging
+        try:
+            return Requirement(requirement).specifier.contains(Version(installed_version), prereleases=True)
+        except Exception:
+            pass
+
+    _, specifier, _ = parse_requirement(requirement)
+    if specifier.startswith("==") and "," not in specifier:
+        return specifier[2:].strip() == installed_version
+    return True
+
+def _marker_applies(requirement: str):
+    packaging = _packaging()
+    if not packaging:
+        return True
+    try:
+        marker = packaging[0](requirement).marker
+    except Exception:
+        return True
+    return marker is None or marker.evaluate()
+
+def plan_installs(required_libraries: list, installed: dict = None):
+    """
+    Compares requirement strings with the installed distributions.
+
+    Args:
+        required_libraries (list): Requirement strings, e.g. ['pyyaml', 'dvc[all]', 'numpy>=1.24'].
+        installed (dict): Optional result of `installed_distributions()`.
+
+    Returns:
+        list: One dict per unique requirement with 'requirement', 'name', 'installed' and
+        'action' ('ok', 'install', 'upgrade', 'skip' or 'invalid').
+    """
+    if installed is None:
+        installed = installed_distributions()
+
+    plan = []
+    seen = set()
+    for requirement in required_libraries:
+        requirement = requirement.strip()
+        if not requirement or requirement in seen:
+            continue
+        seen.add(requirement)
+
+        parsed = parse_requirement(requirement)
+        if not parsed:
+            plan.append({"requirement": requirement, "name": None, "installed": None, "action": "invalid"})
+            continue
+
+        name = parsed[0]
+        installed_version = installed.get(name)
+        if parsed[2] and not _marker_applies(requirement):
+            action = "skip"
+        elif installed_version is None:
+            action = "install"
+        elif requirement_satisfied(requirement, installed_version):
+            action = "ok"
+        else:
+            action = "upgrade"
+        plan.append({"requirement": requirement, "name": name, "installed": installed_version, "action": action})
+    return plan
+
+def print_install_plan(plan: list):
+    print(f"{'Requirement':<40} {'Installed':<15} Action")
+    for item in plan:
+        print(f"{item['requirement']:<40} {item['installed'] or '-':<15} {item['action']}")
+
+def wheelhouse_dir(wheel_dir: str = "./bin/wheels"):
+    """Returns the project wheelhouse folder if it contains any wheels, otherwise None."""
+    wheel_dir = pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path(wheel_dir)
+    try:
+        with os.scandir(wheel_dir) as entries:
+            if any(entry.name.endswith(".whl") for entry in entries):
+                return str(wheel_dir)
+    except OSError:
+        pass
+    return None
+
+def _run_install(requirements: list, pip_install: bool = False):
+    """
+    Installs a batch of requirements in one uv transaction, falling back to one pip transaction.
+
+    If the project has a wheelhouse (see `env cache`), an offline install from it is tried first.
+    """
+    wheels = wheelhouse_dir()
+    attempts = ([["--no-index", "--find-links", wheels]] if wheels else []) + [[]]
+
+    if not pip_install:
+        for extra_args in attempts:
+            try:
+                subprocess.run([sys.executable, "-m", "uv", "pip", "install"] + extra_args + requirements, check=True, stderr=subprocess.DEVNULL)
+                return True
+            except (OSError, subprocess.CalledProcessError):
+                continue
+        print("uv failed to install the batch. Trying pip fallback...")
+
+    for extra_args in attempts:
+        try:
+            subprocess.run([sys.executable, "-m", "pip", "install"] + extra_args + requirements, check=True, stderr=subprocess.DEVNULL)
+            return True
+        except (OSError, subprocess.CalledProcessError):
+            continue
+    return False
+
+def install_requirements(requirements: list, pip_install: bool = False):
+    """
+    Installs requirements in a single resolver transaction. If it fails, the batch is
+    bisected so the installable requirements still go in and the failing ones are reported.
+
+    Returns:
+        list: Requirements that could not be installed.
+    """
+    if not requirements:
+        return []
+
+    if _run_install(requirements, pip_install):
+        return []
+
+    if len(requirements) == 1:
+        print(f"Failed to install {requirements[0]}")
+        return list(requirements)
+
+    middle = len(requirements) // 2
+    return install_requirements(requirements[:middle], pip_install) + install_requirements(requirements[middle:], pip_install)
+
+def package_installer(required_libraries: list = None, pip_install: bool = False, dry_run: bool = False):
+    """
+    Installs the missing or outdated libraries of `required_libraries` in one batched transaction.
+
+    Args:
+        required_libraries (list): Requirement strings.
+        pip_install (bool): Use pip instead of uv.
+        dry_run (bool): Print the install plan without installing anything.
+
+    Returns:
+        list: Requirements that failed to install.
+    """
+    if not required_libraries:
+        return []
+
+    # Fast path: environment and requirements unchanged since the last successful check
+    fingerprint = environment_fingerprint(required_libraries)
+    if fingerprint in load_package_stamp() and not dry_run:
+        return []
+
+    try:
+        plan = plan_installs(required_libraries)
     except Exception as e:
         print(f"Error checking installed packages: {e}")
-        return
+        return []
 
-    missing_libraries = []
-    for lib in required_libraries:
-        norm_name = (
-            lib.split("==")[0]
-               .split(">=")[0]
-               .split("<=")[0]
-               .split("~=")[0]
-               .strip()
-               .lower()
-        )
-        if norm_name not in installed_pkgs:
-            missing_libraries.append(lib)
+    to_install = [item["requirement"] for item in plan if item["action"] in ("install", "upgrade")]
 
-    if not missing_libraries:
-        return
+    if dry_run:
+        print_install_plan(plan)
+        return []
 
-    print(f"Installing missing libraries: {missing_libraries}")
+    if not to_install:
+        save_package_stamp(fingerprint)
+        return []
 
-    install_uv()
+    print(f"Installing missing libraries: {to_install}")
 
-    for lib in missing_libraries:
-        try:
-            subprocess.run(
-                [sys.executable, "-m", "uv", "pip", "install", lib],
-                check=True,
-                stderr=subprocess.DEVNULL
-            )
-        except subprocess.CalledProcessError:
-            print(f"uv failed to install {lib}. Trying pip fallback...")
-            try:
-                subprocess.run(
-                    [sys.executable, "-m", "pip", "install", lib],
-                    check=True,
-                    stderr=subprocess.DEVNULL
-                )
-            except subprocess.CalledProcessError as e:
-                print(f"Failed to install {lib} with pip: {e}")
+    if not pip_install:
+        install_uv()
+
+    start = time.perf_counter()
+    failed = install_requirements(to_install, pip_install)
+    print(f"Installed {len(to_install) - len(failed)} of {len(to_install)} libraries in {time.perf_counter() - start:.1f}s")
+
+    # Installing changed site-packages
+    importlib.invalidate_caches()
+    if not failed:
+        save_package_stamp(environment_fingerprint(required_libraries))
+    return failed
 
 def package_installer_old(required_libraries: list = None, pip_install: bool = False):
     
@@ -182,6 +432,105 @@ def check_path_format(path, project_root=None):
 
     return path
 
+class ProjectEnv:
+    """
+    In-process cache of a dotenv-style file such as `.env` or `.cookiecutter`.
+
+    The file is parsed once and re-parsed only when its mtime or size changes.
+    Values are returned already passed through `check_path_format`.
+    """
+
+    def __init__(self, env_file: str = ".env"):
+        self.env_file = env_file
+        self.path = None
+        self._stat_key = None
+        self._values = {}
+
+    def _resolve(self):
+        path = pathlib.Path(self.env_file)
+        try:
+            return path, os.stat(path)
+        except OSError:
+            path = pathlib.Path(__file__).resolve().parent.parent.parent / path.name
+            try:
+                return path, os.stat(path)
+            except OSError:
+                return path, None
+
+    def values(self):
+        """Returns all variables of the file, re-parsing it only if it changed on disk."""
+        path, stat = self._resolve()
+        stat_key = (str(path), stat.st_mtime_ns, stat.st_size) if stat else (str(path), None, None)
+
+        if stat_key != self._stat_key:
+            self.path = path
+            self._stat_key = stat_key
+            self._values = {}
+            if stat:
+                self._values = {
+                    name.upper(): check_path_format(value)
+                    for name, value in dotenv_values(path).items()
+                }
+                # Keep os.environ in sync with the file as load_dotenv(override=True) did per lookup before
+                load_dotenv(path, override=True)
+        return self._values
+
+    def get(self, env_var: str):
+        return self.values().get(env_var.upper())
+
+    def save(self, values: dict):
+        """
+        Saves or updates several variables with a single read-modify-write of the file.
+
+        Args:
+            values (dict): Mapping of variable name (case-insensitive) to value. None values are skipped.
+        """
+        updates = {
+            name.strip().upper(): check_path_format(value)
+            for name, value in values.items()
+            if value is not None
+        }
+        if not updates:
+            return
+
+        path, stat = self._resolve()
+
+        # Read the existing file if it exists
+        env_lines = []
+        if stat:
+            with open(path, "r") as file:
+                env_lines = file.readlines()
+
+        # Update existing variables (case-insensitive), first match only
+        pending = dict(updates)
+        for i, line in enumerate(env_lines):
+            if "=" in line:
+                existing_name, _ = line.split("=", 1)
+                existing_name = existing_name.strip().upper()
+                if existing_name in pending:
+                    env_lines[i] = f"{existing_name}={pending.pop(existing_name)}\n"
+
+        # Append the variables that do not exist yet
+        for name, value in pending.items():
+            if env_lines and not env_lines[-1].endswith("\n"):
+                env_lines[-1] += "\n"
+            env_lines.append(f"{name}={value}\n")
+
+        with open(path, "w") as file:
+            file.writelines(env_lines)
+
+        # Force a re-parse on the next lookup (mtime resolution can be coarse)
+        self._stat_key = None
+
+_project_envs = {}
+
+def get_project_env(env_file: str = ".env"):
+    """Returns the shared `ProjectEnv` instance for an env file name."""
+    project_env = _project_envs.get(env_file)
+    if project_env is None:
+        project_env = _project_envs[env_file] = ProjectEnv(env_file)
+    return project_env
+
 def load_from_env(env_var: str, env_file: str = ".env"):
     """
     Loads an environment variable's value from a .env file.
@@ -194,21 +543,12 @@ def load_from_env(env_var: str, env_file: str = ".env"):
         str or None: The value of the environment variable if found, otherwise None.
     """
 
-    env_file = pathlib.Path(env_file)
-    if not env_file.exists():
-        env_file = pathlib.Path(__file__).resolve().parent.parent.parent / env_file.name
-
-    # Attempt to read directly from the .env file
-    if env_file.exists():
-        env_values = dotenv_values(env_file)
-        if env_var.upper() in env_values:
-            env_value = env_values[env_var.upper()]
-            env_value = check_path_format(env_value) 
-            return env_value
-    
+    # Attempt to read from the cached .env file
+    env_value = get_project_env(env_file).get(env_var)
+    if env_value is not None:
+        return env_value
 
-    # If not found directly, load the .env file into the environment
-    load_dotenv(env_file, override=True)
+    # If not found in the file, fall back to the process environment
     env_value = os.getenv(env_var.upper())
     if env_value:
         env_value = check_path_format(env_value) 
@@ -228,101 +568,206 @@ def save_to_env(env_var: str, env_name: str, env_file: str = ".env"):
     """
     if env_var is None:
         return
+
+    get_project_env(env_file).save({env_name: env_var})
+
+def save_dict_to_env(values: dict, env_file: str = ".env"):
+    """
+    Saves or updates several environment variables in a .env file with a single write.
     
-    # Standardize the variable name for comparison
-    env_name_upper = env_name.strip().upper()
+    Args:
+        values (dict): Mapping of variable name (case-insensitive) to value. None values are skipped.
+        env_file (str): The path to the .env file. Defaults to ".env".
+    """
+    get_project_env(env_file).save(values)
 
-    env_var = check_path_format(env_var) 
+class ToolRegistry:
+    """
+    Session-wide registry of external executables (git, rclone, conda, datalad, R, ...).
 
-    env_file = pathlib.Path(env_file)
-    if not env_file.exists():
-        env_file = pathlib.Path(__file__).resolve().parent.parent.parent / env_file.name
+    Each executable is resolved once per session from .env or PATH. Versions are queried
+    once and cached in ./bin/tool_registry.json, keyed on the executable's size and mtime,
+    and the file is only rewritten when an entry changes.
+    """
 
-    # Read the existing .env file if it exists
-    env_lines = []
-    if env_file.exists():
-        with open(env_file, 'r') as file:
-            env_lines = file.readlines()
-
-    # Check if the variable exists (case-insensitive) and update it
-    variable_exists = False
-    for i, line in enumerate(env_lines):
-        # Split each line to isolate the variable name
-        if "=" in line:
-            existing_name, _ = line.split("=", 1)
-            if existing_name.strip().upper() == env_name_upper:
-                env_lines[i] = f"{env_name_upper}={env_var}\n"  # Preserve original case in name
-                variable_exists = True
-                break
-
-    # If the variable does not exist, append it
-    if not variable_exists:
-        env_lines.append(f"{env_name_upper}={env_var}\n")
-    
-    # Write the updated lines back to the file
-    with open(env_file, 'w') as file:
-        file.writelines(env_lines)
+    def __init__(self, registry_file: str = "./bin/tool_registry.json"):
+        self.registry_file = pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path(registry_file)
+        self._paths = {}
+        self._versions = None
+
+    def _load_versions(self):
+        if self._versions is None:
+            self._versions = {}
+            if self.registry_file.exists():
+                try:
+                    with open(self.registry_file, "r", encoding="utf-8") as f:
+                        self._versions = json.load(f)
+                except (OSError, json.JSONDecodeError):
+                    self._versions = {}
+        return self._versions
+
+    def _save_versions(self):
+        self.registry_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.registry_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(self._versions, f, indent=2)
+        os.replace(tmp_file, self.registry_file)
+
+    def lookup(self, executable: str):
+        """Returns the cached full path of an executable if it still exists, otherwise None."""
+        exe_path = self._paths.get(executable)
+        if exe_path and os.path.isfile(exe_path):
+            return exe_path
+        self._paths.pop(executable, None)
+        return None
+
+    def register(self, executable: str, folder: str):
+        """Records the folder an executable was resolved in. Returns the full path or None."""
+        exe_path = shutil.which(executable, path=folder)
+        if exe_path:
+            self._paths[executable] = os.path.abspath(exe_path)
+        return exe_path
+
+    def forget(self, executable: str):
+        self._paths.pop(executable, None)
+
+    def cached_version(self, name: str, exe_path: str):
+        """
+        Returns the cached version of `name` at `exe_path` if the executable is unchanged.
+
+        Returns:
+            tuple: (found, version); `found` is False if the version has to be probed again.
+        """
+        try:
+            stat = os.stat(exe_path)
+        except OSError:
+            return False, None
+        entry = self._load_versions().get(f"{name}:{os.path.abspath(exe_path)}")
+        if entry and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            return True, entry.get("version")
+        return False, None
+
+    def store_version(self, name: str, exe_path: str, version: str):
+        """Caches the version of `name` at `exe_path`; the registry file is only rewritten when the entry changes."""
+        try:
+            stat = os.stat(exe_path)
+        except OSError:
+            return
+        versions = self._load_versions()
+        key = f"{name}:{os.path.abspath(exe_path)}"
+        entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "version": version}
+        if versions.get(key) != entry:
+            versions[key] = entry
+            try:
+                self._save_versions()
+            except OSError:
+                pass  # The cache is only an optimisation
+
+    def version(self, executable: str, args: list = None):
+        """
+        Returns the first line printed by '<executable> --version', cached across sessions.
+
+        Returns:
+            str | None: The version string, or None if the executable is not available.
+        """
+        exe_path = self.lookup(executable) or shutil.which(executable)
+        if not exe_path:
+            return None
+
+        found, version = self.cached_version(executable, exe_path)
+        if found:
+            return version
+
+        try:
+            output = subprocess.run([exe_path] + (args or ["--version"]), capture_output=True, text=True, timeout=30)
+            lines = (output.stdout or output.stderr).strip().splitlines()
+            version = lines[0].strip() if lines else None
+        except (OSError, subprocess.SubprocessError):
+            version = None
+
+        self.store_version(executable, exe_path, version)
+        return version
+
+_tool_registry = None
+
+def get_tool_registry():
+    """Returns the session-wide `ToolRegistry`."""
+    global _tool_registry
+    if _tool_registry is None:
+        _tool_registry = ToolRegistry()
+    return _tool_registry
+
+def tool_version(executable: str):
+    """Returns the cached '--version' output of an executable, or None if it is not installed."""
+    return get_tool_registry().version(executable)
+
+def _add_to_profile_path(path: str):
+    """Persists a folder on PATH, skipping the write if the profile already contains it."""
+    if platform.system().lower() == "windows":
+        # Use setx to set the environment variable permanently in Windows
+        subprocess.run(["setx", "PATH", f"{path};%PATH%"], check=True)
+        return
+
+    # On macOS/Linux, add the path to the shell profile file
+    profile_file = os.path.expanduser("~/.bashrc")  # or ~/.zshrc depending on the shell
+    export_line = f'export PATH="{path}:$PATH"'
+    if os.path.exists(profile_file):
+        with open(profile_file, "r") as file:
+            if any(line.strip() == export_line for line in file):
+                return
+    with open(profile_file, "a") as file:
+        file.write(f"\n{export_line}")
 
 def exe_to_path(executable: str = None, path: str = None, env_file: str = ".env"):
     """
     Adds the path of an executable binary to the system PATH permanently.
-    """
 
-    env_file = pathlib.Path(env_file)
-    if not env_file.exists():
-        env_file = pathlib.Path(__file__).resolve().parent.parent.parent / env_file.name
+    The shell profile and .env are only written when the path is not already recorded,
+    and the executable is registered in the session-wide `ToolRegistry`.
+    """
+    if not executable or not path:
+        print("Executable and path must be provided.")
+        return False
 
     # Ensure it's an absolute path
     path = os.path.abspath(path)
 
-    os_type = platform.system().lower()
-    
-    if not executable or not path:
-        print("Executable and path must be provided.")
+    if not os.path.exists(path):
+        print(f"{executable}: path does not exist: {path}")
         return False
 
-    if os.path.exists(path):
-        # Add to current session PATH
+    # Add to current session PATH
+    session_paths = [os.path.normcase(os.path.normpath(p)) for p in os.environ.get("PATH", "").split(os.pathsep) if p]
+    if os.path.normcase(path) not in session_paths:
         os.environ["PATH"] += os.pathsep + path
+        _add_to_profile_path(path)
 
-        if os_type == "windows":
-            # Use setx to set the environment variable permanently in Windows
-            subprocess.run(["setx", "PATH", f"{path};%PATH%"], check=True)
-        else:
-            # On macOS/Linux, add the path to the shell profile file
-            profile_file = os.path.expanduser("~/.bashrc")  # or ~/.zshrc depending on the shell
-            with open(profile_file, "a") as file:
-                file.write(f'\nexport PATH="{path}:$PATH"')
-            # Immediately apply the change for the current script/session (only works if you're in a shell)
-            subprocess.run(f'source {profile_file}', shell=True, executable='/bin/bash')
-        
-        # Check if executable is found in the specified path
-        resolved_path = shutil.which(executable)
-        
-        if resolved_path:
-            resolved_path= os.path.abspath(resolved_path)
-            resolved_path = os.path.dirname(resolved_path)
-            
-        if resolved_path == path:
-            print(f"{executable} binary is added to PATH and resolved correctly: {path}")
-            path = get_relative_path(path)
-            save_to_env(path, executable.upper())
-            load_dotenv(env_file, override=True)
-            return True
-        elif resolved_path:
-            print(f"{executable} binary available at a wrong path: {resolved_path}")
-            print(f"Instead of: {path}")
-            resolved_path = get_relative_path(resolved_path)
-            save_to_env(resolved_path, executable.upper())
-            load_dotenv(env_file, override=True)
-            return True
-        else:
-            print(f"{executable} binary is not found in the specified PATH: {path}")
-            return False
+    # Check if executable is found in the specified path
+    resolved_path = shutil.which(executable)
+
+    if resolved_path:
+        resolved_path = os.path.dirname(os.path.abspath(resolved_path))
+
+    if resolved_path == path:
+        message = f"{executable} binary is added to PATH and resolved correctly: {path}"
+    elif resolved_path:
+        print(f"{executable} binary available at a wrong path: {resolved_path}")
+        print(f"Instead of: {path}")
+        message = None
     else:
-        print(f"{executable}: path does not exist: {path}")
+        print(f"{executable} binary is not found in the specified PATH: {path}")
         return False
 
+    get_tool_registry().register(executable, resolved_path)
+
+    # Only write .env when the recorded path changes
+    relative_path = get_relative_path(resolved_path)
+    if load_from_env(executable, env_file) != check_path_format(relative_path):
+        if message:
+            print(message)
+        save_to_env(relative_path, executable.upper(), env_file)
+    return True
+
 def remove_from_env(path: str):
     """
     Removes a specific path from the system PATH for the current session and permanently if applicable.
@@ -416,26 +861,37 @@ def exe_to_env(executable: str = None, path: str = None, env_file: str = ".env")
         return False
 
 def is_installed(executable: str = None, name: str = None):
-    
+    """
+    Checks whether an executable is available, resolving it once per session.
+
+    Returns:
+        bool: True if the executable was found (and is on PATH), False otherwise.
+    """
     if name is None:
         name = executable
 
     # Check if both executable and name are provided as strings
     if not isinstance(executable, str) or not isinstance(name, str):
         raise ValueError("Both 'executable' and 'name' must be strings.")
-    
+
+    registry = get_tool_registry()
+    if registry.lookup(executable):
+        return True
+
     path = load_from_env(executable)
     if path:
         path = os.path.abspath(path)
 
     if path and os.path.exists(path):
-        return exe_to_path(executable, path)    
+        if exe_to_path(executable, path):
+            return True
     elif path and not os.path.exists(path):
         remove_from_env(path)
 
     if shutil.which(executable):
         return exe_to_path(executable, os.path.dirname(shutil.which(executable)))
     else:
+        registry.forget(executable)
         print(f"{name} is not on Path")
         return False
 
@@ -455,42 +911,94 @@ def get_relative_path(target_path):
     return target_path
     
 #Check software
+_KERNEL_HANDOFF_VAR = "SETUP_KERNEL_HANDOFF"
+_kernel_paths = {}
+
+def resolve_kernel_path(python_kernel: str):
+    """
+    Resolves the interpreter path stored in PYTHON (a folder or an executable) to an executable path.
+
+    The result is cached per process, so repeated checks cost a dictionary lookup.
+    """
+    if not python_kernel:
+        return None
+
+    kernel_path = _kernel_paths.get(python_kernel)
+    if kernel_path is None:
+        py_exe = "python.exe" if platform.system().lower() == "windows" else "python"
+        kernel_path = python_kernel
+        # If the kernel path doesn't contain "python.exe", append it
+        if not kernel_path.endswith(py_exe):
+            kernel_path = os.path.join(kernel_path, py_exe)
+        kernel_path = _kernel_paths[python_kernel] = os.path.normcase(os.path.abspath(kernel_path))
+    return kernel_path
+
+def kernel_mismatch(python_kernel: str):
+    """Returns True if the running interpreter is not the one stored in PYTHON."""
+    kernel_path = resolve_kernel_path(python_kernel)
+    if not kernel_path:
+        return False
+
+    # sys.executable is already an executable (possibly python3 or python3.11); only normalize it
+    current_executable = os.path.normcase(os.path.abspath(sys.executable))
+    return current_executable != kernel_path and os.path.dirname(current_executable) != os.path.dirname(kernel_path)
+
+def _handoff_command(python_kernel: str, module_name: str):
+    """Builds the command line that re-runs the current entry point with another interpreter."""
+    # Under 'python -m utils.X', sys.argv[0] is the module's file, which cannot run as a plain script
+    main_spec = getattr(sys.modules.get("__main__"), "__spec__", None)
+    if main_spec is not None and main_spec.name:
+        return [python_kernel, "-m", main_spec.name] + sys.argv[1:]
+
+    entry_point = sys.argv[0] if sys.argv else ""
+    if entry_point and entry_point not in ("-c", "-m") and os.path.isfile(entry_point):
+        # Console script wrapper
+        return [python_kernel, os.path.abspath(entry_point)] + sys.argv[1:]
+    return [python_kernel, "-m", module_name] + sys.argv[1:]
+
 def ensure_correct_kernel(func):
-    """Decorator to ensure the function runs with the correct Python kernel."""
+    """
+    Decorator to ensure the function runs with the correct Python kernel.
+
+    If the running interpreter is not the one stored in PYTHON, the original entry point
+    (sys.argv[0]) is re-executed with it through os.execv, so no parent process is kept alive.
+    """
     @wraps(func)
     def wrapper(*args, **kwargs):
         python_kernel = load_from_env("PYTHON")  # Load the desired kernel path from the environment
-        
-        # If no specific kernel is set, just run the function normally
-        if not python_kernel:
+
+        # If no specific kernel is set, or it is already running, just run the function normally
+        if not python_kernel or not kernel_mismatch(python_kernel):
             return func(*args, **kwargs)
-        
-        os_type = platform.system().lower()
-        if os_type == "windows":
-            py_exe = "python.exe"
-        elif os_type == "darwin" or os_type == "linux":
-            py_exe = "python"
 
-        # If the kernel path doesn't contain "python.exe", append it
-        if not python_kernel.endswith(py_exe):
-            python_kernel = os.path.join(python_kernel, py_exe)
+        kernel_path = resolve_kernel_path(python_kernel)
+
+        # Do not hand off twice, e.g. if the kernel reports another sys.executable than its path
+        if os.environ.get(_KERNEL_HANDOFF_VAR) == kernel_path:
+            return func(*args, **kwargs)
+
+        if not os.path.isfile(kernel_path):
+            print(f"⚠️ Python kernel '{kernel_path}' was not found. Continuing with {sys.executable}.")
+            return func(*args, **kwargs)
 
-        # Get the current executable and its base folder
-        current_executable = sys.executable
-        current_base = os.path.dirname(current_executable)
-        kernel_base = os.path.dirname(python_kernel)
+        print(f"Restarting with the correct Python kernel: {kernel_path}")
 
-        # If the current Python executable does not match the required kernel, restart
-        if current_executable != python_kernel and current_base != kernel_base:
-            print(f"Restarting with the correct Python kernel: {python_kernel}")
+        command = _handoff_command(kernel_path, func.__module__)
 
-            # Re-run the script with the correct Python interpreter
-            script_path = os.path.abspath(__file__)
-            subprocess.run([python_kernel, script_path] + sys.argv[1:], check=True)
-            sys.exit()  # Terminate the current process after restarting
+        # Make the 'utils' package importable for the new interpreter
+        setup_dir = str(pathlib.Path(__file__).resolve().parent.parent)
+        env = os.environ.copy()
+        env[_KERNEL_HANDOFF_VAR] = kernel_path
+        env["PYTHONPATH"] = setup_dir + (os.pathsep + env["PYTHONPATH"] if env.get("PYTHONPATH") else "")
 
-        # If the kernel is correct, execute the function normally
-        return func(*args, **kwargs)
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        if platform.system().lower() == "windows":
+            # os.execv does not replace the process on Windows; wait for the child instead
+            sys.exit(subprocess.call(command, env=env))
+
+        os.execve(kernel_path, command, env)
 
     return wrapper
 
@@ -555,8 +1063,7 @@ def git_user_info(version_control):
         print(f"\nUsing Git user name: {git_name}")
         print(f"Using Git user email: {git_email}\n")
 
-        save_to_env(git_name, 'GIT_USER')
-        save_to_env(git_email, 'GIT_EMAIL')
+        save_dict_to_env({'GIT_USER': git_name, 'GIT_EMAIL': git_email})
         return git_name, git_email
     else:
         return None, None
@@ -612,11 +1119,13 @@ def repo_user_info(version_control, repo_name, code_repo):
                 token = getpass.getpass(f"Enter {code_repo} token: ").strip()
 
         # Save credentials and info
-        save_to_env(repo_user, user_env_key)
-        save_to_env(privacy_setting, privacy_env_key)
-        save_to_env(repo_name, repo_env_key)
-        save_to_env(token, token_env_key)
-        save_to_env(hostname, host_env_key)
+        save_dict_to_env({
+            user_env_key: repo_user,
+            privacy_env_key: privacy_setting,
+            repo_env_key: repo_name,
+            token_env_key: token,
+            host_env_key: hostname,
+        })
 
         return repo_user, privacy_setting, token, hostname
     else:
@@ -656,9 +1165,7 @@ def remote_user_info(remote_name):
         print(f"\nUsing email: {email}")
         print(f"Using base folder: {base_folder}\n")
 
-        save_to_env(email,"DEIC_EMAIL")
-        save_to_env(password,"DEIC_PASS")
-        save_to_env(base_folder,"DEIC_BASE")
+        save_dict_to_env({"DEIC_EMAIL": email, "DEIC_PASS": password, "DEIC_BASE": base_folder})
 
         return email, password, base_folder
     elif remote_name.lower() == "local":
@@ -819,58 +1326,132 @@ def set_programming_language(programming_language):
 
     return programming_language
 
-def get_version(programming_language):
-    
-    if programming_language not in ["python","pip","uv"]:
-        exe_path = load_from_env(programming_language)
-        exe_path  = check_path_format(exe_path)
-        if not exe_path:
-            return "Unknown"
-    
-    if programming_language.lower() == "python":
-        version  = f"{subprocess.check_output([sys.executable, '--version']).decode().strip()}"
-    elif programming_language.lower() == "r":
-        if not exe_path:
-            return "R"
-        version = subprocess.run([exe_path, '-e', 'cat(paste(R.version$version))'], capture_output=True, text=True)
-        version = version.stdout[0:17].strip()
-    elif programming_language.lower() == "matlab":
-        if not exe_path:
-            return "Matlab"
-        version = subprocess.run([exe_path, "-batch", "disp(version)"], capture_output=True, text=True)
-        version = f"Matlab {version.stdout.strip()}"
-    elif programming_language.lower() == "stata":
-        if not exe_path:
-            return "Stata"
-        # Extract edition based on executable name
-        edition = "SE" if "SE" in exe_path else ("MP" if "MP" in exe_path else "IC")
-        # Extract version from the folder name (e.g., Stata18 -> 18)
-        version = os.path.basename(os.path.dirname(exe_path)).replace('Stata', '')
-        # Format the output as Stata version and edition
-        version = f"Stata {version} {edition}"
-    elif programming_language.lower() == "sas": # FIX ME
-        if not exe_path:
-            return "Sas"
-        version = subprocess.run([exe_path, "-version"], capture_output=True, text=True)
-        version =version.stdout.strip()  # Returns version info
-    elif programming_language.lower() == "pip":
-        try:
-            version = subprocess.check_output(["pip", "--version"], text=True)
-            version = " ".join(version.split()[:2])    
-        except subprocess.CalledProcessError as e:
-            return "pip"
-    elif programming_language.lower() == "uv":
-        try:
-            version = subprocess.check_output(["uv", "--version"], text=True)
-            version = version.strip()  # Returns version info       
-        except subprocess.CalledProcessError as e:
-            return "uv" 
-    elif programming_language.lower() == "conda":
+# Seconds to wait for a version probe; MATLAB needs to start its runtime
+_VERSION_TIMEOUTS = {"matlab": 180, "sas": 60, "r": 60, "stata": 60}
+
+def _version_executable(programming_language: str):
+    """Returns the executable whose version `get_version` reports, or None if it is not configured."""
+    if programming_language == "python":
+        return sys.executable
+    if programming_language in ("pip", "uv"):
+        return shutil.which(programming_language)
+
+    exe_path = check_path_format(load_from_env(programming_language))
+    if not exe_path:
+        return None
+    if programming_language == "conda" and not os.path.isfile(exe_path):
+        # CONDA may hold the folder of the executable
+        return shutil.which("conda", path=exe_path) or shutil.which("conda")
+    return exe_path
+
+def _probe_version(programming_language: str, exe_path: str, timeout: float = None):
+    """
+    Runs the version probe for one tool.
+
+    Returns:
+        str | None: The version string, or None if the probe failed or timed out.
+    """
+    if timeout is None:
+        timeout = _VERSION_TIMEOUTS.get(programming_language, 30)
+
+    try:
+        if programming_language == "python":
+            version = f"Python {platform.python_version()}"
+        elif programming_language == "r":
+            version = subprocess.run([exe_path, '-e', 'cat(paste(R.version$version))'], capture_output=True, text=True, timeout=timeout)
+            version = version.stdout[0:17].strip()
+        elif programming_language == "matlab":
+            version = subprocess.run([exe_path, "-batch", "disp(version)"], capture_output=True, text=True, timeout=timeout)
+            version = f"Matlab {version.stdout.strip()}"
+        elif programming_language == "stata":
+            # Extract edition based on executable name
+            edition = "SE" if "SE" in exe_path else ("MP" if "MP" in exe_path else "IC")
+            # Extract version from the folder name (e.g., Stata18 -> 18)
+            version = os.path.basename(os.path.dirname(exe_path)).replace('Stata', '')
+            # Format the output as Stata version and edition
+            version = f"Stata {version} {edition}"
+        elif programming_language == "sas": # FIX ME
+            version = subprocess.run([exe_path, "-version"], capture_output=True, text=True, timeout=timeout)
+            version = version.stdout.strip()  # Returns version info
+        elif programming_language == "pip":
+            version = subprocess.check_output([exe_path, "--version"], text=True, timeout=timeout)
+            version = " ".join(version.split()[:2])
+        elif programming_language == "uv":
+            version = subprocess.check_output([exe_path, "--version"], text=True, timeout=timeout)
+            version = version.strip()  # Returns version info
+        elif programming_language == "conda":
+            version = subprocess.check_output([exe_path, "--version"], text=True, timeout=timeout)
+            version = version.strip()  # e.g., "conda 24.3.0"
+        else:
+            return None
+    except subprocess.TimeoutExpired:
+        print(f"⚠️ Timed out after {timeout}s while reading the {programming_language} version.")
+        return None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    return version or None
+
+def _version_fallback(programming_language: str):
+    fallbacks = {"r": "R", "matlab": "Matlab", "stata": "Stata", "sas": "Sas", "pip": "pip", "uv": "uv", "conda": "conda"}
+    return fallbacks.get(programming_language, "Unknown")
+
+def get_versions(programming_languages: list, timeout: float = None):
+    """
+    Returns the versions of several tools, probing the uncached ones concurrently.
+
+    Versions are cached in the `ToolRegistry` (./bin/tool_registry.json) and probed again
+    only after a tool is moved, upgraded or replaced.
+
+    Args:
+        programming_languages (list): Tool names, e.g. ['python', 'r', 'conda', 'pip', 'uv'].
+        timeout (float): Optional per-probe timeout in seconds.
+
+    Returns:
+        dict: Mapping of tool name to version string (or a fallback label such as 'Matlab').
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    registry = get_tool_registry()
+    versions = {}
+    pending = {}
+    for name in programming_languages:
+        key = name.lower()
+        if name in versions or name in pending:
+            continue
+        exe_path = _version_executable(key)
         if not exe_path:
-            return "conda"   
-        version = subprocess.check_output(["conda", "--version"], text=True)
-        version = version.strip()  # e.g., "conda 24.3.0"    
-    return version
+            versions[name] = "Unknown" if key not in ("pip", "uv") else key
+            continue
+        found, cached = registry.cached_version(key, exe_path)
+        if found and cached is not None:
+            versions[name] = cached
+        else:
+            pending[name] = exe_path
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+            futures = {
+                name: executor.submit(_probe_version, name.lower(), exe_path, timeout)
+                for name, exe_path in pending.items()
+            }
+        for name, future in futures.items():
+            version = future.result()
+            if version:
+                registry.store_version(name.lower(), pending[name], version)
+                versions[name] = version
+            else:
+                versions[name] = _version_fallback(name.lower())
+
+    return versions
+
+def get_version(programming_language):
+    """
+    Returns the version of a language runtime or tool, cached across sessions.
+
+    See `get_versions` for probing several tools at once.
+    """
+    return get_versions([programming_language])[programming_language]
 
 def run_script(programming_language, script_command=None):
     """
@@ -1008,11 +1589,9 @@ language_dirs = {
 }
 
 # Jinja template functions
-from jinja2 import Environment, FileSystemLoader
-
-import nbformat as nbf  # For creating Jupyter notebooks
-
 def set_jinja_templates(template_folder:str):
+
+    from jinja2 import Environment, FileSystemLoader
     
     template_env = Environment(
     loader=FileSystemLoader(str(pathlib.Path(__file__).resolve().parent / template_folder)),
@@ -1061,177 +1640,292 @@ def write_script(folder_path, script_name, extension, content):
         if isinstance(content,str):
             file.write(content)
         else:
+            import nbformat as nbf  # For creating Jupyter notebooks
             nbf.write(content, file)
 
-# Configs functions
-if load_from_env("PROGRAMMING_LANGUAGE",".cookiecutter"):
-    import pathspec
+def content_digest(content: str, ignore_pattern: str = None):
+    """SHA-256 of `content` without the parts matching `ignore_pattern` (a multiline regex, e.g. a timestamp line)."""
+    if ignore_pattern:
+        content = re.sub(ignore_pattern, "", content, flags=re.MULTILINE)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
 
-    def toml_ignore(folder: str = None, ignore_filename: str = None, tool_name: str = None, toml_path: str = "project.toml", toml_key: str = "patterns"):
-        """
-        Load ignore patterns from a file or from a TOML tool config section.
+def file_digest(file_path: str, ignore_pattern: str = None):
+    """Returns `content_digest` of a text file, or None if it cannot be read."""
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            return content_digest(f.read(), ignore_pattern)
+    except (OSError, UnicodeDecodeError):
+        return None
 
-        Returns:
-            Tuple[PathSpec | None, List[str]]: A PathSpec matcher and raw pattern list
-        """
-        # Import appropriate TOML parser
-        if sys.version_info < (3, 11):
-            import toml
-        else:
-            import tomllib as toml
+def write_if_changed(file_path: str, content: str, ignore_pattern: str = None):
+    """
+    Writes `content` to `file_path` unless the file already holds the same content, so an
+    unchanged output keeps its mtime and git, rclone and backups see nothing to do.
 
-        # Default folder fallback
-        if not folder:
-            folder = str(pathlib.Path(__file__).resolve().parent.parent.parent)
+    Args:
+        file_path (str): The output file.
+        content (str): The new content.
+        ignore_pattern (str): Multiline regex of parts that do not count as a change (e.g. r"^Timestamp: .*$").
 
-        # Try ignore file
-        if ignore_filename:
-            ignore_path = os.path.join(folder, ignore_filename)
-            if os.path.exists(ignore_path):
-                with open(ignore_path, "r", encoding="utf-8") as f:
-                    patterns = [line.strip() for line in f if line.strip() and not line.startswith("#")]
-                spec = pathspec.PathSpec.from_lines("gitwildmatch", patterns)
-                return spec, patterns
-
-        # Try TOML
-        toml_full_path = os.path.join(folder, toml_path)
-        if os.path.exists(toml_full_path):
-            try:
-                with open(toml_full_path, "r", encoding="utf-8") as f:
-                    config = toml.load(f)
-                # Try [tool.<tool_name>] first
-                patterns = config.get("tool", {}).get(tool_name)
-                if patterns is None:
-                    patterns = config.get(tool_name)
-                if isinstance(patterns, dict):
-                    patterns = patterns.get(toml_key, [])
-                if isinstance(patterns, list):
-                    patterns = [p.strip() for p in patterns if isinstance(p, str)]
-                    spec = pathspec.PathSpec.from_lines("gitwildmatch", patterns)
-                    return spec, patterns
-                else:
-                    print(f"⚠️ Patterns under [{tool_name}] are not a list.")
-            except Exception as e:
-                print(f"❌ Error reading [{tool_name}] from {toml_full_path}: {e}")
+    Returns:
+        bool: True if the file was written.
+    """
+    if file_digest(file_path, ignore_pattern) == content_digest(content, ignore_pattern):
+        return False
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    return True
 
-        return None, []
+# Configs functions
+def load_toml_file(toml_file: str):
+    """Parses a TOML file with tomllib (Python >= 3.11) or the 'toml' package."""
+    if sys.version_info < (3, 11):
+        import toml
+        with open(toml_file, "r", encoding="utf-8") as f:
+            return toml.load(f)
+    else:
+        import tomllib
+        with open(toml_file, "rb") as f:
+            return tomllib.load(f)
 
-    def toml_json(folder: str = None, json_filename: str = None, tool_name: str = None, toml_path: str = "project.toml"):
-        """
-        Load a dictionary from a JSON file, or fall back to a tool-specific section
-        in a TOML file (either under [tool.<tool_name>] or [<tool_name>]).
+_ignore_specs = {}
 
-        Args:
-            folder (str): Directory containing config files.
-            json_filename (str): Name of the JSON file to load (e.g., 'platform_rules.json').
-            tool_name (str): Tool name to look for in TOML (e.g., 'platform_rules').
-            toml_path (str): Name of the TOML file to read from.
+def compile_ignore_spec(patterns: list):
+    """
+    Compiles gitwildmatch patterns into a PathSpec, once per process for each pattern list.
 
-        Returns:
-            dict | None: Dictionary loaded from JSON or TOML, or None if both fail.
-        """
-        if sys.version_info < (3, 11):
-            import toml
-        else:
-            import tomllib as toml
+    Returns:
+        PathSpec | None: The compiled matcher, or None if no patterns are given.
+    """
+    if not patterns:
+        return None
 
-        if not folder:
-            folder = str(pathlib.Path(__file__).resolve().parent.parent.parent)
+    key = tuple(patterns)
+    spec = _ignore_specs.get(key)
+    if spec is None:
+        package_installer(required_libraries = ['pathspec'])
+        import pathspec
+        spec = _ignore_specs[key] = pathspec.PathSpec.from_lines("gitwildmatch", patterns)
+    return spec
 
-        json_path = str(os.path.join(folder, json_filename))
-        if os.path.exists(json_path):
-            try:
-                with open(json_path, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Error reading {json_filename}: {e}")
+class ProjectConfig:
+    """
+    Memoized, typed view of `project.toml` and the legacy files it replaces.
 
-        toml_path = str(os.path.join(folder, toml_path))
-        if os.path.exists(toml_path):
-            try:
-                try:
-                    with open(toml_path, "r", encoding="utf-8") as f:
-                        config = toml.load(f)
-                except Exception as e:
-                    print(f"Failed to parse TOML file {toml_path}: {e}")
-                    return None
-
-                # Try [tool.<tool_name>] first
-                section = config.get("tool", {}).get(tool_name)
-                if section is None:
-                    # Fallback to [<tool_name>] top-level
-                    section = config.get(tool_name)
-
-                if isinstance(section, dict):
-                    return section
-            except Exception as e:
-                print(f"Error reading [{tool_name}] from {toml_path}: {e}")
+    Every file is parsed once per process and re-parsed only when its mtime or size
+    changes. Legacy files (`.rcloneignore`, `.treeignore`, `platform_rules.json`,
+    `file_descriptions.json`) take precedence over `project.toml`, as before.
+    """
 
-        return None
+    def __init__(self, folder: str = None, toml_path: str = "project.toml"):
+        if not folder:
+            folder = str(pathlib.Path(__file__).resolve().parent.parent.parent)
+        self.folder = str(folder)
+        self.toml_file = os.path.join(self.folder, toml_path)
+        self._files = {}
 
+    def _load(self, file_path: str, loader):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            self._files.pop(file_path, None)
+            return None
 
-import os
-import sys
-import json
-import pathlib
+        stat_key = (stat.st_mtime_ns, stat.st_size)
+        cached = self._files.get(file_path)
+        if cached and cached[0] == stat_key:
+            return cached[1]
 
-    def write_json_to_toml(
-        data: dict,
-        folder: str = None,
-        tool_name: str = None,
-        toml_path: str = "project.toml"
-    ):
-        """
-        Write a dictionary to a TOML file under [tool.<tool_name>].
+        try:
+            value = loader(file_path)
+        except Exception as e:
+            print(f"❌ Error reading {file_path}: {e}")
+            value = None
+        self._files[file_path] = (stat_key, value)
+        return value
+
+    def invalidate(self):
+        self._files.clear()
+
+    @property
+    def data(self) -> dict:
+        return self._load(self.toml_file, load_toml_file) or {}
+
+    def section(self, tool_name: str):
+        """Returns [tool.<tool_name>], falling back to a top-level [<tool_name>] table."""
+        data = self.data
+        section = data.get("tool", {}).get(tool_name)
+        if section is None:
+            section = data.get(tool_name)
+        return section
+
+    def json_section(self, tool_name: str, json_filename: str = None) -> dict:
+        """Returns a dictionary from a legacy JSON file if present, otherwise from [tool.<tool_name>]."""
+        if json_filename:
+            json_data = self._load(os.path.join(self.folder, json_filename), _load_json_file)
+            if json_data is not None:
+                return json_data
+
+        section = self.section(tool_name)
+        return section if isinstance(section, dict) else None
+
+    def ignore_patterns(self, tool_name: str, ignore_filename: str = None, toml_key: str = "patterns") -> list:
+        """Returns ignore patterns from a legacy ignore file if present, otherwise from [tool.<tool_name>]."""
+        if ignore_filename:
+            patterns = self._load(os.path.join(self.folder, ignore_filename), _load_ignore_file)
+            if patterns is not None:
+                return patterns
+
+        patterns = self.section(tool_name)
+        if isinstance(patterns, dict):
+            patterns = patterns.get(toml_key, [])
+        if patterns is None:
+            return []
+        if not isinstance(patterns, list):
+            print(f"⚠️ Patterns under [{tool_name}] are not a list.")
+            return []
+        return [p.strip() for p in patterns if isinstance(p, str)]
+
+    def ignore_spec(self, tool_name: str, ignore_filename: str = None, toml_key: str = "patterns"):
+        return compile_ignore_spec(self.ignore_patterns(tool_name, ignore_filename, toml_key))
+
+    # Typed sections
+    @property
+    def cookiecutter(self) -> dict:
+        return self.json_section("cookiecutter") or {}
+
+    @property
+    def rcloneignore(self) -> list:
+        return self.ignore_patterns("rcloneignore", ".rcloneignore")
+
+    @property
+    def rcloneignore_spec(self):
+        return compile_ignore_spec(self.rcloneignore)
+
+    @property
+    def treeignore(self) -> list:
+        return self.ignore_patterns("treeignore", ".treeignore")
+
+    @property
+    def treeignore_spec(self):
+        return compile_ignore_spec(self.treeignore)
+
+    @property
+    def platform_rules(self) -> dict:
+        return self.json_section("platform_rules", "platform_rules.json") or {}
+
+    @property
+    def file_descriptions(self) -> dict:
+        return self.json_section("file_descriptions", "file_descriptions.json") or {}
+
+def _load_json_file(json_file: str):
+    with open(json_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _load_ignore_file(ignore_file: str):
+    with open(ignore_file, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+_project_configs = {}
+
+def get_project_config(folder: str = None, toml_path: str = "project.toml"):
+    """Returns the shared `ProjectConfig` instance for a project folder."""
+    if not folder:
+        folder = str(pathlib.Path(__file__).resolve().parent.parent.parent)
+    key = (os.path.abspath(str(folder)), toml_path)
+    config = _project_configs.get(key)
+    if config is None:
+        config = _project_configs[key] = ProjectConfig(key[0], toml_path)
+    return config
+
+def toml_ignore(folder: str = None, ignore_filename: str = None, tool_name: str = None, toml_path: str = "project.toml", toml_key: str = "patterns"):
+    """
+    Load ignore patterns from a file or from a TOML tool config section.
 
-        Args:
-            data (dict): The data to write.
-            folder (str): Base folder containing the TOML file.
-            tool_name (str): The tool section under [tool] to write to.
-            toml_path (str): The TOML filename (default: project.toml).
-        """
-        if not isinstance(data, dict):
-            raise ValueError("Data must be a dictionary")
+    Returns:
+        Tuple[PathSpec | None, List[str]]: A PathSpec matcher and raw pattern list
+    """
+    config = get_project_config(folder, toml_path)
+    patterns = config.ignore_patterns(tool_name, ignore_filename, toml_key)
+    if not patterns:
+        return None, []
+    return compile_ignore_spec(patterns), patterns
 
-        if not tool_name:
-            raise ValueError("tool_name is required")
+def toml_json(folder: str = None, json_filename: str = None, tool_name: str = None, toml_path: str = "project.toml"):
+    """
+    Load a dictionary from a JSON file, or fall back to a tool-specific section
+    in a TOML file (either under [tool.<tool_name>] or [<tool_name>]).
 
-        if not folder:
-            folder = str(pathlib.Path(__file__).resolve().parent.parent.parent)
+    Args:
+        folder (str): Directory containing config files.
+        json_filename (str): Name of the JSON file to load (e.g., 'platform_rules.json').
+        tool_name (str): Tool name to look for in TOML (e.g., 'platform_rules').
+        toml_path (str): Name of the TOML file to read from.
 
-        full_toml_path = os.path.join(folder, toml_path)
+    Returns:
+        dict | None: Dictionary loaded from JSON or TOML, or None if both fail.
+    """
+    return get_project_config(folder, toml_path).json_section(tool_name, json_filename)
+
+def write_json_to_toml(
+    data: dict,
+    folder: str = None,
+    tool_name: str = None,
+    toml_path: str = "project.toml"
+):
+    """
+    Write a dictionary to a TOML file under [tool.<tool_name>].
 
-        # Load existing TOML
-        if sys.version_info < (3, 11):
-            import toml
-            load_toml = toml.load
-            dump_toml = toml.dump
-        else:
-            import tomllib
-            import tomli_w
-            load_toml = lambda f: tomllib.load(f)
-            dump_toml = lambda data, f: f.write(tomli_w.dumps(data))
+    Args:
+        data (dict): The data to write.
+        folder (str): Base folder containing the TOML file.
+        tool_name (str): The tool section under [tool] to write to.
+        toml_path (str): The TOML filename (default: project.toml).
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Data must be a dictionary")
 
-        toml_data = {}
+    if not tool_name:
+        raise ValueError("tool_name is required")
 
-        if os.path.exists(full_toml_path):
-            with open(full_toml_path, "rb") as f:
-                try:
-                    toml_data = load_toml(f)
-                except Exception as e:
-                    print(f"⚠️ Failed to parse TOML file {toml_path}: {e}")
-                    return
+    if not folder:
+        folder = str(pathlib.Path(__file__).resolve().parent.parent.parent)
 
-        # Insert or update section
-        if "tool" not in toml_data:
-            toml_data["tool"] = {}
+    full_toml_path = os.path.join(folder, toml_path)
+
+    # Load existing TOML
+    if sys.version_info < (3, 11):
+        import toml
+        load_toml = toml.load
+        dump_toml = toml.dump
+    else:
+        import tomllib
+        import tomli_w
+        load_toml = lambda f: tomllib.load(f)
+        dump_toml = lambda data, f: f.write(tomli_w.dumps(data))
 
-        toml_data["tool"][tool_name] = data
+    toml_data = {}
 
-        # Write updated TOML
-        with open(full_toml_path, "w", encoding="utf-8") as f:
+    if os.path.exists(full_toml_path):
+        with open(full_toml_path, "rb") as f:
             try:
-                dump_toml(toml_data, f)
-                print(f"✅ Successfully wrote to [tool.{tool_name}] in {toml_path}")
+                toml_data = load_toml(f)
             except Exception as e:
-                print(f"❌ Failed to write TOML: {e}")
+                print(f"⚠️ Failed to parse TOML file {toml_path}: {e}")
+                return
+
+    # Insert or update section
+    if "tool" not in toml_data:
+        toml_data["tool"] = {}
+
+    toml_data["tool"][tool_name] = data
+
+    # Write updated TOML
+    with open(full_toml_path, "w", encoding="utf-8") as f:
+        try:
+            dump_toml(toml_data, f)
+            print(f"✅ Successfully wrote to [tool.{tool_name}] in {toml_path}")
+        except Exception as e:
+            print(f"❌ Failed to write TOML: {e}")
+
+    get_project_config(folder, toml_path).invalidate()
@@ -1,18 +1,20 @@
 import os
-import subprocess
 import ast
-import sys
-import sysconfig
+import json
+import time
+import platform
 from datetime import datetime
-import importlib
 from typing import Dict, List
 import pathlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 
 from .virenv_tools import *
-
-package_installer(required_libraries =  ['nbformat'])
-
-import nbformat
+from .hash_tools import git_hash_bytes, git_hash_file
+from .notebook_tools import extract_notebook_code
+from .import_resolver import get_import_resolver
+from .static_dependencies import static_dependencies_changed, record_static_dependencies
+from .lock_tools import write_minimal_lock
 
 def run_get_dependencies(programming_language):
     """
@@ -71,57 +73,230 @@ def resolve_parent_module(module_name):
         return module_name.split('.')[0]
     return module_name
 
-def get_setup_dependencies(folder_path: str = None, file_name: str = "dependencies.txt"):
-    
-    def extract_code_from_notebook(path):
-        code_cells = []
+def extract_code_from_notebook(path):
+    """Returns the code cells of a notebook (streamed, outputs are never loaded; see `notebook_tools`)."""
+    try:
+        return extract_notebook_code(path)
+    except (ValueError, UnicodeDecodeError) as e:
+        print(f"Could not parse notebook {path}: {e}")
+        return ""
+
+def extract_imports(code: str, filename: str = "<unknown>"):
+    """
+    Returns the sorted full dotted module names imported by Python source code.
+
+    'from a.b import c' gives 'a.b.c', so namespace packages (e.g. google.cloud) can be
+    resolved to the distribution of the subpackage; use `resolve_parent_module` for the top-level name.
+    """
+    used_packages = set()
+    tree = ast.parse(code, filename=filename)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                used_packages.add(alias.name)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            for alias in node.names:
+                used_packages.add(node.module if alias.name == "*" else f"{node.module}.{alias.name}")
+    return sorted(used_packages)
+
+def _parse_imports(item):
+    """Worker for `scan_imports`: returns (path, imports, error) for one file's content."""
+    path, data = item
+    try:
+        if data is None:
+            code = extract_code_from_notebook(path)
+        else:
+            code = data.decode("utf-8")
+        return path, extract_imports(code, filename=path), None
+    except (SyntaxError, UnicodeDecodeError, ValueError) as e:
+        return path, None, str(e)
+
+class ImportCache:
+    """
+    Persistent cache of the imports found in each script or notebook (./bin/import_cache.json).
+
+    Imports are stored per content hash, so a file is only parsed again when its content changes
+    (or when new content appears, e.g. a copied script). A per-path (size, mtime_ns) record lets
+    unchanged files skip even the read.
+    """
+
+    # Bumped when the format of the stored imports changes (2: full dotted names)
+    version = 2
+
+    def __init__(self, cache_file: str = "./bin/import_cache.json"):
+        self.cache_file = pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path(cache_file)
+        self.files = {}    # path -> {"stat": [size, mtime_ns], "hash": digest}
+        self.imports = {}  # digest -> sorted import names
+        self._dirty = False
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == self.version:
+                self.files = data.get("files", {})
+                self.imports = data.get("imports", {})
+        except (OSError, ValueError):
+            pass
+
+    def lookup(self, path: str, stat: os.stat_result):
+        record = self.files.get(path)
+        if record and record.get("stat") == [stat.st_size, stat.st_mtime_ns]:
+            return self.imports.get(record.get("hash"))
+        return None
+
+    def store(self, path: str, stat: os.stat_result, digest: str, imports: list = None):
+        record = {"stat": [stat.st_size, stat.st_mtime_ns], "hash": digest}
+        if self.files.get(path) != record:
+            self.files[path] = record
+            self._dirty = True
+        if imports is not None and self.imports.get(digest) != imports:
+            self.imports[digest] = imports
+            self._dirty = True
+
+    def save(self, keep_paths=None):
+        """Writes the cache if it changed, first dropping deleted files that are not in `keep_paths`."""
+        if keep_paths is not None:
+            keep = set(keep_paths)
+            for path in [p for p in self.files if p not in keep and not os.path.exists(p)]:
+                del self.files[path]
+                self._dirty = True
+        if not self._dirty:
+            return
+        used = {record["hash"] for record in self.files.values()}
+        self.imports = {digest: names for digest, names in self.imports.items() if digest in used}
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_suffix(".tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump({"version": self.version, "files": self.files, "imports": self.imports}, f)
+            os.replace(tmp_file, self.cache_file)
+            self._dirty = False
+        except OSError:
+            pass  # The cache is only an optimisation
+
+# Below this many changed files, parsing in-process is faster than starting worker processes
+_PROCESS_POOL_MIN_FILES = 16
+
+def scan_imports(python_files: list, max_workers: int = None, use_cache: bool = True):
+    """
+    Returns the dotted imports (see `extract_imports`) of every .py and .ipynb file.
+
+    Unchanged files are answered from the `ImportCache`; changed files are parsed in a process
+    pool (ast.parse holds the GIL, so threads would not help).
+
+    Returns:
+        tuple: ({path: sorted imports}, number of files parsed); files that cannot be parsed are left out.
+    """
+    cache = ImportCache() if use_cache else None
+    results = {}
+    pending = []
+    stats = {}
+
+    for path in python_files:
         try:
-            nb = nbformat.read(path, as_version=4)
-            for cell in nb.cells:
-                if cell.cell_type == "code":
-                    code_cells.append(cell.source)
-        except Exception as e:
-            print(f"Could not parse notebook {path}: {e}")
-        return "\n".join(code_cells)
+            stat = os.stat(path)
+            imports = cache.lookup(path, stat) if cache else None
+            if imports is not None:
+                results[path] = imports
+                continue
+
+            if path.endswith(".ipynb"):
+                # Notebooks can be large because of their outputs: hash them streamed and let the parser stream them too
+                data = None
+                digest = git_hash_file(path, size=stat.st_size)
+                if digest is None:
+                    print(f"Skipping {path}: it changed while it was read")
+                    continue
+            else:
+                with open(path, "rb") as f:
+                    data = f.read()
+                digest = git_hash_bytes(data)
+        except OSError as e:
+            # The file may also disappear between the stat and the read
+            print(f"Skipping {path} due to parse error: {e}")
+            continue
+        stats[path] = stat
+        if cache and digest in cache.imports:
+            results[path] = cache.imports[digest]
+            cache.store(path, stat, digest)
+        else:
+            pending.append((path, data, digest))
+
+    if pending:
+        items = [(path, data) for path, data, _ in pending]
+        if len(items) >= _PROCESS_POOL_MIN_FILES:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                parsed = list(executor.map(_parse_imports, items, chunksize=8))
+        else:
+            parsed = [_parse_imports(item) for item in items]
+
+        for (path, _, digest), (_, imports, error) in zip(pending, parsed):
+            if error:
+                print(f"Skipping {path} due to parse error: {error}")
+                continue
+            results[path] = imports
+            if cache:
+                cache.store(path, stats[path], digest, imports)
+
+    if cache:
+        cache.save(keep_paths=python_files)
+    return results, len(pending)
+
+# Lines of the dependencies.txt files that change on every run
+_TIMESTAMP_LINE = r"^Timestamp: .*$"
+
+def find_python_files(folder_path: str):
+    python_files = []
+    for root, dirs, files in os.walk(folder_path):
+        for file in files:
+            if file.endswith(".py") or file.endswith(".ipynb"):
+                python_files.append(os.path.join(root, file))
+    return sorted(python_files)
+
+def code_imports(folder_path: str):
+    """
+    Returns the modules imported by the scripts and notebooks in `folder_path`, leaving out
+    the folder's own modules, and whether any notebooks were found.
+    """
+    python_files = find_python_files(folder_path)
+    file_imports, _ = scan_imports(python_files)
+    imports = set()
+    for names in file_imports.values():
+        imports.update(names)
+
+    local_modules = {os.path.splitext(os.path.basename(file))[0] for file in python_files}
+    if os.path.isdir(folder_path):
+        local_modules.update(entry.name for entry in os.scandir(folder_path) if entry.is_dir())
+    has_notebooks = any(file.endswith(".ipynb") for file in python_files)
+    return {name for name in imports if resolve_parent_module(name) not in local_modules}, has_notebooks
+
+def get_setup_dependencies(folder_path: str = None, file_name: str = "dependencies.txt"):
+    """
+    Writes the dependencies of the Python files and notebooks in `folder_path` to `file_name`.
+
+    Returns:
+        bool: True if the file was written, False if its content (apart from the timestamp) is unchanged.
+    """
 
     def get_dependencies_from_file(python_files):
+        start = time.perf_counter()
+        file_imports, parsed = scan_imports(python_files)
         used_packages = set()
+        for imports in file_imports.values():
+            used_packages.update(imports)
+        print(f"Scanned {len(python_files)} file(s) ({parsed} parsed, {len(python_files) - parsed} cached) in {(time.perf_counter() - start) * 1000:.0f} ms")
 
-        for file in python_files:
-            try:
-                if file.endswith(".ipynb"):
-                    code = extract_code_from_notebook(file)
-                else:
-                    with open(file, "r", encoding="utf-8") as f:
-                        code = f.read()
-
-                tree = ast.parse(code, filename=file)
-                for node in ast.walk(tree):
-                    if isinstance(node, ast.Import):
-                        for alias in node.names:
-                            used_packages.add(resolve_parent_module(alias.name))
-                    elif isinstance(node, ast.ImportFrom) and node.module:
-                        used_packages.add(resolve_parent_module(node.module))
-
-            except (SyntaxError, UnicodeDecodeError, FileNotFoundError) as e:
-                print(f"Skipping {file} due to parse error: {e}")
-
-        # List Python standard library modules by checking files in the standard library path
-        std_lib_path = sysconfig.get_paths()["stdlib"]
-        standard_libs = []
-        for root, dirs, files in os.walk(std_lib_path):
-            for file in files:
-                if file.endswith(".py") or file.endswith(".pyc"):
-                    standard_libs.append(os.path.splitext(file)[0])
+        # Import names map to distributions, e.g. 'sklearn' -> scikit-learn and 'yaml' -> PyYAML
+        resolver = get_import_resolver()
 
         installed_packages = {}
-        for package in used_packages:
-            try:
-                version = importlib.metadata.version(package)
-                installed_packages[package] = version
-            except importlib.metadata.PackageNotFoundError:
-                if package not in standard_libs and package not in sys.builtin_module_names:
-                    installed_packages[package] = "Not available" 
+        for package in sorted(used_packages):
+            if resolver.is_stdlib(package):
+                continue
+            distributions = resolver.resolve(package)
+            for distribution, version in distributions:
+                installed_packages[distribution] = version
+            if not distributions:
+                installed_packages[resolve_parent_module(package)] = "Not available"
 
         python_script_names = {os.path.splitext(os.path.basename(file))[0] for file in python_files}
         valid_packages = {package: version for package, version in installed_packages.items()
@@ -133,41 +308,51 @@ def get_setup_dependencies(folder_path: str = None, file_name: str = "dependenci
         folder_path = os.path.dirname(os.path.abspath(__file__))
 
     print(f"Scanning folder: {folder_path}")
-    python_files = []
-    for root, dirs, files in os.walk(folder_path):
-        for file in files:
-            if file.endswith(".py") or file.endswith(".ipynb"):
-                python_files.append(os.path.join(root, file))
+    python_files = find_python_files(folder_path)
 
     if not python_files:
         print("No Python files found in the specified folder.")
-        return
+        return False
 
     installed_packages  = get_dependencies_from_file(python_files)
 
     # Write to file
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     relative_python_files = [os.path.relpath(file, folder_path) for file in python_files]
-    python_version = subprocess.check_output([sys.executable, '--version']).decode().strip()
+    python_version = f"Python {platform.python_version()}"
 
     if os.path.exists(os.path.dirname(file_name)):
         output_file = file_name
     else: 
         output_file = os.path.join(folder_path,"dependencies.txt")
     
-    with open(output_file, "w") as f:
-        f.write("Software version:\n")
-        f.write(f"{python_version}\n\n")
-        f.write(f"Timestamp: {timestamp}\n\n")
-        f.write("Files checked:\n")
-        f.write("\n".join(relative_python_files) + "\n\n")
-        f.write("Dependencies:\n")
-        for package, version in installed_packages .items():
-            f.write(f"{package}=={version}\n")
+    content = (
+        "Software version:\n"
+        f"{python_version}\n\n"
+        f"Timestamp: {timestamp}\n\n"
+        "Files checked:\n"
+        + "\n".join(relative_python_files) + "\n\n"
+        "Dependencies:\n"
+        + "".join(f"{package}=={version}\n" for package, version in installed_packages.items())
+    )
+
+    # The timestamp alone does not make the file change
+    if not write_if_changed(output_file, content, ignore_pattern=_TIMESTAMP_LINE):
+        print(f"{file_name} is unchanged.")
+        return False
 
     print(f"{file_name} successfully generated at {output_file}")
+    return True
+
+# run_script reports failures as text instead of raising
+_RUN_SCRIPT_ERRORS = ("Unknown executable path", "Error running script:", "Language ")
+
+def _runtime_succeeded(output) -> bool:
+    """Returns True if the `run_script` output is not one of its error messages."""
+    return isinstance(output, str) and not output.startswith(_RUN_SCRIPT_ERRORS)
 
 def setup_renv(programming_language,msg:str):
+    """Runs R/get_dependencies.R. Returns True if the script ran."""
     if programming_language.lower() == "r":
         # Call the setup script using the function
         script_path = make_safe_path(str(pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path("./R/get_dependencies.R")),"r")
@@ -175,9 +360,14 @@ def setup_renv(programming_language,msg:str):
         cmd = " -f " + script_path + " --args " + project_root
         output = run_script("r", cmd)
         print(output)
+        if not _runtime_succeeded(output):
+            return False
         print(msg)
+        return True
+    return False
 
 def setup_matlab(programming_language,msg:str):
+    """Runs src/get_dependencies.m. Returns True if the script ran."""
     if programming_language.lower() == "matlab":
         code_path = make_safe_path(str(pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path("./src")),"matlab")
         cmd = f"""
@@ -185,65 +375,169 @@ def setup_matlab(programming_language,msg:str):
         """
         output = run_script("matlab", cmd)
         print(output)
+        if not _runtime_succeeded(output):
+            return False
         print(msg)
+        return True
+    return False
 
 def setup_stata(programming_language,msg:str):
+    """Runs stata/do/get_dependencies.do. Returns True if the script ran."""
     if programming_language.lower() == "stata":
         # Call the setup script using the function
         script_path = make_safe_path(str(pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path("./stata/do/get_dependencies.do")),"stata")
         cmd = f"do {script_path}"
         output = run_script("stata", cmd)
         print(output)
+        if not _runtime_succeeded(output):
+            return False
         print(msg)
+        return True
+    return False
+
+def update_env_files(lock: str = "minimal"):
+    """
+    Updates requirements.txt and environment.yml, rewriting only the files whose content changed.
 
-def update_env_files():
+    Args:
+        lock (str): "minimal" pins only the packages imported in ./src and their requirements;
+            "freeze" pins the whole environment (pip freeze).
+
+    Returns:
+        dict: {file: True if it was written}.
+    """
     programming_language = load_from_env("PROGRAMMING_LANGUAGE",".cookiecutter")
     requirements_file = load_from_env("REQUIREMENT_FILE",".cookiecutter")
     repo_name = load_from_env("REPO_NAME",".cookiecutter")
-    create_requirements_txt("requirements.txt")
+    r_version = load_from_env("R_VERSION", ".cookiecutter") if programming_language.lower() == "r" else None
+
+    # Platform tags are applied in memory, so each file is written at most once
+    if lock == "minimal":
+        code_path = str(pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path("./src"))
+        imports, has_notebooks = code_imports(code_path)
+        changed = write_minimal_lock(imports, requirements_file="requirements.txt",
+                                     env_file="environment.yml" if requirements_file == "requirements.txt" else None,
+                                     r_version=r_version, include=["ipykernel"] if has_notebooks else None)
+        if requirements_file == "environment.yml":
+            # Conda environments hold non-Python packages that imports cannot reveal
+            changed["environment.yml"] = export_conda_env(repo_name, tag=True)
+        return changed
+
+    changed = {"requirements.txt": create_requirements_txt("requirements.txt", tag=True)}
     if requirements_file == "requirements.txt":
-        create_conda_environment_yml(r_version = load_from_env("R_VERSION", ".cookiecutter") if programming_language.lower() == "r" else None)
+        changed["environment.yml"] = create_conda_environment_yml(r_version = r_version, tag=True)
     elif requirements_file == "environment.yml": 
-        export_conda_env(repo_name)
-
-    tag_requirements_txt(requirements_file="requirements.txt")
-    tag_env_file(env_file = "environment.yml")
+        changed["environment.yml"] = export_conda_env(repo_name, tag=True)
+    return changed
 
 def update_setup_dependency():
+    """
+    Returns:
+        dict: {"setup/dependencies.txt": True if it was written}.
+    """
     print("Screening './setup' for dependencies")
     setup_folder = str(pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path("./setup"))
     setup_file = str(pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path("./setup/dependencies.txt"))
-    get_setup_dependencies(folder_path=setup_folder,file_name =setup_file) 
+    return {"setup/dependencies.txt": get_setup_dependencies(folder_path=setup_folder,file_name =setup_file)}
+
+def _code_dependencies_changed(programming_language: str, folder: str, force: bool = False):
+    """
+    Extracts the dependencies of the R/MATLAB/Stata code in `folder` in-process and reports
+    whether they differ from the set the language runtime was last run for.
 
-def update_code_dependency():
+    Returns:
+        tuple: (run_runtime, dependencies)
+    """
+    changed, dependencies = static_dependencies_changed(programming_language, folder)
+    if force or changed:
+        return True, dependencies
+    print(f"No dependency changes found in '{folder}' ({len(dependencies)} detected); skipping {programming_language}.")
+    return False, dependencies
+
+def update_code_dependency(force: bool = False):
+    """
+    Returns:
+        dict: {dependencies file: True if its content changed}.
+    """
     programming_language = load_from_env("PROGRAMMING_LANGUAGE",".cookiecutter")
+    project_root = pathlib.Path(__file__).resolve().parent.parent.parent
     if programming_language.lower() == "python":
         print("Screening './src' for dependencies")
-        code_path = str(pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path("./src"))
-        code_file = str(pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path("./src/dependencies.txt"))
-        get_setup_dependencies(folder_path=code_path,file_name=code_file)
-    elif programming_language.lower() == "r":
-        print("Screening './R' for dependencies")
-        setup_renv(programming_language,"/renv and .lock file has been updated")
-    elif programming_language.lower() == "matlab":
-        print("Screening './src' for dependencies")
-        #print(run_get_dependencies(programming_language))
-        setup_matlab(programming_language,"Tracking Matlab dependencies")
-    elif programming_language.lower() == "stata":
-        print("Screening './stata' for dependencies")
-        setup_stata(programming_language,"Tracking Stata dependencies")
-    else:
+        code_path = str(project_root / pathlib.Path("./src"))
+        code_file = str(project_root / pathlib.Path("./src/dependencies.txt"))
+        return {"src/dependencies.txt": get_setup_dependencies(folder_path=code_path,file_name=code_file)}
+
+    runtimes = {
+        "r": ("./R", setup_renv, "/renv and .lock file has been updated"),
+        "matlab": ("./src", setup_matlab, "Tracking Matlab dependencies"),
+        "stata": ("./stata", setup_stata, "Tracking Stata dependencies"),
+    }
+    if programming_language.lower() not in runtimes:
         print("not implemented yet")
+        return {}
+
+    folder, setup_runtime, msg = runtimes[programming_language.lower()]
+    print(f"Screening '{folder}' for dependencies")
+    code_path = str(project_root / pathlib.Path(folder))
+    code_file = os.path.join(code_path, "dependencies.txt")
+    summary_key = f"{pathlib.PurePath(folder).as_posix()}/dependencies.txt"
+    run_runtime, dependencies = _code_dependencies_changed(programming_language, code_path, force)
+    if not run_runtime:
+        return {summary_key: False}
+
+    # The scripts always rewrite their file; only a change beyond the timestamp counts
+    try:
+        old_stat = os.stat(code_file)
+        with open(code_file, "rb") as f:
+            old_bytes = f.read()
+    except OSError:
+        old_stat, old_bytes = None, None
+    before = file_digest(code_file, _TIMESTAMP_LINE)
+    if setup_runtime(programming_language, msg):
+        record_static_dependencies(programming_language, code_path, dependencies)
+    else:
+        # Not recording the set makes the next run try again
+        print(f"⚠️ The {programming_language} dependency script failed; {summary_key} may be out of date.")
+
+    changed = file_digest(code_file, _TIMESTAMP_LINE) != before
+    if not changed and before is not None:
+        # Only the timestamp moved: put the old file back so git, rclone and backups see no change
+        with open(code_file, "wb") as f:
+            f.write(old_bytes)
+        os.utime(code_file, ns=(old_stat.st_atime_ns, old_stat.st_mtime_ns))
+    return {summary_key: changed}
+
+def update_dependencies(lock: str = "minimal", force: bool = False):
+    """
+    Updates requirements.txt, environment.yml and the dependencies.txt files, writing only
+    the files whose content changed.
 
-@ensure_correct_kernel
-def main():
-    
+    Returns:
+        dict: {file: True if it changed}. Callers can skip README updates, commits and
+        backups when no value is True.
+    """
     print("Updating 'requirements.txt','environment.yml'")
-    update_env_files()
+    summary = update_env_files(lock=lock)
 
     # Run dependencies search
-    update_setup_dependency()
-    update_code_dependency()
+    summary.update(update_setup_dependency())
+    summary.update(update_code_dependency(force=force))
+
+    changed = [file for file, was_changed in summary.items() if was_changed]
+    if changed:
+        print(f"📝 Changed: {', '.join(changed)}")
+    else:
+        print("✅ All dependency files are up to date.")
+    return summary
+
+@ensure_correct_kernel
+def main():
+    parser = argparse.ArgumentParser(description="Update 'requirements.txt', 'environment.yml' and the 'dependencies.txt' files.")
+    parser.add_argument("--force", action="store_true", help="Run the R/MATLAB/Stata dependency scripts even if the statically detected dependencies are unchanged.")
+    parser.add_argument("--lock", choices=["minimal", "freeze"], default="minimal", help="Pin only the packages the code in ./src imports (minimal) or the whole environment (freeze).")
+    args = parser.parse_args()
+
+    update_dependencies(lock=args.lock, force=args.force)
 
 if __name__ == "__main__":
     # Ensure the working directory is the project root
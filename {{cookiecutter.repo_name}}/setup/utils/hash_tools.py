@@ -0,0 +1,612 @@
+import os
+import json
+import mmap
+import stat as stat_module
+import shutil
+import hashlib
+import pathlib
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+# Files smaller than this are read with a fixed-size buffer, larger ones are memory-mapped
+_MMAP_THRESHOLD = 64 * 1024 * 1024
+_BUFFER_SIZE = 1024 * 1024
+# Attempts to hash a file that keeps changing while it is read
+_HASH_ATTEMPTS = 3
+
+def git_hash_bytes(data: bytes, algorithm: str = "sha1"):
+    """
+    Returns the git blob hash of in-memory data (as 'git hash-object --stdin' does).
+
+    Args:
+        data (bytes): Content to hash.
+        algorithm (str): 'sha1' (git default) or 'sha256' (git's sha256 object format).
+
+    Returns:
+        str: Hex digest.
+    """
+    h = hashlib.new(algorithm)
+    h.update(b"blob %d\0" % len(data))
+    h.update(data)
+    return h.hexdigest()
+
+def git_hash_file(path: str, algorithm: str = "sha1", size: int = None):
+    """
+    Returns the git blob hash of a file (as 'git hash-object <file>' does without filters).
+
+    Small files are streamed through a fixed-size buffer and large files are memory-mapped.
+    hashlib releases the GIL while hashing, so several files can be hashed in parallel threads.
+
+    Args:
+        path (str): File to hash.
+        algorithm (str): 'sha1' (git default) or 'sha256'.
+        size (int): Optional file size if already known from a stat call.
+
+    Returns:
+        str | None: Hex digest, or None if the file was not `size` bytes long when read
+        (it changed after the stat), since the blob header would not match the content.
+    """
+    if size is None:
+        size = os.path.getsize(path)
+
+    h = hashlib.new(algorithm)
+    h.update(b"blob %d\0" % size)
+    read = 0
+
+    with open(path, "rb") as f:
+        if size >= _MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if len(mm) != size:
+                    return None
+                view = memoryview(mm)
+                try:
+                    for offset in range(0, size, _BUFFER_SIZE * 16):
+                        h.update(view[offset:offset + _BUFFER_SIZE * 16])
+                finally:
+                    view.release()
+                read = size
+        else:
+            buffer = bytearray(min(_BUFFER_SIZE, max(size, 1)))
+            view = memoryview(buffer)
+            while True:
+                n = f.readinto(buffer)
+                if not n:
+                    break
+                read += n
+                if read > size:
+                    return None
+                h.update(view[:n])
+
+    return h.hexdigest() if read == size else None
+
+class HashCache:
+    """
+    Persistent cache of file hashes in ./bin/hash_cache.json.
+
+    An entry is reused only while the file's (dev, inode, size, mtime_ns) is unchanged,
+    so unchanged files are never read again.
+    """
+
+    def __init__(self, cache_file: str = "./bin/hash_cache.json"):
+        self.cache_file = pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path(cache_file)
+        self._entries = None
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._batch_depth = 0
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = {}
+            try:
+                with open(self.cache_file, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                pass
+        return self._entries
+
+    @staticmethod
+    def stat_key(stat):
+        """Returns [dev, inode, size, mtime_ns] of an os.stat_result (a key list is returned as is)."""
+        if isinstance(stat, list):
+            return stat
+        return [stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+    def get(self, path: str, stat, algorithm: str = "sha1"):
+        entry = self._load().get(os.path.abspath(path))
+        if entry and entry.get("key") == self.stat_key(stat):
+            return entry.get(algorithm)
+        return None
+
+    def set(self, path: str, stat, algorithm: str, digest: str):
+        path = os.path.abspath(path)
+        key = self.stat_key(stat)
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(path)
+            if not entry or entry.get("key") != key:
+                entry = entries[path] = {"key": key}
+            if entry.get(algorithm) != digest:
+                entry[algorithm] = digest
+                self._dirty = True
+
+    @contextmanager
+    def batch(self):
+        """Defers writing the cache until the outermost batch ends (e.g. while registering many datasets)."""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            self.save()
+
+    def save(self):
+        """Writes the cache if any entry changed."""
+        if not self._dirty or self._batch_depth:
+            return
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_suffix(".tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_file, self.cache_file)
+            self._dirty = False
+        except OSError:
+            pass  # The cache is only an optimisation
+
+_hash_cache = None
+
+def get_hash_cache():
+    """Returns the shared `HashCache`."""
+    global _hash_cache
+    if _hash_cache is None:
+        _hash_cache = HashCache()
+    return _hash_cache
+
+def hash_files(file_paths: list = None, algorithm: str = "sha1", max_workers: int = None, use_cache: bool = True, stats=None):
+    """
+    Computes git blob hashes of many files in a thread pool.
+
+    Args:
+        file_paths (list): Files to hash.
+        algorithm (str): 'sha1' (git default) or 'sha256'.
+        max_workers (int): Number of threads (default: min(32, CPU count + 4)).
+        use_cache (bool): Reuse and update the (dev, inode, size, mtime_ns) keyed cache.
+        stats (FileStats): Already collected stats of the files to hash, used instead of
+            `file_paths` so the files are not stat'ed again.
+
+    Returns:
+        dict: Mapping of file path to hex digest, in the order of `file_paths`. Files that
+        vanished or could not be read map to None.
+    """
+    cache = get_hash_cache() if use_cache else None
+    digests = {}
+    pending = []
+
+    def _stat_key(path):
+        try:
+            return HashCache.stat_key(os.stat(path))
+        except OSError:
+            return None
+
+    if stats is not None:
+        items = ((path, stats.stat_key(i)) for i, path in enumerate(stats.paths))
+    else:
+        items = ((path, _stat_key(path)) for path in file_paths)
+
+    for path, key in items:
+        digest = cache.get(path, key, algorithm) if cache and key else None
+        digests[path] = digest
+        if not digest and key:
+            pending.append((path, key))
+
+    def _hash(item):
+        path, key = item
+        for _ in range(_HASH_ATTEMPTS):
+            try:
+                digest = git_hash_file(path, algorithm, size=key[2])
+            except OSError:
+                return path, None  # e.g. deleted after the stat
+            # Only a file that stayed the same while it was read gets a digest under its key
+            current = _stat_key(path)
+            if current is None:
+                return path, None
+            if digest and current == key:
+                if cache:
+                    cache.set(path, key, algorithm, digest)
+                return path, digest
+            key = current
+        return path, None
+
+    if len(pending) == 1:
+        path, digest = _hash(pending[0])
+        digests[path] = digest
+    elif pending:
+        with ThreadPoolExecutor(max_workers=max_workers or min(32, (os.cpu_count() or 1) + 4)) as executor:
+            for path, digest in executor.map(_hash, pending):
+                digests[path] = digest
+
+    if cache:
+        cache.save()
+    return digests
+
+# git tree entry modes
+_MODE_FILE = b"100644"
+_MODE_EXECUTABLE = b"100755"
+_MODE_TREE = b"40000"
+
+def _tree_sort_key(item):
+    # git orders tree entries as if folder names ended with '/'
+    name, is_dir = item
+    return name + "/" if is_dir else name
+
+class MerkleTree:
+    """
+    Sorted Merkle tree of a folder. Files are git blobs and every folder is a git tree object
+    with its entries in git's order, so the root digest matches 'git write-tree' for the same
+    content. Empty folders are left out, as in git.
+
+    Folder digests are kept per node: `update` rehashes only the changed files and recomputes
+    the digests of their ancestors from the cached digests of their siblings.
+
+    Args:
+        root (str): Folder to hash.
+        algorithm (str): 'sha1' (git default) or 'sha256'.
+        use_cache (bool): Reuse file hashes from the (dev, inode, size, mtime_ns) keyed cache.
+    """
+
+    def __init__(self, root: str, algorithm: str = "sha1", use_cache: bool = True):
+        self.root = os.path.abspath(root)
+        self.algorithm = algorithm
+        self.use_cache = use_cache
+        self.files = {}     # relative path -> (blob digest, executable)
+        self.dirs = {}      # relative folder path ('' is the root) -> tree digest or None if empty
+        self._children = {} # relative folder path -> {name: is_dir}
+
+    @staticmethod
+    def _join(folder: str, name: str):
+        return f"{folder}/{name}" if folder else name
+
+    @staticmethod
+    def _parent(rel: str):
+        return rel.rpartition("/")[0]
+
+    def _abs(self, rel: str):
+        return os.path.join(self.root, *rel.split("/")) if rel else self.root
+
+    def _scan(self, rel_folder: str, found_files: list):
+        """Records the folders below `rel_folder` and appends (relative path, stat) of its files."""
+        stack = [rel_folder]
+        while stack:
+            rel = stack.pop()
+            children = self._children[rel] = {}
+            self.dirs[rel] = None
+            try:
+                with os.scandir(self._abs(rel)) as it:
+                    for entry in it:
+                        child = self._join(rel, entry.name)
+                        try:
+                            if entry.is_dir():
+                                if entry.is_symlink():
+                                    continue  # Folder symlinks are not followed (as in os.walk)
+                                children[entry.name] = True
+                                stack.append(child)
+                            else:
+                                stat = entry.stat()
+                                children[entry.name] = False
+                                found_files.append((child, stat))
+                        except OSError:
+                            continue  # e.g. a broken symlink
+            except OSError:
+                continue
+
+    def _hash_files(self, found_files: list, max_workers: int = None):
+        paths = [self._abs(rel) for rel, _ in found_files]
+        digests = hash_files(paths, self.algorithm, max_workers=max_workers, use_cache=self.use_cache)
+        for (rel, stat), path in zip(found_files, paths):
+            if digests[path]:
+                self.files[rel] = (digests[path], bool(stat.st_mode & 0o111))
+            else:
+                # Vanished or unreadable: leave it out as if it had never been listed
+                self._children.get(self._parent(rel), {}).pop(rel.rsplit("/", 1)[-1], None)
+
+    def _tree_digest(self, rel: str):
+        entries = []
+        for name, is_dir in sorted(self._children.get(rel, {}).items(), key=_tree_sort_key):
+            child = self._join(rel, name)
+            if is_dir:
+                digest, mode = self.dirs.get(child), _MODE_TREE
+            else:
+                digest, executable = self.files.get(child, (None, False))
+                mode = _MODE_EXECUTABLE if executable else _MODE_FILE
+            if digest:
+                entries.append(mode + b" " + name.encode("utf-8") + b"\0" + bytes.fromhex(digest))
+
+        if not entries and rel:
+            return None
+        content = b"".join(entries)
+        h = hashlib.new(self.algorithm)
+        h.update(b"tree %d\0" % len(content))
+        h.update(content)
+        return h.hexdigest()
+
+    def _rehash_dirs(self, rel_dirs):
+        # Deepest folders first so every parent sees its children's new digests
+        for rel in sorted(rel_dirs, key=lambda d: d.count("/") + bool(d), reverse=True):
+            if rel in self._children:
+                self.dirs[rel] = self._tree_digest(rel)
+
+    def _add_path(self, rel: str, is_dir: bool):
+        """Registers `rel` and its ancestor folders in the children tables."""
+        if is_dir:
+            self._children.setdefault(rel, {})
+            self.dirs.setdefault(rel, None)
+        while rel:
+            parent, _, name = rel.rpartition("/")
+            siblings = self._children.setdefault(parent, {})
+            self.dirs.setdefault(parent, None)
+            known = name in siblings
+            siblings[name] = is_dir
+            if known:
+                return  # The ancestors are registered already
+            rel, is_dir = parent, True
+
+    def build(self, max_workers: int = None, stats=None):
+        """
+        Hashes the whole tree (file hashes come from the cache when the files are unchanged).
+
+        Args:
+            stats (FileStats): All files below the root, as collected by `scan_files`; the
+                folder is then not listed and the files are not stat'ed again.
+        """
+        self.files, self.dirs, self._children = {}, {}, {}
+        if stats is None:
+            found_files = []
+            self._scan("", found_files)
+            self._hash_files(found_files, max_workers)
+        else:
+            self._children[""], self.dirs[""] = {}, None
+            digests = hash_files(algorithm=self.algorithm, max_workers=max_workers, use_cache=self.use_cache, stats=stats)
+            for i, path in enumerate(stats.paths):
+                if not digests[path]:
+                    continue  # Vanished since `scan_files`
+                rel = os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, "/")
+                self._add_path(rel, is_dir=False)
+                self.files[rel] = (digests[path], stats.is_executable(i))
+        self._rehash_dirs(list(self._children))
+        return self
+
+    def file_digest(self, path: str):
+        """Returns the blob digest of a file of the tree (absolute or relative to the current folder), or None."""
+        rel = os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, "/")
+        return self.files.get(rel, (None, False))[0]
+
+    def to_dict(self):
+        """Serializable form: the file digests and executable bits plus the folder digests."""
+        return {
+            "algorithm": self.algorithm,
+            "files": {rel: [digest, executable] for rel, (digest, executable) in sorted(self.files.items())},
+            "dirs": self.subtree_digests(),
+        }
+
+    @classmethod
+    def from_dict(cls, root: str, data: dict, use_cache: bool = True):
+        """Restores a tree saved with `to_dict`, ready for `update`, without reading the folder."""
+        tree = cls(root, data.get("algorithm", "sha1"), use_cache=use_cache)
+        tree._children[""], tree.dirs[""] = {}, None
+        for rel in data.get("dirs", {}):
+            if rel:
+                tree._add_path(rel, is_dir=True)
+        for rel, (digest, executable) in data.get("files", {}).items():
+            tree._add_path(rel, is_dir=False)
+            tree.files[rel] = (digest, executable)
+        tree.dirs.update(data.get("dirs", {}))
+        return tree
+
+    def _ancestors(self, rel: str):
+        while rel:
+            rel = self._parent(rel)
+            yield rel
+
+    def _forget(self, rel: str):
+        prefix = rel + "/"
+        for table in (self.files, self.dirs, self._children):
+            for key in [k for k in table if k == rel or k.startswith(prefix)]:
+                del table[key]
+
+    def update(self, paths, max_workers: int = None):
+        """
+        Applies created, changed or deleted paths (absolute or relative to the current folder),
+        e.g. from `watch_tools`. Only those files and their ancestors are rehashed.
+
+        Returns:
+            set: Relative folders whose digest changed.
+        """
+        before = dict(self.dirs)
+        dirty = set()
+        found_files = []
+
+        for path in paths:
+            rel = os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, "/")
+            if rel == "." or rel.startswith(".."):
+                if rel == ".":
+                    return set(self.build(max_workers).dirs)
+                continue
+
+            # Make sure the ancestors are known, e.g. for files in a new folder
+            parents = list(self._ancestors(rel))
+            for parent in reversed(parents):
+                if parent not in self._children:
+                    self._children[parent] = {}
+                    grand = self._parent(parent)
+                    if parent:
+                        self._children.setdefault(grand, {})[parent.rsplit("/", 1)[-1]] = True
+
+            name = rel.rsplit("/", 1)[-1]
+            parent = parents[0]
+            abs_path = self._abs(rel)
+            self._forget(rel)
+            if os.path.isdir(abs_path) and not os.path.islink(abs_path):
+                self._children[parent][name] = True
+                self._scan(rel, found_files)
+                dirty.update(d for d in self._children if d == rel or d.startswith(rel + "/"))
+            else:
+                try:
+                    stat = os.stat(abs_path) if os.path.isfile(abs_path) else None
+                except OSError:
+                    stat = None
+                if stat is not None:
+                    self._children[parent][name] = False
+                    found_files.append((rel, stat))
+                else:
+                    self._children[parent].pop(name, None)
+            dirty.update(parents)
+
+        self._hash_files(found_files, max_workers)
+        self._rehash_dirs(dirty)
+        return {d for d in set(before) | set(self.dirs) if before.get(d) != self.dirs.get(d)}
+
+    @property
+    def digest(self):
+        """The root tree digest."""
+        return self.dirs.get("")
+
+    def subtree_digests(self):
+        """Returns {relative folder: digest} for every non-empty folder ('' is the root)."""
+        return {rel: digest for rel, digest in sorted(self.dirs.items()) if digest}
+
+def diff_subtrees(old: dict, new: dict):
+    """
+    Compares two `subtree_digests` results without reading any file.
+
+    Returns:
+        list: The deepest folders whose digest differs, was added or was removed; a change
+        inside 'a/b' is reported as 'a/b' rather than also as 'a' and ''.
+    """
+    changed = {rel for rel in set(old) | set(new) if old.get(rel) != new.get(rel)}
+    return sorted(rel for rel in changed
+                  if not any(other.startswith(rel + "/") or (not rel and other) for other in changed if other != rel))
+
+def hash_path(path: str, algorithm: str = "sha1", max_workers: int = None, use_cache: bool = True):
+    """
+    Returns the git blob hash of a file, or for a folder the root digest of its `MerkleTree`
+    (the same as 'git write-tree' for that folder).
+
+    Returns:
+        str | None: Hex digest, or None if the file vanished while it was hashed.
+    """
+    if os.path.isfile(path):
+        return hash_files([path], algorithm, use_cache=use_cache)[path]
+
+    return MerkleTree(path, algorithm, use_cache=use_cache).build(max_workers).digest
+
+# Bytes hashed from each end of a file in the partial-hash pass of `find_duplicates`
+_PARTIAL_BYTES = 64 * 1024
+
+def partial_hash(path: str, size: int = None, chunk: int = _PARTIAL_BYTES):
+    """Returns a SHA-1 of the first and last `chunk` bytes of a file (cheap pre-filter for duplicates)."""
+    if size is None:
+        size = os.path.getsize(path)
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        h.update(f.read(chunk))
+        if size > 2 * chunk:
+            f.seek(-chunk, os.SEEK_END)
+            h.update(f.read(chunk))
+    return h.hexdigest()
+
+def _group_by(items: list, key_func, max_workers: int = None):
+    """Groups (path, size) items by key_func(path, size) in a thread pool and keeps groups of 2 or more."""
+    groups = {}
+    with ThreadPoolExecutor(max_workers=max_workers or min(32, (os.cpu_count() or 1) + 4)) as executor:
+        keys = executor.map(lambda item: key_func(*item), items)
+        for item, key in zip(items, keys):
+            if key is not None:
+                groups.setdefault(key, []).append(item)
+    return [group for group in groups.values() if len(group) > 1]
+
+def find_duplicates(roots: list, min_size: int = 1, max_workers: int = None):
+    """
+    Finds files with identical content under `roots` in three passes, each on fewer files:
+    equal size, then equal partial hash (both ends of the file), then equal full git hash.
+    Paths that are already hard links of each other count as one file.
+
+    Args:
+        roots (list): Folders (or files) to scan.
+        min_size (int): Ignore files smaller than this many bytes.
+        max_workers (int): Number of hashing threads.
+
+    Returns:
+        list: Groups of duplicate paths as (size, [paths]) tuples, paths sorted and largest groups first.
+    """
+    by_size = {}
+    for root in roots:
+        walker = [(os.path.dirname(root), [], [os.path.basename(root)])] if os.path.isfile(root) else os.walk(root)
+        for folder, dirs, files in walker:
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            for name in files:
+                if name.startswith("."):
+                    continue
+                path = os.path.join(folder, name)
+                try:
+                    st = os.lstat(path)
+                except OSError:
+                    continue
+                if not stat_module.S_ISREG(st.st_mode) or st.st_size < min_size:
+                    continue
+                by_size.setdefault(st.st_size, {}).setdefault((st.st_dev, st.st_ino), path)
+
+    candidates = [(path, size) for size, inodes in by_size.items() if len(inodes) > 1 for path in inodes.values()]
+
+    def _partial(path, size):
+        try:
+            return size, partial_hash(path, size)
+        except OSError:
+            return None
+
+    def _full(path, size):
+        try:
+            digest = hash_files([path], use_cache=True)[path]
+        except OSError:
+            return None
+        return (size, digest) if digest else None
+
+    duplicates = []
+    with get_hash_cache().batch():
+        for group in _group_by(candidates, _partial, max_workers):
+            for same in _group_by(group, _full, max_workers):
+                duplicates.append((same[0][1], sorted(path for path, _ in same)))
+
+    duplicates.sort(key=lambda d: (-(d[0] * (len(d[1]) - 1)), d[1][0]))
+    return duplicates
+
+# Linux FICLONE ioctl: share the extents of another file (btrfs, XFS, bcachefs, ...)
+_FICLONE = 0x40049409
+
+def _reflink(source: str, target: str):
+    import fcntl
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+
+def link_duplicate(original: str, duplicate: str, mode: str = "hardlink"):
+    """
+    Replaces `duplicate` with a hard link or a reflink (copy-on-write clone) of `original`.
+
+    The link is created next to the duplicate and moved over it with os.replace, so the
+    duplicate path is never missing. Reflinks keep the duplicate's own timestamps and permissions.
+    """
+    if mode not in ("hardlink", "reflink"):
+        raise ValueError("mode must be 'hardlink' or 'reflink'.")
+
+    tmp_path = f"{duplicate}.dedup.tmp"
+    try:
+        if mode == "hardlink":
+            os.link(original, tmp_path)
+        else:
+            _reflink(original, tmp_path)
+            shutil.copystat(duplicate, tmp_path)
+        os.replace(tmp_path, duplicate)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
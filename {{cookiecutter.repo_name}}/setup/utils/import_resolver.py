@@ -0,0 +1,179 @@
+import os
+import sys
+import json
+import pathlib
+import sysconfig
+import importlib.metadata
+
+_INDEX_VERSION = 2
+
+
+def _standard_library_names():
+    """Returns the names of the standard library modules of this interpreter."""
+    names = set(sys.builtin_module_names)
+    if hasattr(sys, "stdlib_module_names"):  # Python >= 3.10
+        return names | set(sys.stdlib_module_names)
+
+    # Older interpreters: list the top-level modules and packages of the standard library folder
+    std_lib_path = sysconfig.get_paths()["stdlib"]
+    for folder in (std_lib_path, os.path.join(std_lib_path, "lib-dynload")):
+        try:
+            entries = os.listdir(folder)
+        except OSError:
+            continue
+        for entry in entries:
+            name, ext = os.path.splitext(entry)
+            if ext in (".py", ".pyc", ".so", ".pyd"):
+                names.add(name.split(".")[0])
+            elif entry != "site-packages" and os.path.isfile(os.path.join(folder, entry, "__init__.py")):
+                names.add(entry)
+    return names
+
+
+def _packages_distributions():
+    """Returns {top-level import name: [distribution names]} (importlib.metadata.packages_distributions)."""
+    if hasattr(importlib.metadata, "packages_distributions"):  # Python >= 3.10
+        return {name: sorted(set(dists)) for name, dists in importlib.metadata.packages_distributions().items()}
+
+    mapping = {}
+    for dist in importlib.metadata.distributions():
+        name = dist.metadata.get("Name")
+        if not name:
+            continue
+        top_level = (dist.read_text("top_level.txt") or "").split()
+        if not top_level:
+            top_level = {pathlib.PurePath(f).parts[0].split(".")[0] for f in (dist.files or [])
+                         if f.suffix == ".py" or len(pathlib.PurePath(f).parts) > 1}
+        for module in top_level:
+            if module and not module.endswith((".dist-info", ".egg-info")) and module != "__pycache__":
+                mapping.setdefault(module, set()).add(name)
+    return {name: sorted(dists) for name, dists in mapping.items()}
+
+
+def _package_prefixes(shared: set):
+    """
+    Returns {dotted package name: [distribution names]} for the top-level names in `shared`.
+
+    Namespace packages (e.g. google, google.cloud) are split over several distributions, so
+    their imports are resolved on the longest dotted package the distributions' files provide.
+    """
+    mapping = {}
+    for dist in importlib.metadata.distributions():
+        name = dist.metadata.get("Name")
+        if not name:
+            continue
+        for file in dist.files or []:
+            parts = pathlib.PurePath(file).parts
+            if len(parts) < 2 or parts[0] not in shared or file.suffix not in (".py", ".pyc", ".so", ".pyd"):
+                continue
+            # Every folder holding the module is a package prefix, and so is the module itself
+            module = parts[-1].split(".")[0]
+            names = parts[:-1] if module == "__init__" else parts[:-1] + (module,)
+            for i in range(1, len(names) + 1):
+                if "__pycache__" not in names[:i]:
+                    mapping.setdefault(".".join(names[:i]), set()).add(name)
+    return {prefix: sorted(dists) for prefix, dists in mapping.items()}
+
+
+def _environment_fingerprint():
+    """Identifies this interpreter and the state of its site-packages folders (installs change their mtimes)."""
+    paths = []
+    for entry in sys.path:
+        if os.path.basename(os.path.normpath(entry or ".")) not in ("site-packages", "dist-packages"):
+            continue
+        try:
+            paths.append([entry, os.stat(entry or ".").st_mtime_ns])
+        except OSError:
+            continue
+    return {"executable": sys.executable, "version": sys.version, "paths": paths}
+
+
+class ImportResolver:
+    """
+    O(1) lookups from an import name to the standard library or to the installed
+    distribution(s) that provide it, e.g. 'sklearn' -> scikit-learn, 'yaml' -> PyYAML.
+
+    Top-level names shared by several distributions (namespace packages such as google)
+    are resolved on the longest matching dotted prefix, e.g. 'google.cloud.storage' ->
+    google-cloud-storage.
+    """
+
+    def __init__(self, stdlib: list, imports: dict, versions: dict, packages: dict = None):
+        self.stdlib = set(stdlib)
+        self.imports = imports
+        self.versions = versions
+        self.packages = packages or {}
+
+    @classmethod
+    def build(cls):
+        versions = {}
+        for dist in importlib.metadata.distributions():
+            name = dist.metadata.get("Name")
+            if name:
+                versions.setdefault(name, dist.version)
+        imports = _packages_distributions()
+        shared = {module for module, dists in imports.items() if len(dists) > 1}
+        return cls(sorted(_standard_library_names()), imports, versions, _package_prefixes(shared))
+
+    def to_dict(self):
+        return {"stdlib": sorted(self.stdlib), "imports": self.imports, "versions": self.versions, "packages": self.packages}
+
+    def is_stdlib(self, import_name: str):
+        return import_name.split(".")[0] in self.stdlib
+
+    def distributions(self, import_name: str):
+        """Returns the names of the installed distributions that provide an import (dotted or top-level)."""
+        parts = import_name.split(".")
+        if parts[0] in self.packages:
+            for i in range(len(parts), 0, -1):
+                distributions = self.packages.get(".".join(parts[:i]))
+                if distributions:
+                    return distributions
+        return self.imports.get(parts[0], [])
+
+    def resolve(self, import_name: str):
+        """
+        Returns:
+            list: (distribution name, version) for each installed distribution providing the import.
+        """
+        return [(dist, self.versions.get(dist)) for dist in self.distributions(import_name)]
+
+
+_resolver = None
+
+
+def get_import_resolver(cache_file: str = "./bin/import_index.json", refresh: bool = False):
+    """
+    Returns the `ImportResolver` of the running interpreter.
+
+    The index is stored per interpreter in `cache_file` and rebuilt only when the interpreter
+    or a folder on its import path changes (e.g. after installing or removing a package).
+    """
+    global _resolver
+    if _resolver is not None and not refresh:
+        return _resolver
+
+    cache_path = pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path(cache_file)
+    fingerprint = _environment_fingerprint()
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+
+    cached = cache.get(sys.executable)
+    if not refresh and cached and cached.get("index_version") == _INDEX_VERSION and cached.get("fingerprint") == fingerprint:
+        _resolver = ImportResolver(**cached["index"])
+        return _resolver
+
+    _resolver = ImportResolver.build()
+    cache[sys.executable] = {"index_version": _INDEX_VERSION, "fingerprint": fingerprint, "index": _resolver.to_dict()}
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass  # The cache is only an optimisation
+    return _resolver
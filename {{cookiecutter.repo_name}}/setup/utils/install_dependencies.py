@@ -1,14 +1,13 @@
-import subprocess
-import sys
 import re
 import os
 import pathlib
+import argparse
+import time
 import importlib
+import importlib.util
 
-# Ensure the project root is in sys.path
-sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
-
-from utils import *
+from .general_tools import *
+from .import_resolver import get_import_resolver
 
 def parse_dependencies(file_path="dependencies.txt"):
     required_libraries = []
@@ -48,41 +47,66 @@ def parse_dependencies(file_path="dependencies.txt"):
     return required_libraries
 
 def is_standard_library(lib_name):
-    spec = importlib.util.find_spec(lib_name)
-    return spec is not None and spec.origin is None  # Origin None means it's built-in
+    return get_import_resolver().is_stdlib(lib_name)
+
+def install_dependencies(required_libraries, dry_run: bool = False):
+    """
+    Installs the missing or outdated libraries in one batched transaction.
+
+    Args:
+        required_libraries (list): Requirement strings such as 'numpy==1.26.4'.
+        dry_run (bool): Only print the install plan.
 
-def install_dependencies(required_libraries):
-    # Get list of installed libraries
-    installed_libraries = subprocess.check_output([sys.executable, '-m', 'pip', 'freeze']).decode().splitlines()
+    Returns:
+        list: Requirements that failed to install.
+    """
+    start = time.perf_counter()
 
-    # Check and install missing libraries
+    # Skip installation for standard libraries
+    requirements = []
     for lib in required_libraries:
-        try:
-            # Extract library name (without version) for checking
-            lib_name = lib.split('==')[0]
-            
-            # Skip installation for standard libraries
-            if is_standard_library(lib_name):
-                print(f"Skipping installation of standard library: {lib_name}")
-                continue
-
-            # Check if the library is already installed
-            if not any(lib.lower() in installed_lib.lower() for installed_lib in installed_libraries):
-                print(f"Installing {lib}...")
-                subprocess.check_call([sys.executable, '-m', 'pip', 'install', lib])
-            else:
-                print(f"{lib} is already installed.")
-        except subprocess.CalledProcessError as e:
-            print(f"Failed to install {lib}: {e}")
+        parsed = parse_requirement(lib)
+        if parsed and is_standard_library(parsed[0]):
+            print(f"Skipping installation of standard library: {parsed[0]}")
+            continue
+        requirements.append(lib)
+
+    plan = plan_installs(requirements)
+    print_install_plan(plan)
+    print(f"Planned {len(plan)} requirements in {time.perf_counter() - start:.2f}s")
+
+    if dry_run:
+        return []
+
+    to_install = [item["requirement"] for item in plan if item["action"] in ("install", "upgrade")]
+    if not to_install:
+        print("All dependencies are already installed.")
+        return []
+
+    print(f"Installing {len(to_install)} libraries...")
+    start = time.perf_counter()
+    install_uv()
+    failed = install_requirements(to_install)
+    importlib.invalidate_caches()
+    print(f"Installed {len(to_install) - len(failed)} of {len(to_install)} libraries in {time.perf_counter() - start:.1f}s")
+
+    if failed:
+        print(f"Failed to install: {', '.join(failed)}")
+    return failed
 
 @ensure_correct_kernel
 def main(dependencies_file="dependencies.txt"):
+    parser = argparse.ArgumentParser(description="Install missing packages listed in a dependencies file.")
+    parser.add_argument("dependencies_file", nargs="?", default=dependencies_file, help="Path to the dependencies file (default: dependencies.txt)")
+    parser.add_argument("--dry-run", action="store_true", help="Print the install plan without installing anything")
+    args = parser.parse_args()
+
     # Parse the dependencies from the text file
-    required_libraries = parse_dependencies(dependencies_file)
+    required_libraries = parse_dependencies(args.dependencies_file)
     
     # Install the missing dependencies
     if required_libraries:
-        install_dependencies(required_libraries)
+        install_dependencies(required_libraries, dry_run=args.dry_run)
     else:
         print("No dependencies found to install.")
 
@@ -0,0 +1,161 @@
+import sys
+import pathlib
+import platform
+import importlib.metadata
+from collections import deque
+
+from .general_tools import *
+from .general_tools import _packaging
+from .import_resolver import get_import_resolver
+
+# platform_rules values (sys.platform) -> conda selectors
+_CONDA_SELECTORS = {"win32": "win", "darwin": "osx", "linux": "linux"}
+
+
+def _installed_distributions():
+    """Returns {canonical name: Distribution} of the running interpreter (first on sys.path wins)."""
+    installed = {}
+    for dist in importlib.metadata.distributions():
+        name = dist.metadata.get("Name")
+        if name:
+            installed.setdefault(normalize_package_name(name), dist)
+    return installed
+
+
+def requirement_closure(roots: dict):
+    """
+    Computes the transitive closure of installed distributions from their `Requires-Dist` metadata.
+
+    Markers are evaluated for the running interpreter, including the extras each distribution
+    was requested with.
+
+    Args:
+        roots (dict): {distribution name: set of extras}.
+
+    Returns:
+        tuple: ({canonical name: Distribution}, {canonical name: Requirement} of requirements whose
+        markers exclude this platform, set of required names that are not installed).
+    """
+    packaging = _packaging()
+    if packaging is None:
+        package_installer(required_libraries=["packaging"])
+        packaging = _packaging()
+    Requirement = packaging[0]
+    # InvalidRequirement lives next to whichever Requirement (standalone or pip-vendored) was found
+    InvalidRequirement = sys.modules[Requirement.__module__].InvalidRequirement
+
+    installed = _installed_distributions()
+    closure, inactive, missing = {}, {}, set()
+    extras_done = {}
+
+    queue = deque((normalize_package_name(name), set(extras)) for name, extras in roots.items())
+    while queue:
+        name, extras = queue.popleft()
+        done = extras_done.setdefault(name, None)
+        if done is not None and extras <= done:
+            continue
+        extras_done[name] = extras | (done or set())
+
+        dist = installed.get(name)
+        if dist is None:
+            missing.add(name)
+            continue
+        closure[name] = dist
+
+        for requirement in dist.requires or []:
+            try:
+                req = Requirement(requirement)
+            except InvalidRequirement:
+                continue
+            if req.marker is not None:
+                if not any(req.marker.evaluate({"extra": extra}) for extra in {""} | extras):
+                    if "extra" not in str(req.marker):
+                        inactive.setdefault(normalize_package_name(req.name), req)
+                    continue
+            queue.append((normalize_package_name(req.name), set(req.extras)))
+
+    return closure, inactive, missing
+
+
+def minimal_lock(import_names, include: list = None, platform_rules: dict = None):
+    """
+    Pins only the distributions the code needs: those providing `import_names`, the
+    distributions in `include`, and everything they require, with `platform_rules` applied.
+
+    Returns:
+        tuple: ([(name, version or None, sys_platform or None)] sorted by name, unresolved import names).
+    """
+    resolver = get_import_resolver()
+    roots, unresolved = {}, set()
+    for module in sorted(set(import_names)):
+        if resolver.is_stdlib(module):
+            continue
+        distributions = resolver.distributions(module)
+        if not distributions:
+            unresolved.add(module.split(".")[0])
+        for distribution in distributions:
+            roots.setdefault(distribution, set())
+    for distribution in include or []:
+        roots.setdefault(distribution, set())
+
+    closure, inactive, missing = requirement_closure(roots)
+    for name in sorted(missing):
+        print(f"⚠️ '{name}' is required but not installed; it is left out of the lock.")
+
+    rules = {normalize_package_name(pkg): sys_platform for pkg, sys_platform in (platform_rules or {}).items()}
+    pins = [(dist.metadata["Name"], dist.version, rules.get(name)) for name, dist in closure.items()]
+
+    # Platform-specific requirements of the closure cannot be pinned from this platform's install
+    for name, req in inactive.items():
+        if name not in closure and rules.get(name) and rules[name] != sys.platform:
+            pins.append((req.name, None, rules[name]))
+
+    return sorted(pins, key=lambda pin: normalize_package_name(pin[0])), sorted(unresolved)
+
+
+def _requirement_line(name: str, version: str, sys_platform: str):
+    line = f"{name}=={version}" if version else name
+    return f'{line} ; sys_platform == "{sys_platform}"' if sys_platform else line
+
+
+def write_minimal_lock(import_names, requirements_file: str = "requirements.txt", env_file: str = None,
+                       r_version: str = None, include: list = None):
+    """
+    Writes requirements.txt (and optionally environment.yml) from the imports of the code in
+    one pass, with platform tags already applied, instead of freezing the whole environment.
+
+    Args:
+        import_names (iterable): Modules imported by the code (dotted names resolve namespace packages).
+        requirements_file (str): Output path relative to the project root.
+        env_file (str): environment.yml path relative to the project root, or None to skip it.
+        r_version (str): R version string such as "R version 4.4.3" to add r-base to environment.yml.
+        include (list): Distributions to lock in addition to the imported ones (e.g. ipykernel).
+
+    Returns:
+        dict: {file: True if it was written}; unchanged files are not rewritten.
+    """
+    root = pathlib.Path(__file__).resolve().parent.parent.parent
+    pins, unresolved = minimal_lock(import_names, include, get_project_config(root).platform_rules)
+    if unresolved:
+        print(f"⚠️ No installed distribution provides: {', '.join(unresolved)}")
+
+    lines = [_requirement_line(*pin) for pin in pins]
+    changed = {requirements_file: write_if_changed(str(root / requirements_file), "".join(line + "\n" for line in lines))}
+    if changed[requirements_file]:
+        print(f"✅ {requirements_file} locked to {len(lines)} package(s) used by the code.")
+    else:
+        print(f"{requirements_file} is unchanged ({len(lines)} package(s)).")
+
+    if env_file:
+        conda_dependencies = [f"python={platform.python_version()}"]
+        if r_version:
+            conda_dependencies.append(f"r-base={r_version.split()[-1]}")
+        env_lines = ["name: auto_env", "dependencies:"] + [f"- {dep}" for dep in conda_dependencies] + ["- pip:"]
+        for name, version, sys_platform in pins:
+            line = f"  - {name}=={version}" if version else f"  - {name}"
+            selector = _CONDA_SELECTORS.get(sys_platform)
+            env_lines.append(f"{line}  # [{selector}]" if selector else line)
+        changed[env_file] = write_if_changed(str(root / env_file), "\n".join(env_lines) + "\n")
+        print(f"✅ Conda environment file created: {env_file}" if changed[env_file] else f"{env_file} is unchanged.")
+
+    return changed
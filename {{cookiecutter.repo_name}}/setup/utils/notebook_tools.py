@@ -0,0 +1,207 @@
+import re
+import json
+
+_CHUNK_SIZE = 1024 * 1024
+_WHITESPACE = re.compile(rb"[ \t\n\r]*")
+_STRUCTURAL = re.compile(rb'["{}\[\]]')
+_SCALAR_END = re.compile(rb"[,\]}\s]")
+
+
+class _JsonStream:
+    """
+    Minimal pull parser over a binary file that reads fixed-size chunks.
+
+    Values that are not needed (cell outputs, metadata) are skipped by scanning the raw bytes
+    for quotes and brackets without decoding them, so memory stays at about one chunk however
+    large the skipped values are. Only the values that are read are decoded.
+    """
+
+    def __init__(self, f, chunk_size: int = _CHUNK_SIZE):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._buf = b""
+        self._pos = 0
+        self._mark = None  # Start of a value being read, kept across refills
+        self._eof = False
+
+    def _fill(self):
+        """Reads the next chunk, dropping what was consumed. Returns False at end of file."""
+        if self._eof:
+            return False
+        chunk = self._f.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        keep = self._pos if self._mark is None else self._mark
+        self._buf = self._buf[keep:] + chunk
+        self._pos -= keep
+        if self._mark is not None:
+            self._mark = 0
+        return True
+
+    def peek(self):
+        """Returns the next non-whitespace byte without consuming it (b'' at end of file)."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos:self._pos + 1]
+            if not self._fill():
+                return b""
+
+    def expect(self, char: bytes):
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char.decode()}' in notebook JSON")
+        self._pos += 1
+
+    def read_value(self):
+        """Decodes the next (small) value, e.g. a key, a cell type or a cell source."""
+        self.peek()
+        self._mark = self._pos
+        try:
+            self.skip_value()
+            return json.loads(self._buf[self._mark:self._pos])
+        finally:
+            self._mark = None
+
+    def _skip_string(self):
+        # bytes.find is much faster than a regex over long base64 outputs
+        self._pos += 1  # Opening quote
+        while True:
+            quote = self._buf.find(b'"', self._pos)
+            backslash = self._buf.find(b"\\", self._pos, len(self._buf) if quote < 0 else quote)
+            if backslash < 0 and quote >= 0:
+                self._pos = quote + 1
+                return
+            if backslash >= 0 and backslash + 1 < len(self._buf):
+                self._pos = backslash + 2  # Escaped character
+                continue
+            self._pos = len(self._buf) if backslash < 0 else backslash  # Keep a trailing backslash
+            if not self._fill():
+                raise ValueError("Unterminated string in notebook JSON")
+
+    def _skip_scalar(self):
+        # Numbers, true, false and null end at the next delimiter
+        while True:
+            match = _SCALAR_END.search(self._buf, self._pos)
+            if match is not None:
+                self._pos = match.start()
+                return
+            self._pos = len(self._buf)
+            if not self._fill():
+                return
+
+    def skip_value(self):
+        """Skips the next value of any size without decoding it."""
+        char = self.peek()
+        if char == b'"':
+            self._skip_string()
+            return
+        if char not in (b"{", b"["):
+            self._skip_scalar()
+            return
+
+        depth = 0
+        while True:
+            match = _STRUCTURAL.search(self._buf, self._pos)
+            if match is None:
+                self._pos = len(self._buf)
+                if not self._fill():
+                    raise ValueError("Unexpected end of notebook JSON")
+                continue
+            self._pos = match.start()
+            char = match.group()
+            if char == b'"':
+                self._skip_string()
+                continue
+            self._pos += 1
+            depth += 1 if char in b"{[" else -1
+            if depth == 0:
+                return
+
+    def iter_object(self):
+        """Yields the keys of the next object; the caller must read or skip each value."""
+        self.expect(b"{")
+        if self.peek() == b"}":
+            self._pos += 1
+            return
+        while True:
+            key = self.read_value()
+            self.expect(b":")
+            yield key
+            char = self.peek()
+            self._pos += 1
+            if char == b"}":
+                return
+            if char != b",":
+                raise ValueError("Expected ',' or '}' in notebook JSON")
+
+    def iter_array(self):
+        """Yields once per element of the next array; the caller must read or skip each element."""
+        self.expect(b"[")
+        if self.peek() == b"]":
+            self._pos += 1
+            return
+        while True:
+            yield
+            char = self.peek()
+            self._pos += 1
+            if char == b"]":
+                return
+            if char != b",":
+                raise ValueError("Expected ',' or ']' in notebook JSON")
+
+
+def _iter_cells(stream: _JsonStream, cell_types):
+    for _ in stream.iter_array():
+        cell_type, source = None, None
+        for key in stream.iter_object():
+            if key == "cell_type":
+                cell_type = stream.read_value()
+            elif key in ("source", "input"):  # 'input' in nbformat 3 code cells
+                source = stream.read_value()
+            else:
+                stream.skip_value()
+        if cell_type in cell_types and source is not None:
+            yield "".join(source) if isinstance(source, list) else source
+
+
+def iter_notebook_sources(path: str, cell_types=("code",)):
+    """
+    Yields the source of every cell of the given types in a .ipynb file, in order.
+
+    The notebook is read incrementally and outputs are skipped without being decoded, so
+    memory use does not depend on the size of embedded plots or data. Supports nbformat 4
+    ('cells') and nbformat 3 ('worksheets').
+    """
+    with open(path, "rb") as f:
+        stream = _JsonStream(f)
+        for key in stream.iter_object():
+            if key == "cells":
+                yield from _iter_cells(stream, cell_types)
+            elif key == "worksheets":
+                for _ in stream.iter_array():
+                    for sheet_key in stream.iter_object():
+                        if sheet_key == "cells":
+                            yield from _iter_cells(stream, cell_types)
+                        else:
+                            stream.skip_value()
+            else:
+                stream.skip_value()
+
+
+# IPython magics and shell escapes are not Python syntax
+_MAGIC_LINE = re.compile(r"^(\s*)([%!?])", re.MULTILINE)
+
+
+def extract_notebook_code(path: str, comment_magics: bool = True):
+    """
+    Returns the code cells of a notebook joined into one Python source.
+
+    Args:
+        path (str): The .ipynb file.
+        comment_magics (bool): Turn '%magic' and '!shell' lines into comments so the code parses.
+    """
+    code = "\n".join(iter_notebook_sources(path))
+    if comment_magics:
+        code = _MAGIC_LINE.sub(r"\1# \2", code)
+    return code
@@ -5,20 +5,13 @@ import os
 import json
 import pathlib
 import platform
-import psutil
 import subprocess
 import shutil
+import argparse
 from datetime import datetime
 
 from .readme_sections import *
 
-package_installer(required_libraries =  ['pyyaml','requests','pathspec','psutil',"py-cpuinfo"])
-
-import yaml
-import requests
-import pathspec
-import cpuinfo
-
 # README.md
 def creating_readme(programming_language = "None"):
 
@@ -39,7 +32,7 @@ def creating_readme(programming_language = "None"):
 
     generate_readme(programming_language,readme_file,code_path,file_descriptions,)
 
-    ignore_list, _  = toml_ignore(toml_path = "project.toml" ,  ignore_filename = ".treeignore",tool_name = "treeignore",toml_key = "patterns")
+    ignore_list = get_project_config().treeignore_spec
     
     create_tree(readme_file,ignore_list ,file_descriptions)
     
@@ -82,11 +75,14 @@ def generate_readme(programming_language,readme_file = "./README.md",code_path =
         hostname = None
 
 
-    py_version = get_version("python")
-    software_version = get_version(programming_language)
-    conda_version = get_version("conda") if py_manager.lower() == "conda" else "conda"
-    pip_version = get_version("pip")
-    uv_version = get_version("uv")
+    # Probe all runtimes concurrently; cached versions are returned without launching them
+    tools = ["python", programming_language, "pip", "uv"] + (["conda"] if py_manager.lower() == "conda" else [])
+    versions = get_versions(tools)
+    py_version = versions["python"]
+    software_version = versions[programming_language]
+    conda_version = versions.get("conda", "conda")
+    pip_version = versions["pip"]
+    uv_version = versions["uv"]
     install = set_setup(programming_language,py_version,software_version,conda_version,pip_version,uv_version,repo_name, repo_user, hostname)
     activate = set_project()
     contact = set_contact(authors, orcids, emails)
@@ -107,6 +103,10 @@ def generate_readme(programming_language,readme_file = "./README.md",code_path =
     print(f"README.md created at: {readme_file}")
 
 def get_system_specs():
+
+    package_installer(required_libraries =  ['psutil',"py-cpuinfo"])
+    import psutil
+    import cpuinfo
     
     def detect_gpu():
         # Try NVIDIA
@@ -302,7 +302,7 @@ def create_tree(readme_file=None, ignore_list=None, json_file="./file_descriptio
     if ignore_list is None:
         ignore_list = []  # Default to an empty list if not provided
 
-    file_descriptions = toml_json(folder = root_folder, json_filename =  json_file ,tool_name = file_descriptions, toml_path = "project.toml")
+    file_descriptions = get_project_config(root_folder).json_section("file_descriptions", json_file)
 
     #if isinstance(json_file, str) and json_file.endswith(".json") and os.path.exists(json_file): 
     #    with open(json_file, "r", encoding="utf-8") as json_file:
@@ -553,6 +553,9 @@ def create_citation_file(project_name, version, authors, orcids, code_repo, doi=
     }
 
     # Write to CITATION.cff
+    package_installer(required_libraries =  ['pyyaml'])
+    import yaml
+
     file = str(pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path("CITATION.cff"))
     with open(file, "w") as cff_file:
         yaml.dump(citation_data, cff_file, sort_keys=False)
@@ -571,6 +574,9 @@ def download_README_template(url:str = "https://raw.githubusercontent.com/social
     os.makedirs(folder_path, exist_ok=True)
 
     # Send GET request to the raw file URL
+    package_installer(required_libraries =  ['requests'])
+    import requests
+
     response = requests.get(url)
 
     # Check if the request was successful
@@ -620,8 +626,9 @@ The project was developed and tested on the following operating system:
 
 The environments were set up using:"""
         programming_language = load_from_env("PROGRAMMING_LANGUAGE",".cookiecutter")
-        py_version = get_version("python")
-        software_version = get_version(programming_language)
+        versions = get_versions(["python", programming_language])
+        py_version = versions["python"]
+        software_version = versions[programming_language]
 
         # Iterate through all dependency files and corresponding sections
         for idx, (dependencies_file, section) in enumerate(zip(dependencies_files, sections)):
@@ -696,6 +703,9 @@ The environments were set up using:"""
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Update README.md with the project tree and dependency information.")
+    parser.parse_args()
+
     programming_language = load_from_env("PROGRAMMING_LANGUAGE",".cookiecutter")
     creating_readme(programming_language = programming_language)
     code_path = language_dirs.get(programming_language.lower())
@@ -6,6 +6,7 @@ import shutil
 import zipfile
 import tarfile
 import pathlib
+import argparse
 
 from .general_tools import *
 from .versioning_tools import *
@@ -337,6 +338,9 @@ def install_gh(install_path=None):
 
 @ensure_correct_kernel
 def main():
+    parser = argparse.ArgumentParser(description="Set up version control and the remote code repository.")
+    parser.parse_args()
+
     version_control = load_from_env("VERSION_CONTROL",".cookiecutter")
     repo_name = load_from_env("REPO_NAME",".cookiecutter")
     code_repo = load_from_env("CODE_REPO",".cookiecutter")
@@ -1,13 +1,19 @@
 import os
 import json
+import re
+import sys
+import time
 import argparse
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import pathlib
 from collections import defaultdict
 
-from .readme_templates import *
 from .versioning_tools import *
+from .dataset_registry import *
+from .file_stats import *
 
 
 # ──────────────────────────────
@@ -31,8 +37,11 @@ def load_json_with_metadata(json_file_path: str):
 
 
 def save_json_with_metadata(json_file_path: str, data: dict):
-    with open(json_file_path, "w", encoding="utf-8") as f:
+    # Write to a temporary file and rename it, so an interrupted write never leaves a truncated registry
+    tmp_file_path = f"{json_file_path}.tmp"
+    with open(tmp_file_path, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=4)
+    os.replace(tmp_file_path, json_file_path)
     print(f"Metadata saved to {json_file_path}")
 
 
@@ -40,78 +49,156 @@ def save_json_with_metadata(json_file_path: str, data: dict):
 # Core functions
 # ──────────────────────────────
 
-def get_file_info(file_paths):
-    number_of_files = 0
-    total_size = 0
-    file_formats = set()
-    individual_sizes = []
+def get_file_info(files):
+    """
+    Summarises a dataset's files from a `FileStats` (or a list of paths, which are stat'ed once).
 
-    for path in file_paths:
-        number_of_files += 1
-        file_size = os.path.getsize(path) / (1024 * 1024)
-        total_size += file_size
-        individual_sizes.append(int(file_size))
-        file_formats.add(os.path.splitext(path)[1].lower())
-
-    return number_of_files, total_size, file_formats, individual_sizes
+    Returns:
+        tuple: (number of files, total size in MB, file formats, per-file sizes in MB to byte precision)
+    """
+    stats = files if isinstance(files, FileStats) else FileStats.from_paths(files)
+    individual_sizes = [round(size / MB, 6) for size in stats.bytes]
+    return len(stats), stats.total_bytes / MB, list(stats.by_extension()), individual_sizes
 
 
 def get_all_files(destination):
-    all_files = set()
-    for root, dirs, files in os.walk(destination):
-        for file in files:
-            full_path = os.path.join(root, file)
-            all_files.add(full_path)
-    return all_files
+    return set(scan_files(destination).paths)
 
 
-def add_to_json(json_file_path="./datasets.json", entry=None):
-    json_file_path = str(pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path(json_file_path))
-    data = load_json_with_metadata(json_file_path)
-    datasets = data["datasets"]
+# Folder mtimes this close to the snapshot time may hide later changes on coarse-timestamp filesystems
+_MTIME_SLACK_NS = 2_000_000_000
+
+def stat_snapshot(destination, previous: dict = None):
+    """
+    Records the file names of every folder under `destination` together with the folder mtime.
+
+    Adding, removing or renaming a file changes its folder's mtime, so when `previous` is given
+    only folders whose mtime changed are listed again; the others cost a single stat call.
+
+    Returns:
+        dict: {"taken_at": ns timestamp, "folders": {folder: (mtime_ns, file names, subfolders)}}
+    """
+    taken_at = time.time_ns()
+    old_folders = previous["folders"] if previous else {}
+    reuse_before = previous["taken_at"] - _MTIME_SLACK_NS if previous else None
+
+    folders = {}
+    stack = [destination]
+    while stack:
+        folder = stack.pop()
+        try:
+            mtime = os.stat(folder).st_mtime_ns
+        except OSError:
+            continue
 
-    existing_index = next((i for i, d in enumerate(datasets) if d.get("destination") == entry.get("destination")), None)
+        old = old_folders.get(folder)
+        if old and old[0] == mtime and mtime < reuse_before:
+            files, subfolders = old[1], old[2]
+        else:
+            files, subfolders = [], []
+            try:
+                with os.scandir(folder) as it:
+                    for entry in it:
+                        if entry.is_dir():
+                            if not entry.is_symlink():  # os.walk does not follow folder symlinks either
+                                subfolders.append(entry.path)
+                        else:
+                            files.append(entry.name)
+            except OSError:
+                continue
+
+        folders[folder] = (mtime, files, subfolders)
+        stack.extend(subfolders)
+
+    return {"taken_at": taken_at, "folders": folders}
+
+
+def new_files(before: dict, after: dict):
+    """Returns the sorted paths present in the `after` snapshot but not in `before`."""
+    added = []
+    for folder, (_, files, _) in after["folders"].items():
+        old = before["folders"].get(folder)
+        old_names = set(old[1]) if old else ()
+        added.extend(os.path.join(folder, name) for name in files if name not in old_names)
+    return sorted(added)
+
+
+def _upsert_entry(datasets: list, index: dict, entry: dict, verbose: bool = True):
+    """
+    Inserts or updates one entry in place. `index` maps destination -> position in `datasets`.
+
+    Returns:
+        str | None: "added", "updated" or None if the existing entry is unchanged.
+    """
+    existing_index = index.get(entry.get("destination"))
     existing_entry = datasets[existing_index] if existing_index is not None else None
 
     if existing_entry:
-        changed = False
-        if entry.get("hash") and existing_entry.get("hash") != entry["hash"]:
-            changed = True
-        elif not all(existing_entry.get(k) == v for k, v in entry.items() if v is not None and k != "created"):
-            changed = True
-
-        if changed:
-            entry["lastest_change"] = entry["created"]
-            entry["created"] = existing_entry["created"]
-            for k, v in entry.items():
-                if v is not None:
-                    existing_entry[k] = v
-            datasets[existing_index] = existing_entry
-            print(f"Updated existing dataset entry for {entry['data_name']}.")
-    else:
-        if not entry.get("data_name"):
-            entry["data_name"] = os.path.basename(entry["destination"])
-        datasets.append(entry)
+        if merge_entry(existing_entry, entry):
+            if verbose:
+                print(f"Updated existing dataset entry for {entry['data_name']}.")
+            return "updated"
+        return None
+
+    if not entry.get("data_name"):
+        entry["data_name"] = os.path.basename(entry["destination"])
+    index[entry.get("destination")] = len(datasets)
+    datasets.append(entry)
+    if verbose:
         print(f"Added new dataset entry for {entry['data_name']}.")
+    return "added"
+
 
-    datasets.sort(key=lambda d: d.get("data_type", ""))
+def upsert_entries(data: dict, entries: list, verbose: bool = True):
+    """
+    Upserts several entries into loaded registry data with a single destination index.
+
+    Returns:
+        dict: Counts of added, updated and unchanged entries.
+    """
+    datasets = data["datasets"]
+    index = {}
+    for i, d in enumerate(datasets):
+        index.setdefault(d.get("destination"), i)  # First match wins, as before
+
+    counts = {"added": 0, "updated": 0, "unchanged": 0}
+    for entry in entries:
+        result = _upsert_entry(datasets, index, entry, verbose=verbose)
+        counts[result or "unchanged"] += 1
+
+    datasets.sort(key=lambda d: d.get("data_type", "") or "")
     data["datasets"] = datasets
-    save_json_with_metadata(json_file_path, data)
-    return json_file_path
+    return counts
 
 
-def remove_missing_datasets(data_files, json_file_path="./datasets.json", base_data_dir="./data"):
+def add_entries_to_json(json_file_path="./datasets.json", entries=None, verbose: bool = True):
+    """
+    Loads the registry once, upserts all entries in memory and writes it once.
+
+    Returns:
+        str: The absolute registry path.
+    """
     json_file_path = str(pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path(json_file_path))
     data = load_json_with_metadata(json_file_path)
-    datasets = data["datasets"]
+    counts = upsert_entries(data, entries or [], verbose=verbose)
+    if not verbose:
+        print(f"Datasets: {counts['added']} added, {counts['updated']} updated, {counts['unchanged']} unchanged.")
+    save_json_with_metadata(json_file_path, data)
+    return json_file_path
 
-    current_data_files = set(data_files)
-    current_data_dirs = {str(pathlib.Path(f).parent) for f in current_data_files}
-    current_paths = current_data_files.union(current_data_dirs)
 
-    original_count = len(datasets)
+def add_to_json(json_file_path="./datasets.json", entry=None):
+    return add_entries_to_json(json_file_path=json_file_path, entries=[entry])
+
+
+def _drop_missing_datasets(data: dict):
+    datasets = data["datasets"]
     retained = [ds for ds in datasets if ds.get("destination") and os.path.exists(ds["destination"])]
-    removed = original_count - len(retained)
+    removed = len(datasets) - len(retained)
+
+    for ds in datasets:
+        if ds.get("manifest") and not (ds.get("destination") and os.path.exists(ds["destination"])):
+            remove_manifest(ds["destination"])
 
     if removed:
         print(f"Removed {removed} dataset(s) with missing destinations.")
@@ -119,15 +206,19 @@ def remove_missing_datasets(data_files, json_file_path="./datasets.json", base_d
         print("No missing dataset destinations found.")
 
     data["datasets"] = retained
-    save_json_with_metadata(json_file_path, data)
-    return json_file_path
+    return removed
 
 
-def normalize_dataset_fields(json_file_path="./datasets.json"):
+def remove_missing_datasets(data_files, json_file_path="./datasets.json", base_data_dir="./data"):
     json_file_path = str(pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path(json_file_path))
     data = load_json_with_metadata(json_file_path)
-    datasets = data["datasets"]
+    _drop_missing_datasets(data)
+    save_json_with_metadata(json_file_path, data)
+    return json_file_path
+
 
+def _normalize_fields(data: dict):
+    datasets = data["datasets"]
     all_keys = set(k for entry in datasets if isinstance(entry, dict) for k in entry.keys())
 
     for entry in datasets:
@@ -135,55 +226,104 @@ def normalize_dataset_fields(json_file_path="./datasets.json"):
             if key not in entry:
                 entry[key] = None
 
-    data["datasets"] = datasets
+
+def normalize_dataset_fields(json_file_path="./datasets.json"):
+    json_file_path = str(pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path(json_file_path))
+    data = load_json_with_metadata(json_file_path)
+    _normalize_fields(data)
     save_json_with_metadata(json_file_path, data)
     return json_file_path
 
 
-def set_dataset(data_name, destination, source=None, run_command=None, json_file_path="./datasets.json", doi=None, citation=None, license=None):
+def _command_list(run_command: str, source, destination):
+    command_parts = run_command.split()
+    if not is_installed(command_parts[0]):
+        raise FileNotFoundError(f"The executable '{command_parts[0]}' was not found in the PATH.")
+    return command_parts + [arg for arg in (source, destination) if arg is not None]
+
+
+def build_dataset_entry(data_name, destination, source=None, run_command=None, doi=None, citation=None, license=None, tree=None):
+    """
+    Collects the registry entry of a dataset (a file or a folder), running `run_command` first if given.
+
+    Every file of a folder is stat'ed once; the same stats feed the entry, the Merkle tree and
+    the manifest. An up-to-date `tree` (e.g. from `MerkleTree.update` in the watch) is used as is.
+
+    Returns:
+        dict | None: The entry, or None if the run command failed.
+    """
     destination = check_path_format(destination)
 
     if os.path.isfile(destination):
-        data_files = [destination]
+        data_files = FileStats.from_paths([destination])
     else:
         os.makedirs(destination, exist_ok=True)
-        initial_files = get_all_files(destination)
 
         if run_command:
-            command_parts = run_command.split()
-            command_list = command_parts + [source, destination]
-
-            if is_installed(command_parts[0]):
-                try:
-                    result = subprocess.run(command_list, check=True, text=True, capture_output=True)
-                    print(f"Command output:\n{result.stdout}")
-                except subprocess.CalledProcessError as e:
-                    print(f"Error executing command: {e}")
-                    print(f"Command output:\n{e.output}")
-                    return
-            else:
-                raise FileNotFoundError(f"The executable '{command_parts[0]}' was not found in the PATH.")
-            updated_files = get_all_files(destination)
-            data_files = list(updated_files - initial_files)
+            command_list = _command_list(run_command, source, destination)
+            before = stat_snapshot(destination)
+            try:
+                result = subprocess.run(command_list, check=True, text=True, capture_output=True)
+                print(f"Command output:\n{result.stdout}")
+            except subprocess.CalledProcessError as e:
+                print(f"Error executing command: {e}")
+                print(f"Command output:\n{e.output}")
+                return None
+            data_files = FileStats.from_paths(new_files(before, stat_snapshot(destination, previous=before)))
         else:
-            data_files = list(initial_files)
-        data_files = sorted(data_files)
+            data_files = scan_files(destination).sorted()
+            if tree is None:
+                tree = MerkleTree(destination).build(stats=data_files)
+
+    return dataset_entry_from_files(data_name, destination, data_files, source=source, run_command=run_command,
+                                    doi=doi, citation=citation, license=license, tree=tree)
 
-    number_of_files, total_size, file_formats, individual_sizes = get_file_info(data_files)
+
+def dataset_entry_from_files(data_name, destination, data_files, source=None, run_command=None, doi=None, citation=None, license=None, tree=None):
+    """
+    Builds the registry entry of `destination` from its files (a `FileStats` or a list of paths).
+
+    For folders, `tree` is the folder's built `MerkleTree`; it is built here if not given
+    (e.g. when `data_files` are only the files a run command added).
+    """
+    stats = data_files if isinstance(data_files, FileStats) else FileStats.from_paths(data_files)
+    data_files = stats.paths
+    number_of_files, total_size, file_formats, individual_sizes = get_file_info(stats)
     if number_of_files > 1000:
         print("WARNING: Consider zipping datasets >1000 files.")
 
-    hash = get_git_hash(destination)
+    # Folders also keep their Merkle tree so later changes can be localised and rehashed incrementally
+    if os.path.isdir(destination):
+        if tree is None:
+            tree = MerkleTree(destination).build()
+        hash = tree.digest
+    else:
+        tree = None
+        hash = get_git_hash(destination)
     created = datetime.now().strftime("%Y-%m-%dT%H:%M")
 
+    # Larger file lists go to a gzip JSONL manifest that is only read when needed
+    manifest = None
+    if number_of_files >= MANIFEST_MIN_FILES:
+        # The tree already holds the file digests
+        digests = {path: tree.file_digest(path) for path in data_files} if tree else {}
+        unknown = [path for path in data_files if not digests.get(path)]
+        if unknown:
+            digests.update(hash_files(unknown))
+        manifest = write_manifest(destination, [
+            {"path": path, "bytes": size, "hash": digests.get(path)} for path, size, _ in stats
+        ])
+
     entry = {
         "data_name": data_name or os.path.basename(destination),
         "data_type": os.path.basename(os.path.dirname(destination)),
         "destination": destination,
         "hash": hash,
         "number_of_files": number_of_files,
-        "total_size_mb": int(total_size),
-        "file_formats": list(file_formats),
+        "total_size_mb": round(total_size, 2),
+        "total_bytes": stats.total_bytes,
+        "file_formats": file_formats,
+        "format_totals": stats.by_extension(),
         "created": created,
         "lastest_change": None,
         "data_files": data_files,
@@ -195,119 +335,304 @@ def set_dataset(data_name, destination, source=None, run_command=None, json_file
         "license": license
     }
 
+    if tree:
+        entry["tree"] = write_tree(destination, tree.to_dict())
+    if manifest:
+        entry["manifest"] = manifest
+        del entry["data_files"], entry["data_size"]
+    return entry
+
+
+def registry_backend(backend: str = None):
+    """Returns the registry backend: the given one, DATASET_REGISTRY from .env, or 'json'."""
+    backend = (backend or load_from_env("DATASET_REGISTRY") or "json").lower()
+    if backend not in ("json", "sqlite"):
+        raise ValueError(f"Unknown dataset registry backend '{backend}'. Use 'json' or 'sqlite'.")
+    return backend
+
+
+def set_dataset(data_name, destination, source=None, run_command=None, json_file_path="./datasets.json", doi=None, citation=None, license=None, backend=None):
+    entry = build_dataset_entry(data_name, destination, source=source, run_command=run_command, doi=doi, citation=citation, license=license)
+    if entry is None:
+        return
+
+    if registry_backend(backend) == "sqlite":
+        json_file_path = str(pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path(json_file_path))
+        with open_sqlite_registry(json_file_path) as registry:
+            registry.upsert(entry)
+            return registry.export_json(json_file_path)
+
     return add_to_json(json_file_path=json_file_path, entry=entry)
 
-def generate_dataset_table(json_file_path: str):
-    import json, os
-    from collections import defaultdict
 
-    if not os.path.exists(json_file_path):
-        raise FileNotFoundError(f"The file {json_file_path} does not exist.")
+def set_datasets(destinations: list, json_file_path="./datasets.json", remove_missing: bool = False, normalize: bool = False, backend: str = None, trees: dict = None):
+    """
+    Registers many datasets with a single load and a single atomic write of the registry.
 
-    with open(json_file_path, "r", encoding="utf-8") as fh:
-        json_data = json.load(fh)
+    Args:
+        destinations (list): Files or folders to register.
+        json_file_path (str): Registry path relative to the project root.
+        remove_missing (bool): Also drop entries whose destination no longer exists.
+        normalize (bool): Also give every entry the same set of keys.
+        backend (str): 'json' or 'sqlite' (see `registry_backend`). With 'sqlite', the
+            registry lives in ./bin/datasets.db and `json_file_path` is exported from it.
+        trees (dict): Up-to-date `MerkleTree`s by destination, reused instead of rebuilding them.
 
-    datasets = json_data["datasets"]
-    hidden_fields = set(json_data.get("__hide_fields__", []))
+    Returns:
+        str: The absolute registry path.
+    """
+    json_file_path = str(pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path(json_file_path))
 
-    def is_nonempty(val):
-        return val not in (None, "", [], {}, "N/A", "Not provided")
+    entries = []
+    with get_hash_cache().batch():
+        # Hash all single-file datasets in parallel up front; build_dataset_entry then hits the cache
+        hash_files([check_path_format(d) for d in destinations if os.path.isfile(d)])
+        for destination in destinations:
+            entry = build_dataset_entry(data_name=None, destination=destination, tree=(trees or {}).get(destination))
+            if entry is not None:
+                entries.append(entry)
+
+    return commit_entries(entries, json_file_path=json_file_path, remove_missing=remove_missing, normalize=normalize, backend=backend)
+
+
+def commit_entries(entries: list, json_file_path: str, remove_missing: bool = False, normalize: bool = False, backend: str = None):
+    """
+    Writes many registry entries with a single load and a single atomic write.
+
+    Args:
+        entries (list): Entries from `build_dataset_entry`.
+        json_file_path (str): Absolute registry path.
+
+    Returns:
+        str: The registry path.
+    """
+    if registry_backend(backend) == "sqlite":
+        with open_sqlite_registry(json_file_path) as registry:
+            if remove_missing:
+                registry.remove_missing()
+            counts = registry.upsert_entries(entries, verbose=False)
+            print(f"Datasets: {counts['added']} added, {counts['updated']} updated, {counts['unchanged']} unchanged.")
+            return registry.export_json(json_file_path, normalize=normalize)
+
+    data = load_json_with_metadata(json_file_path)
+
+    if remove_missing:
+        _drop_missing_datasets(data)
+
+    counts = upsert_entries(data, entries, verbose=False)
+    print(f"Datasets: {counts['added']} added, {counts['updated']} updated, {counts['unchanged']} unchanged.")
+
+    if normalize:
+        _normalize_fields(data)
+
+    save_json_with_metadata(json_file_path, data)
+    return json_file_path
+
+def verify_datasets(json_file_path="./datasets.json"):
+    """
+    Checks the files of every dataset with a manifest against the recorded sizes and hashes,
+    and reports the folders whose Merkle digest changed (e.g. because of added files).
+
+    Returns:
+        dict: Mapping of destination to mismatched paths and changed folders (ending in '/'),
+        only for datasets with mismatches.
+    """
+    json_file_path = str(pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path(json_file_path))
+    data = load_json_with_metadata(json_file_path)
 
-    def safe_str(val):
-        return "N/A" if val in (None, "", [], {}, "Not provided") else str(val)
+    problems = {}
+    for ds in data["datasets"]:
+        mismatched = verify_manifest(ds)
+        changed_dirs = []
+        destination = ds.get("destination")
+        saved_tree = read_tree(ds)
+        old_dirs = saved_tree["dirs"] if saved_tree else ds.get("tree") if isinstance(ds.get("tree"), dict) else None
+        if old_dirs is not None and destination and os.path.isdir(destination):
+            changed_dirs = diff_subtrees(old_dirs, MerkleTree(destination).build().subtree_digests())
+
+        if mismatched or changed_dirs:
+            problems[destination] = mismatched + [f"{d}/" for d in changed_dirs]
+            where = ", ".join(d or "." for d in changed_dirs[:5]) + (" ..." if len(changed_dirs) > 5 else "")
+            print(f"❌ {ds.get('data_name')}: {len(mismatched)} file(s) missing or changed"
+                  + (f"; changes in {where}" if changed_dirs else ""))
+
+    if not problems:
+        print("✅ All dataset manifests match the files on disk.")
+    return problems
+
+_STANDARD_FIELDS = {
+    "data_name": "Name",
+    "destination": "Location",
+    "created": "Created",
+    "lastest_change": "Lastest Change",
+    "hash":"Hash",
+    "provided": "Provided",
+    "run_command": "Run Command",
+    "number_of_files": "Number of Files",
+    "total_size_mb": "Total Size",
+    "file_formats": "File Formats",
+    "source": "Source",
+    "DOI": "DOI",
+    "citation": "Citation",
+    "license": "License",
+    "notes": "Notes"
+}
+
+# Registry bookkeeping that is not shown as table columns
+_INTERNAL_FIELDS = {"manifest", "tree", "total_bytes", "format_totals"}
+
+_FIXED_DETAIL_FIELDS = [
+    "data_name", "data_files", "destination", "created", "lastest_change",
+    "hash", "provided", "data_size", "run_command", "source",
+    "DOI", "citation", "license", "notes"
+]
+
+
+def _is_nonempty(val):
+    return val not in (None, "", [], {}, "N/A", "Not provided")
+
+
+def _safe_str(val):
+    return "N/A" if val in (None, "", [], {}, "Not provided") else str(val)
+
+
+def _table_layout(json_data: dict):
+    """Returns the datasets grouped by data_type and the summary and detail column keys."""
+    datasets = json_data["datasets"]
+    hidden_fields = set(json_data.get("__hide_fields__", []))
 
     grouped = defaultdict(list)
     for ds in datasets:
         dtype = ds.get("data_type", "Uncategorised")
         grouped[dtype].append(ds)
 
-    standard_fields = {
-        "data_name": "Name",
-        "destination": "Location",
-        "created": "Created",
-        "lastest_change": "Lastest Change",
-        "hash":"Hash",
-        "provided": "Provided",
-        "run_command": "Run Command",
-        "number_of_files": "Number of Files",
-        "total_size_mb": "Total Size (MB)",
-        "file_formats": "File Formats",
-        "source": "Source",
-        "DOI": "DOI",
-        "citation": "Citation",
-        "license": "License",
-        "notes": "Notes"
-    }
-
-    fixed_detail_fields = [
-        "data_name", "data_files", "destination", "created", "lastest_change",
-        "hash", "provided", "data_size", "run_command", "source",
-        "DOI", "citation", "license", "notes"
-    ]
-
-    def get_field_label(key):
-        return standard_fields.get(key, key.replace("_", " ").title())
-
     active_fields = [
-        k for k in standard_fields
-        if k not in hidden_fields and any(is_nonempty(ds.get(k)) for ds in datasets)
+        k for k in _STANDARD_FIELDS
+        if k not in hidden_fields and any(_is_nonempty(ds.get(k)) for ds in datasets)
     ]
 
     all_seen_keys = {k for ds in datasets for k in ds.keys()}
-    excluded_keys = set(standard_fields) | {"data_type", "data_files", "data_size", "hash"}
+    excluded_keys = set(_STANDARD_FIELDS) | {"data_type", "data_files", "data_size", "hash"} | _INTERNAL_FIELDS
     extra_fields = sorted(all_seen_keys - excluded_keys - hidden_fields)
 
-    all_summary_keys = active_fields + extra_fields
-    summary_header = "| " + " | ".join([get_field_label(k) for k in all_summary_keys]) + " |\n"
-    summary_divider = "| " + " | ".join(["-" * len(get_field_label(k)) for k in all_summary_keys]) + " |\n"
-
     extra_detail_keys = sorted(
-        set(k for ds in datasets for k in ds.keys())
-        - set(fixed_detail_fields)
-        - {"data_type"} - hidden_fields
+        all_seen_keys
+        - set(_FIXED_DETAIL_FIELDS)
+        - {"data_type"} - _INTERNAL_FIELDS - hidden_fields
     )
-    all_detail_keys = fixed_detail_fields + extra_detail_keys
-    detail_header = "| " + " | ".join([k.replace("_", " ").title() for k in all_detail_keys]) + " |\n"
-    detail_divider = "| " + " | ".join(["-" * len(k) for k in all_detail_keys]) + " |\n"
+    return grouped, active_fields + extra_fields, _FIXED_DETAIL_FIELDS + extra_detail_keys
+
+
+def _table_header(labels: list):
+    return "| " + " | ".join(labels) + " |\n" + "| " + " | ".join(["-" * len(label) for label in labels]) + " |\n"
+
+
+def _summary_row(ds: dict, summary_keys: list):
+    row = []
+    for k in summary_keys:
+        if k == "provided":
+            val = "Provided" if is_provided(ds) else "Can be re-created"
+        elif k == "file_formats":
+            totals = ds.get("format_totals")
+            if totals:
+                val = "; ".join(f"{ext or '(none)'} ({t['files']}, {format_bytes(t['bytes'])})" for ext, t in totals.items())
+            else:
+                val = "; ".join(ds.get("file_formats") or []) or "N/A"
+        elif k == "total_size_mb" and isinstance(ds.get("total_bytes"), int):
+            val = format_bytes(ds["total_bytes"])
+        elif k == "total_size_mb" and isinstance(ds.get(k), (int, float)):
+            val = format_bytes(ds[k] * MB)
+        else:
+            val = ds.get(k, "N/A")
+        row.append(_safe_str(val))
+    return "| " + " | ".join(row) + " |\n"
+
+
+def _collapsed_files(ds: dict, collapse_by: str):
+    """
+    Aggregates the files of a dataset per directory or per extension while streaming its file list.
+
+    Yields:
+        tuple: (label, size in MB) per group, e.g. ('raw/2024/ (1200 files)', 5321).
+    """
+    if collapse_by == "extension" and ds.get("format_totals"):
+        # Per-format totals are stored in the entry, so the file list need not be read
+        for ext, totals in sorted(ds["format_totals"].items()):
+            yield f"{ext or '(no extension)'} ({totals['files']} files)", totals["bytes"] / MB
+        return
+
+    groups = {}
+    for path, size in dataset_files(ds):
+        if collapse_by == "extension":
+            key = os.path.splitext(path)[1].lower() or "(no extension)"
+        else:
+            key = os.path.dirname(path) + "/"
+        count, total = groups.get(key, (0, 0))
+        groups[key] = (count + 1, total + (size if isinstance(size, (int, float)) else 0))
+
+    for key in sorted(groups):
+        count, total = groups[key]
+        yield f"{key} ({count} files)", total
+
+
+def _detail_rows(ds: dict, detail_keys: list, collapse_above: int = None, collapse_by: str = "directory"):
+    """Yields the detail table rows of one dataset, one per file or one per collapsed group."""
+    if collapse_above and file_count(ds) > collapse_above:
+        files = _collapsed_files(ds, collapse_by)
+    else:
+        files = dataset_files(ds)
+
+    provided = "Provided" if is_provided(ds) else "Can be re-created"
+    # Columns that are the same for every file of the dataset
+    constant = {k: _safe_str(ds.get(k)) for k in detail_keys if k not in ("data_files", "data_size", "provided")}
+
+    for f, sz in files:
+        detail_row = []
+        for k in detail_keys:
+            if k == "data_files":
+                detail_row.append(_safe_str(f))
+            elif k == "data_size":
+                detail_row.append(format_bytes(sz * MB) if isinstance(sz, (int, float)) else _safe_str(sz))
+            elif k == "provided":
+                detail_row.append(provided)
+            else:
+                detail_row.append(constant[k])
+        yield "| " + " | ".join(detail_row) + " |\n"
+
+
+def _load_table_data(json_file_path: str):
+    if not os.path.exists(json_file_path):
+        raise FileNotFoundError(f"The file {json_file_path} does not exist.")
+
+    with open(json_file_path, "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def generate_dataset_table(json_file_path: str, collapse_above: int = None, collapse_by: str = "directory"):
+    """
+    Builds the summary and detail markdown tables in memory.
+
+    See `write_dataset_tables` to stream the detail table to a file instead.
+    """
+    json_data = _load_table_data(json_file_path)
+    grouped, summary_keys, detail_keys = _table_layout(json_data)
+
+    summary_header = _table_header([_STANDARD_FIELDS.get(k, k.replace("_", " ").title()) for k in summary_keys])
+    detail_header = _table_header([k.replace("_", " ").title() for k in detail_keys])
 
     summary_blocks = []
     detail_blocks = []
 
     for dtype, entries in sorted(grouped.items()):
-        summary_blocks.append(f"### {dtype}\n{summary_header}{summary_divider}")
-        need_detail = any(len(ds.get("data_files", [])) > 1 for ds in entries)
+        summary_blocks.append(f"### {dtype}\n{summary_header}")
+        need_detail = any(file_count(ds) > 1 for ds in entries)
         if need_detail:
-            detail_blocks.append(f"### {dtype}\n{detail_header}{detail_divider}")
+            detail_blocks.append(f"### {dtype}\n{detail_header}")
 
         for ds in entries:
-            row = []
-            for k in all_summary_keys:
-                if k == "provided":
-                    val = "Provided" if ds.get("data_files") else "Can be re-created"
-                elif k == "file_formats":
-                    val = "; ".join(ds.get("file_formats", [])) or "N/A"
-                else:
-                    val = ds.get(k, "N/A")
-                row.append(safe_str(val))
-            summary_blocks.append("| " + " | ".join(row) + " |\n")
-
+            summary_blocks.append(_summary_row(ds, summary_keys))
             if need_detail:
-                files = ds.get("data_files", [])
-                sizes = ds.get("data_size", [])
-                if len(sizes) < len(files):
-                    sizes += ["?"] * (len(files) - len(sizes))
-                for f, sz in zip(files, sizes):
-                    detail_row = []
-                    for k in all_detail_keys:
-                        if k == "data_files":
-                            detail_row.append(safe_str(f))
-                        elif k == "data_size":
-                            detail_row.append(safe_str(sz))
-                        elif k == "provided":
-                            detail_row.append("Provided" if ds.get("data_files") else "Can be re-created")
-                        else:
-                            detail_row.append(safe_str(ds.get(k)))
-                    detail_blocks.append("| " + " | ".join(detail_row) + " |\n")
+                detail_blocks.extend(_detail_rows(ds, detail_keys, collapse_above, collapse_by))
 
         summary_blocks.append("\n")
         if need_detail:
@@ -316,6 +641,54 @@ def generate_dataset_table(json_file_path: str):
     return "".join(summary_blocks), "".join(detail_blocks)
 
 
+def write_dataset_tables(json_file_path: str, dcas_path: str, collapse_above: int = None, collapse_by: str = "directory"):
+    """
+    Writes the per-file detail table straight to `dcas_path` and returns the summary table.
+
+    Rows are written as they are produced and file lists are streamed from the manifests, so
+    memory does not grow with the number of files. Datasets with more than `collapse_above`
+    files are written as one row per directory (or per extension) instead of one row per file.
+
+    Args:
+        json_file_path (str): Path to datasets.json.
+        dcas_path (str): Output markdown file (e.g. 'DCAS template/dataset_list.md').
+        collapse_above (int): Collapse datasets with more files than this. None never collapses.
+        collapse_by (str): 'directory' or 'extension'.
+
+    Returns:
+        str: The summary markdown table (one row per dataset) for the README.
+    """
+    if collapse_by not in ("directory", "extension"):
+        raise ValueError("collapse_by must be 'directory' or 'extension'.")
+
+    json_data = _load_table_data(json_file_path)
+    grouped, summary_keys, detail_keys = _table_layout(json_data)
+
+    summary_header = _table_header([_STANDARD_FIELDS.get(k, k.replace("_", " ").title()) for k in summary_keys])
+    detail_header = _table_header([k.replace("_", " ").title() for k in detail_keys])
+
+    summary_blocks = []
+    tmp_path = f"{dcas_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as out_md:
+        for dtype, entries in sorted(grouped.items()):
+            summary_blocks.append(f"### {dtype}\n{summary_header}")
+            need_detail = any(file_count(ds) > 1 for ds in entries)
+            if need_detail:
+                out_md.write(f"### {dtype}\n{detail_header}")
+
+            for ds in entries:
+                summary_blocks.append(_summary_row(ds, summary_keys))
+                if need_detail:
+                    out_md.writelines(_detail_rows(ds, detail_keys, collapse_above, collapse_by))
+
+            summary_blocks.append("\n")
+            if need_detail:
+                out_md.write("\n")
+    os.replace(tmp_path, dcas_path)
+
+    return "".join(summary_blocks)
+
+
 def dataset_to_readme(markdown_table: str, readme_file: str = "./README.md"):
     section_title = "**The following datasets are included in the project:**"
     readme_file = str(pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path(readme_file))
@@ -339,47 +712,306 @@ def dataset_to_readme(markdown_table: str, readme_file: str = "./README.md"):
     print(f"{readme_file} successfully updated with dataset section.")
 
 
-@ensure_correct_kernel
-def main():
-    def get_data_files(base_dir='./data', ignore=None, recursive=False):
-        if ignore is None:
-            ignore = {'.git', '.gitignore', '.gitkeep', '.gitlog'}
-        all_files = []
+def load_acquisitions(manifest_file: str):
+    """
+    Reads the acquisition manifest: a JSON list (or {"datasets": [...]}) or a TOML file with
+    [[datasets]] tables. Each item takes the arguments of `set_dataset`:
+    data_name, destination, source, run_command, doi, citation and license.
+    """
+    if manifest_file.endswith(".toml"):
+        items = load_toml_file(manifest_file).get("datasets", [])
+    else:
+        with open(manifest_file, "r", encoding="utf-8") as f:
+            items = json.load(f)
+        if isinstance(items, dict):
+            items = items.get("datasets", [])
+
+    for i, item in enumerate(items):
+        if not item.get("destination") or not item.get("run_command"):
+            raise ValueError(f"Acquisition #{i + 1} in {manifest_file} needs a 'destination' and a 'run_command'.")
+    return items
+
+
+def _run_acquisition(item: dict, destination: str, command_list: list, log_dir: pathlib.Path, print_lock: threading.Lock):
+    """Runs one resolved acquisition command with its output streamed to a log file and returns (item, entry, error)."""
+    name = item.get("data_name") or os.path.basename(os.path.normpath(destination))
+    log_file = log_dir / f"{re.sub(r'[^A-Za-z0-9_.-]+', '_', name)}.log"
+
+    try:
+        os.makedirs(destination, exist_ok=True)
+        before = stat_snapshot(destination)
+        start = time.perf_counter()
+        with open(log_file, "w", encoding="utf-8") as log:
+            log.write(f"$ {' '.join(command_list)}\n")
+            log.flush()
+            returncode = subprocess.call(command_list, stdout=log, stderr=subprocess.STDOUT)
+        elapsed = time.perf_counter() - start
+        if returncode != 0:
+            return item, None, f"exit code {returncode} (see {log_file})"
+
+        data_files = new_files(before, stat_snapshot(destination, previous=before))
+        entry = dataset_entry_from_files(item.get("data_name"), destination, data_files,
+                                         source=item.get("source"), run_command=item["run_command"],
+                                         doi=item.get("doi"), citation=item.get("citation"), license=item.get("license"))
+        with print_lock:
+            print(f"✅ {name}: {len(data_files)} new file(s) in {elapsed:.1f}s")
+        return item, entry, None
+    except Exception as e:
+        return item, None, str(e)
+
+
+def acquire_datasets(manifest_file="./acquire.json", json_file_path="./datasets.json", max_workers: int = 4, backend: str = None):
+    """
+    Runs the download/generation commands of an acquisition manifest in a bounded worker pool.
+
+    Each run streams its output to ./bin/acquire_logs/<timestamp>/<name>.log, new files are
+    found by comparing per-folder stat snapshots, and all successful datasets are written to
+    the registry in one commit at the end.
+
+    Returns:
+        tuple: (registry path, list of (data_name, error) for failed runs)
+    """
+    project_root = pathlib.Path(__file__).resolve().parent.parent.parent
+    items = load_acquisitions(str(project_root / pathlib.Path(manifest_file)))
+    if not items:
+        print(f"No acquisitions found in {manifest_file}.")
+        return None, []
+
+    log_dir = project_root / "bin" / "acquire_logs" / datetime.now().strftime("%Y%m%dT%H%M%S")
+    log_dir.mkdir(parents=True, exist_ok=True)
+    print(f"📥 Running {len(items)} acquisition(s) with {max_workers} worker(s); logs in {log_dir}")
+
+    entries, failed = [], []
+
+    # Resolve the executables before starting workers: is_installed may update .env and the
+    # shell profile, which must not be read-modified-written by several threads at once
+    runs = []
+    for item in items:
+        destination = check_path_format(item["destination"])
         try:
-            subdirs = [name for name in os.listdir(base_dir)
-                       if os.path.isdir(os.path.join(base_dir, name))
-                       and name not in ignore and not name.startswith('.')]
-        except FileNotFoundError:
-            return []
-        for sub in sorted(subdirs):
-            sub_path = os.path.join(base_dir, sub)
-            for root, dirs, files in os.walk(sub_path) if recursive else [(sub_path, [], os.listdir(sub_path))]:
-                dirs[:] = [d for d in dirs if d not in ignore and not d.startswith('.')]
-                for fn in files:
-                    if fn not in ignore and not fn.startswith('.'):
-                        all_files.append(os.path.join(root, fn))
-        return all_files
+            runs.append((item, destination, _command_list(item["run_command"], item.get("source"), destination)))
+        except FileNotFoundError as e:
+            name = item.get("data_name") or item["destination"]
+            failed.append((name, str(e)))
+            print(f"❌ {name}: {e}")
+
+    print_lock = threading.Lock()
+    with get_hash_cache().batch():
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for item, entry, error in executor.map(lambda run: _run_acquisition(*run, log_dir, print_lock), runs):
+                if error:
+                    name = item.get("data_name") or item["destination"]
+                    failed.append((name, error))
+                    with print_lock:
+                        print(f"❌ {name}: {error}")
+                else:
+                    entries.append(entry)
+
+    json_file_path = str(project_root / pathlib.Path(json_file_path))
+    if entries:
+        commit_entries(entries, json_file_path=json_file_path, normalize=True, backend=backend)
+    print(f"Acquired {len(entries)} dataset(s), {len(failed)} failed.")
+    return json_file_path, failed
+
+
+def dedup_datasets(base_dir="./data", min_size: int = 1, link: str = None, top: int = 20):
+    """
+    Reports files with identical content across the data folders (e.g. the same raw file copied
+    into 00_raw, 01_interim and 02_processed) and the space that linking them would save.
+
+    Args:
+        base_dir (str): Folder to scan.
+        min_size (int): Ignore files smaller than this many bytes.
+        link (str): None to only report, or 'hardlink'/'reflink' to replace every copy with a
+            link to the first path of its group.
+        top (int): Number of groups to list.
+
+    Returns:
+        dict: {"groups": [(size, paths), ...], "reclaimable_bytes": int, "linked": int, "failed": [(path, error)]}
+    """
+    duplicates = find_duplicates([base_dir], min_size=min_size)
+    reclaimable = sum(size * (len(paths) - 1) for size, paths in duplicates)
+
+    if not duplicates:
+        print("✅ No duplicate files found.")
+    else:
+        print(f"🔍 {len(duplicates)} group(s) of identical files; {reclaimable / (1024 * 1024):.1f} MB could be saved.")
+        for size, paths in duplicates[:top]:
+            print(f"  {size / (1024 * 1024):.1f} MB x {len(paths)}: {paths[0]}")
+            for path in paths[1:]:
+                print(f"      = {path}")
+        if len(duplicates) > top:
+            print(f"  ... and {len(duplicates) - top} more group(s).")
+
+    linked, failed = 0, []
+    if link and duplicates:
+        for size, paths in duplicates:
+            for duplicate in paths[1:]:
+                try:
+                    if os.path.getsize(duplicate) != size:
+                        raise OSError("file changed since it was hashed")
+                    link_duplicate(paths[0], duplicate, mode=link)
+                    linked += 1
+                except OSError as e:
+                    failed.append((duplicate, str(e)))
+        print(f"🔗 Replaced {linked} copies with {link}s." + (f" {len(failed)} failed, e.g. {failed[0][0]}: {failed[0][1]}" if failed else ""))
+
+    return {"groups": duplicates, "reclaimable_bytes": reclaimable, "linked": linked, "failed": failed}
+
+
+def get_data_files(base_dir='./data', ignore=None, recursive=False):
+    """Returns the dataset destinations: every file or folder inside the ./data/<data_type> folders."""
+    if ignore is None:
+        ignore = {'.git', '.gitignore', '.gitkeep', '.gitlog'}
+    all_files = []
+    try:
+        subdirs = [name for name in os.listdir(base_dir)
+                   if os.path.isdir(os.path.join(base_dir, name))
+                   and name not in ignore and not name.startswith('.')]
+    except FileNotFoundError:
+        return []
+    for sub in sorted(subdirs):
+        sub_path = os.path.join(base_dir, sub)
+        for root, dirs, files in os.walk(sub_path) if recursive else [(sub_path, [], os.listdir(sub_path))]:
+            dirs[:] = [d for d in dirs if d not in ignore and not d.startswith('.')]
+            for fn in files:
+                if fn not in ignore and not fn.startswith('.'):
+                    all_files.append(os.path.join(root, fn))
+    return all_files
 
-    json_file_path = "./datasets.json"
-    data_files = get_data_files()
-    json_file_path = remove_missing_datasets(data_files, json_file_path=json_file_path)
 
-    for f in data_files:
-        json_file_path = set_dataset(data_name=None, destination=f, source=None,
-                                     run_command=None, json_file_path=json_file_path,
-                                     doi=None, citation=None, license=None)
+def _changed_destinations(paths, base_dir="./data"):
+    """Groups changed paths under `base_dir` by the dataset destination (./data/<data_type>/<name>) they belong to."""
+    base = os.path.abspath(base_dir)
+    destinations = defaultdict(list)
+    for path in paths:
+        rel = os.path.relpath(os.path.abspath(path), base)
+        parts = pathlib.PurePath(rel).parts
+        if len(parts) < 2 or parts[0] == ".." or any(part.startswith(".") for part in parts[:2]):
+            continue
+        destinations[os.path.join(base_dir, parts[0], parts[1])].append(path)
+    return destinations
+
 
+def update_dataset_docs(json_file_path: str, collapse_above: int = None, collapse_by: str = "directory"):
+    """Regenerates 'DCAS template/dataset_list.md' and the dataset section of README.md from the registry."""
     try:
-        normalize_dataset_fields(json_file_path)
-        markdown_table, full_table = generate_dataset_table(json_file_path)
-        dataset_to_readme(markdown_table)
         dcas_path = str(pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path("./DCAS template/dataset_list.md"))
-        with open(dcas_path, 'w') as out_md:
-            out_md.write(full_table)
+        markdown_table = write_dataset_tables(json_file_path, dcas_path, collapse_above=collapse_above, collapse_by=collapse_by)
+        dataset_to_readme(markdown_table)
     except Exception as e:
         print(f"Error: {e}")
 
 
+def watch_datasets(json_file_path="./datasets.json", base_dir="./data", backend: str = None, debounce: float = 2.0,
+                   polling: bool = False, collapse_above: int = None, collapse_by: str = "directory"):
+    """
+    Watches `base_dir` and keeps the registry, README.md and DCAS table up to date.
+
+    Changes are collected until `base_dir` has been quiet for `debounce` seconds. Only the
+    datasets containing changed files are rebuilt, deleted datasets are dropped, and the
+    documentation is regenerated once per batch. The Merkle trees of folder datasets are kept
+    in memory (first loaded from their saved copies) and only the changed files and their
+    ancestor folders are rehashed.
+    """
+    from .watch_tools import watch_changes
+
+    trees = {}  # normalized destination -> MerkleTree, kept between batches
+
+    def load_tree(destination: str):
+        registry_path = pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path(json_file_path)
+        for ds in load_json_with_metadata(str(registry_path))["datasets"]:
+            if ds.get("destination") and os.path.normpath(ds["destination"]) == destination:
+                saved = read_tree(ds)
+                return MerkleTree.from_dict(destination, saved) if saved else None
+        return None
+
+    def apply_changes(paths):
+        if paths is None:
+            print("⚠️ Change events were lost; rescanning all datasets.")
+            trees.clear()
+            destinations = get_data_files(base_dir)
+        else:
+            changed = _changed_destinations(paths, base_dir)
+            destinations = sorted(d for d in changed if os.path.exists(d))
+            print(f"🔄 {len(paths)} changed path(s) in {len(destinations)} dataset(s).")
+            for destination in changed:
+                key = os.path.normpath(destination)
+                if not os.path.isdir(destination):
+                    trees.pop(key, None)
+                    continue
+                tree = trees.get(key) or load_tree(key)
+                if tree is not None:
+                    tree.update(changed[destination])
+                    trees[key] = tree
+
+        # build_dataset_entry gets the destination as listed here; match the trees on normalized paths
+        current = {d: trees[os.path.normpath(d)] for d in destinations if os.path.normpath(d) in trees}
+        set_datasets(destinations, json_file_path=json_file_path, remove_missing=True, normalize=True, backend=backend, trees=current)
+        update_dataset_docs(json_file_path, collapse_above=collapse_above, collapse_by=collapse_by)
+
+    def on_change(paths):
+        # Files often vanish mid-batch (editor and download temp files); retry rather than stop watching
+        try:
+            apply_changes(paths)
+        except OSError as e:
+            print(f"⚠️ Updating the datasets failed ({e}); rescanning once '{base_dir}' is quiet.")
+            trees.clear()
+            return True
+        return False
+
+    os.makedirs(base_dir, exist_ok=True)
+    watch_changes(base_dir, on_change, debounce=debounce, polling=polling)
+
+
+@ensure_correct_kernel
+def main():
+    parser = argparse.ArgumentParser(description="Register datasets in './data' and update README.md and the DCAS dataset list.")
+    parser.add_argument("command", nargs="?", choices=["acquire", "dedup"], help="'acquire': run the commands in the acquisition manifest; 'dedup': report (and link) duplicate files in './data'")
+    parser.add_argument("--manifest", default="./acquire.json", help="Acquisition manifest (.json or .toml) for 'acquire' (default: ./acquire.json)")
+    parser.add_argument("--jobs", type=int, default=4, help="Parallel acquisitions for 'acquire' (default: 4)")
+    parser.add_argument("--link", choices=["hardlink", "reflink"], default=None, help="With 'dedup', replace duplicate copies with hard links or reflinks")
+    parser.add_argument("--min-size", type=int, default=1, help="With 'dedup', ignore files smaller than this many bytes (default: 1)")
+    parser.add_argument("--backend", choices=["json", "sqlite"], default=None, help="Registry backend (default: DATASET_REGISTRY in .env, otherwise json)")
+    parser.add_argument("--verify", action="store_true", help="Only check the registered files against their manifests")
+    parser.add_argument("--collapse-above", type=int, default=None, help="In the DCAS table, aggregate datasets with more files than this")
+    parser.add_argument("--collapse-by", choices=["directory", "extension"], default=None, help="How to aggregate collapsed datasets (default: directory)")
+    parser.add_argument("--watch", action="store_true", help="Keep running and re-register datasets in './data' as they change")
+    parser.add_argument("--debounce", type=float, default=2.0, help="With --watch, seconds without changes before updating (default: 2)")
+    parser.add_argument("--poll", action="store_true", help="With --watch, poll for changes instead of using inotify")
+    args = parser.parse_args()
+
+    if args.command == "dedup":
+        dedup_datasets(min_size=args.min_size, link=args.link)
+        return
+
+    if args.verify:
+        verify_datasets()
+        return
+
+    # Collapsing of large datasets in the DCAS table: CLI flags, then [tool.dcas] in project.toml
+    dcas_config = get_project_config().section("dcas") or {}
+    collapse_above = args.collapse_above if args.collapse_above is not None else dcas_config.get("collapse_above")
+    collapse_by = args.collapse_by or dcas_config.get("collapse_by", "directory")
+
+    json_file_path = "./datasets.json"
+    if args.command == "acquire":
+        acquired_path, failed = acquire_datasets(args.manifest, json_file_path=json_file_path, max_workers=args.jobs, backend=args.backend)
+        if acquired_path:
+            update_dataset_docs(acquired_path, collapse_above=collapse_above, collapse_by=collapse_by)
+        if failed:
+            sys.exit(1)
+        return
+
+    data_files = get_data_files()
+    json_file_path = set_datasets(data_files, json_file_path=json_file_path, remove_missing=True, normalize=True, backend=args.backend)
+    update_dataset_docs(json_file_path, collapse_above=collapse_above, collapse_by=collapse_by)
+
+    if args.watch:
+        watch_datasets(json_file_path, backend=args.backend, debounce=args.debounce, polling=args.poll,
+                       collapse_above=collapse_above, collapse_by=collapse_by)
+
+
 if __name__ == "__main__":
     project_root = pathlib.Path(__file__).resolve().parent.parent.parent
     os.chdir(project_root)
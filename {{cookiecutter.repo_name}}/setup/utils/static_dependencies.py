@@ -0,0 +1,312 @@
+import os
+import re
+import json
+import pathlib
+import zipfile
+
+# ──────────────────────────────
+# R: library()/require()/pkg::
+# ──────────────────────────────
+
+_R_TOKEN = re.compile(r"""
+    (?P<comment>\#[^\n]*)
+  | (?P<raw>[rR](?P<q>["'])(?P<dash>-*)[(\[{].*?[)\]}](?P=dash)(?P=q))
+  | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+  | (?P<namespace>(?:[A-Za-z]|\.[A-Za-z_.])[A-Za-z0-9._]*)\s*:::?(?!=)
+  | (?P<name>(?:[A-Za-z]|\.[A-Za-z_.])[A-Za-z0-9._]*|`[^`\n]+`)
+  | (?P<punct>[(),=])
+""", re.VERBOSE | re.DOTALL)
+
+_R_LOADERS = {"library", "require", "requireNamespace", "loadNamespace", "p_load", "p_install"}
+_R_CHUNK = re.compile(r"^```+\s*\{[rR][ ,}][^\n]*\n(.*?)^```+", re.MULTILINE | re.DOTALL)
+_R_BASE = {"base", "stats", "utils", "methods", "graphics", "grDevices", "datasets", "tools", "parallel",
+           "grid", "splines", "stats4", "tcltk", "compiler"}
+
+
+def _r_code(path: str, text: str):
+    """Returns the R code of a script, or only the R chunks of an R Markdown / Quarto document."""
+    if path.lower().endswith((".rmd", ".qmd", ".rmarkdown")):
+        return "\n".join(_R_CHUNK.findall(text))
+    return text
+
+
+def _r_value(kind: str, value: str):
+    if kind == "string":
+        return value[1:-1]
+    if kind == "name":
+        return value.strip("`")
+    return None
+
+
+def extract_r_packages(text: str):
+    """
+    Returns the packages an R script uses through library(), require(), requireNamespace(),
+    loadNamespace(), pacman::p_load() and pkg::fun / pkg:::fun. Strings and comments are
+    tokenized first, so 'library(' inside them does not count.
+    """
+    tokens = [(m.lastgroup if m.lastgroup not in ("q", "dash") else "raw", m.group(m.lastgroup))
+              for m in _R_TOKEN.finditer(text)]
+    tokens = [(kind, value) for kind, value in tokens if kind not in ("comment", "raw")]
+
+    packages = set()
+    i = 0
+    while i < len(tokens):
+        kind, value = tokens[i]
+        if kind == "namespace":
+            packages.add(value)
+        elif kind == "name" and value in _R_LOADERS and i + 1 < len(tokens) and tokens[i + 1] == ("punct", "("):
+            # Collect the positional arguments of the call at depth 1
+            depth, j, args, named, current = 1, i + 2, [], {}, []
+            while j < len(tokens) and depth:
+                kind_j, value_j = tokens[j]
+                if value_j == "(" and kind_j == "punct":
+                    depth += 1
+                elif value_j == ")" and kind_j == "punct":
+                    depth -= 1
+                if depth == 1 and kind_j == "punct" and value_j == ",":
+                    args.append(current)
+                    current = []
+                elif depth >= 1:
+                    current.append((kind_j, value_j))
+                j += 1
+            args.append(current)
+
+            positional = []
+            for arg in args:
+                if len(arg) >= 3 and arg[1] == ("punct", "="):
+                    named[arg[0][1]] = arg[2:]
+                elif len(arg) == 1:
+                    positional.append(_r_value(*arg[0]))
+            if value not in ("p_load", "p_install"):
+                positional = positional[:1]
+                # library(package = haven), requireNamespace(package = "haven")
+                if not positional and len(named.get("package", [])) == 1:
+                    positional = [_r_value(*named["package"][0])]
+            if [token[1] for token in named.get("character.only", [])] in (["TRUE"], ["T"]):
+                positional = []  # The argument is a variable holding the name
+            packages.update(p for p in positional if p)
+            i = j
+            continue
+        i += 1
+
+    return packages - _R_BASE
+
+
+# ──────────────────────────────
+# Stata: ssc install / net install / which
+# ──────────────────────────────
+
+_STATA_BLOCK_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+_STATA_CONTINUATION = re.compile(r"\s*///[^\n]*\n")
+_STATA_LINE_COMMENT = re.compile(r"(^|\s)//.*$")
+_STATA_PREFIX = r"(?:(?:cap(?:t|tu|tur|ture)?|qui(?:e|et|etl|etly)?|n(?:oi|ois|oisi|oisil|oisily)?)\s*:?\s+)*"
+_STATA_INSTALL = re.compile(rf"^\s*{_STATA_PREFIX}(ssc|net)\s+inst(?:a|al|all)?\s+([A-Za-z0-9_\-]+)", re.IGNORECASE)
+_STATA_WHICH = re.compile(rf"^\s*{_STATA_PREFIX}which\s+([A-Za-z0-9_]+)", re.IGNORECASE)
+
+
+def extract_stata_packages(text: str):
+    """Returns the community packages a do-file installs or checks ('ssc install', 'net install', 'which')."""
+    text = _STATA_CONTINUATION.sub(" ", _STATA_BLOCK_COMMENT.sub(" ", text))
+    packages = set()
+    for line in text.splitlines():
+        if line.lstrip().startswith("*"):
+            continue
+        line = _STATA_LINE_COMMENT.sub("", line)
+        match = _STATA_INSTALL.match(line)
+        if match:
+            packages.add(f"{match.group(2).lower()} ({match.group(1).lower()})")
+            continue
+        match = _STATA_WHICH.match(line)
+        if match:
+            packages.add(f"{match.group(1).lower()} (which)")
+    return packages
+
+
+# ──────────────────────────────
+# MATLAB: toolbox function usage
+# ──────────────────────────────
+
+# Distinctive functions of common toolboxes (functions shared with base MATLAB, and generic
+# names such as step, fit or distance that are often used as variables, are left out)
+_MATLAB_TOOLBOX_FUNCTIONS = {
+    "Statistics and Machine Learning Toolbox": (
+        "fitlm fitglm fitlme fitglme fitnlm fitrlinear fitclinear fitctree fitrtree fitcsvm fitrsvm fitcknn "
+        "fitcensemble fitrensemble fitcnb fitcdiscr fitrgp fitdist makedist ttest ttest2 vartest2 ranksum signrank "
+        "kstest lillietest anova1 anova2 anovan multcompare normfit normpdf normcdf norminv tpdf tcdf tinv chi2cdf "
+        "chi2inv fcdf finv betapdf gampdf binopdf poisspdf prctile quantile iqr mad nanmean "
+        "nanstd nanmedian zscore pca kmeans kmedoids linkage pdist pdist2 ksdensity boxplot crossval "
+        "cvpartition stepwiselm lasso ridge regress glmfit glmval robustfit corrcoef partialcorr tabulate grpstats "
+        "crosstab mnrfit mvnrnd mvnpdf"
+    ),
+    "Optimization Toolbox": (
+        "fmincon fminunc linprog intlinprog quadprog lsqnonlin lsqcurvefit lsqlin lsqnonneg fgoalattain fminimax "
+        "fseminf fsolve optimoptions optimproblem optimvar"
+    ),
+    "Global Optimization Toolbox": "ga gamultiobj particleswarm patternsearch simulannealbnd surrogateopt GlobalSearch MultiStart",
+    "Signal Processing Toolbox": (
+        "butter cheby1 cheby2 ellip filtfilt designfilt pwelch periodogram spectrogram findpeaks resample "
+        "decimate upsample downsample hilbert xcorr xcov freqz tfestimate mscohere sgolayfilt medfilt1 envelope "
+        "bandpass lowpass highpass"
+    ),
+    "Image Processing Toolbox": (
+        "imresize imfilter imrotate imcrop imadjust histeq imbinarize bwlabel bwconncomp regionprops bwareaopen "
+        "imerode imdilate imopen imclose strel rgb2lab imgaussfilt imsharpen montage imtool"
+    ),
+    "Econometrics Toolbox": "arima garch egarch gjr varm vecm adftest kpsstest pptest lmctest egcitest jcitest archtest lbqtest hpfilter",
+    "Financial Toolbox": "portfolio blsprice blsdelta pvfix fvfix irr xirr ret2tick tick2ret ewstats",
+    "Curve Fitting Toolbox": "fittype cfit sfit fitoptions smoothingspline csaps spap2",
+    "Symbolic Math Toolbox": "syms sym symfun vpa vpasolve dsolve matlabFunction",
+    "Parallel Computing Toolbox": "parpool gcp parfeval parfevalOnAll spmd gpuArray createJob",
+    "Deep Learning Toolbox": "trainNetwork trainnet dlarray dlnetwork feedforwardnet patternnet fitnet trainingOptions",
+    "Mapping Toolbox": "geoshow worldmap axesm shaperead shapewrite geotiffread km2deg deg2km",
+    "Control System Toolbox": "zpk bode nyquist impulse lsim pidtune c2d d2c rlocus",
+    "Database Toolbox": "sqlread sqlwrite",
+}
+_MATLAB_FUNCTION_INDEX = {
+    function: toolbox for toolbox, functions in _MATLAB_TOOLBOX_FUNCTIONS.items() for function in functions.split()
+}
+
+_MATLAB_BLOCK_COMMENT = re.compile(r"^\s*%\{\s*$.*?^\s*%\}\s*$", re.MULTILINE | re.DOTALL)
+_MATLAB_TOKEN = re.compile(r"""
+    (?P<comment>%[^\n]*|\.\.\.[^\n]*)
+  | (?P<dstring>"(?:[^"\n]|"")*")
+  | (?P<transpose>(?<=[\w)\]}.'])')
+  | (?P<sstring>'(?:[^'\n]|'')*')
+  | (?P<field>\.\s*[A-Za-z]\w*)
+  | (?P<name>[A-Za-z]\w*)
+""", re.VERBOSE)
+# A name followed by '=' (not '=='), or inside the brackets of a multiple assignment, is a variable
+_MATLAB_ASSIGNMENT = re.compile(r"[ \t]*=(?!=)")
+_MATLAB_MULTI_ASSIGNMENT = re.compile(r"\[([^\[\]\n]*)\][ \t]*=(?!=)")
+_MATLAB_FUNCTION_LINE = re.compile(r"^[ \t]*function\b[^\n]*", re.MULTILINE)
+_MATLAB_FUNCTION_DEF = re.compile(r"^\s*function\b[^=(\n]*?(?:=\s*)?([A-Za-z]\w*)\s*(?:\(|$)", re.MULTILINE)
+
+
+def _matlab_code(path: str):
+    """Returns the code of a .m file, or the text of a .mlx live script (a zip with XML)."""
+    if path.lower().endswith(".mlx"):
+        with zipfile.ZipFile(path) as archive:
+            xml = archive.read("matlab/document.xml").decode("utf-8", errors="replace")
+        xml = re.sub(r"</w:p>", "\n", xml)
+        text = re.sub(r"<[^>]+>", "", xml)
+        return text.replace("&lt;", "<").replace("&gt;", ">").replace("&quot;", '"').replace("&apos;", "'").replace("&amp;", "&")
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def extract_matlab_functions(text: str):
+    """
+    Returns the function names called or referenced in MATLAB code (outside comments and strings).
+
+    Names assigned anywhere in the code, or declared in a function signature, are variables
+    and are left out (e.g. `step = 0.1;` does not count as a call to step).
+    """
+    text = _MATLAB_BLOCK_COMMENT.sub("", text)
+    names, variables = set(), set()
+    for m in _MATLAB_TOKEN.finditer(text):
+        if m.lastgroup == "name":
+            names.add(m.group("name"))
+            if _MATLAB_ASSIGNMENT.match(text, m.end()):
+                variables.add(m.group("name"))
+    for m in _MATLAB_MULTI_ASSIGNMENT.finditer(text):
+        variables.update(re.findall(r"[A-Za-z]\w*", m.group(1)))
+    for m in _MATLAB_FUNCTION_LINE.finditer(text):
+        variables.update(re.findall(r"[A-Za-z]\w*", m.group(0)))
+    return names - variables
+
+
+def matlab_toolboxes(functions: set, local_functions: set = ()):
+    """Maps used function names to toolboxes, ignoring functions defined in the project."""
+    return {_MATLAB_FUNCTION_INDEX[f] for f in functions - set(local_functions) if f in _MATLAB_FUNCTION_INDEX}
+
+
+# ──────────────────────────────
+# Scanning and change detection
+# ──────────────────────────────
+
+_EXTENSIONS = {
+    "r": (".r", ".rmd", ".qmd", ".rmarkdown"),
+    "stata": (".do", ".ado"),
+    "matlab": (".m", ".mlx"),
+}
+
+
+def _code_files(folder: str, extensions: tuple):
+    files = []
+    for root, dirs, names in os.walk(folder):
+        dirs[:] = sorted(d for d in dirs if not d.startswith(".") and d != "renv")
+        files.extend(os.path.join(root, n) for n in sorted(names) if n.lower().endswith(extensions))
+    return files
+
+
+def scan_static_dependencies(language: str, folder: str):
+    """
+    Extracts the dependencies of R, Stata or MATLAB code without starting the language runtime.
+
+    Returns:
+        list | None: Sorted package (R, Stata) or toolbox (MATLAB) names; None for other languages.
+    """
+    language = language.lower()
+    extensions = _EXTENSIONS.get(language)
+    if extensions is None:
+        return None
+
+    found = set()
+    local_functions = set()
+    for path in _code_files(folder, extensions):
+        try:
+            if language == "matlab":
+                text = _matlab_code(path)
+                local_functions.add(os.path.splitext(os.path.basename(path))[0])
+                local_functions.update(_MATLAB_FUNCTION_DEF.findall(text))
+                found |= extract_matlab_functions(text)
+            else:
+                with open(path, "r", encoding="utf-8", errors="replace") as f:
+                    text = f.read()
+                if language == "r":
+                    found |= extract_r_packages(_r_code(path, text))
+                else:
+                    found |= extract_stata_packages(text)
+        except (OSError, zipfile.BadZipFile, KeyError) as e:
+            print(f"Skipping {path}: {e}")
+
+    if language == "matlab":
+        found = matlab_toolboxes(found, local_functions)
+    return sorted(found)
+
+
+def _state_file(state_file: str):
+    return pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path(state_file)
+
+
+def static_dependencies_changed(language: str, folder: str, state_file: str = "./bin/static_dependencies.json"):
+    """
+    Compares the statically extracted dependencies of `folder` with those recorded after the
+    last runtime-based update.
+
+    Returns:
+        tuple: (changed, dependencies) where `changed` is True if the set differs or was never recorded.
+    """
+    dependencies = scan_static_dependencies(language, folder)
+    try:
+        with open(_state_file(state_file), "r", encoding="utf-8") as f:
+            recorded = json.load(f).get(f"{language.lower()}:{os.path.abspath(folder)}")
+    except (OSError, ValueError):
+        recorded = None
+    return recorded != dependencies, dependencies
+
+
+def record_static_dependencies(language: str, folder: str, dependencies: list, state_file: str = "./bin/static_dependencies.json"):
+    """Records the dependency set that the last runtime-based update was made for."""
+    path = _state_file(state_file)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = {}
+    state[f"{language.lower()}:{os.path.abspath(folder)}"] = dependencies
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
@@ -8,10 +8,7 @@ import zipfile
 import glob
 
 from .general_tools import *
-
-package_installer(required_libraries =  ['requests'])
-
-import requests
+from .hash_tools import *
 
 # Version Control
 def setup_version_control(version_control,remote_storage,code_repo,repo_name):
@@ -46,8 +43,7 @@ def setup_git(version_control,code_repo):
                     subprocess.run(["git", "config", "--global", "init.defaultBranch", default_branch], check=True)
                     git_log_to_file(os.path.join(".gitlog"))
         if flag:
-            save_to_env(git_name,"GIT_USER") 
-            save_to_env(git_email,"GIT_EMAIL")    
+            save_dict_to_env({"GIT_USER": git_name, "GIT_EMAIL": git_email})
     
         return flag
     else:
@@ -358,32 +354,18 @@ def git_log_to_file(output_file_path):
     except subprocess.CalledProcessError as e:
         print(f"An error occurred: {e}")
 
-def get_git_hash(path):
+def get_git_hash(path, algorithm: str = "sha1"):
     """
     Get the Git hash of a file or folder.
-    For folders, the hashes of all files within the folder are combined.
+    For folders, this is the root digest of a sorted Merkle tree (see `MerkleTree`).
     If any exception occurs, it returns None.
+
+    Hashes are computed in-process (see `hash_tools`) and match 'git hash-object'
+    for files without git filters (e.g. LFS or eol conversion).
     """
     try:
-        if not is_installed('git'):
-            return None
-        # Check if path is a file or directory
-        if os.path.isfile(path):
-            # Get the Git hash of the file
-            result = subprocess.run(['git', 'hash-object', path], capture_output=True, text=True)
-            return result.stdout.strip()
-        elif os.path.isdir(path):
-            # For directory, get the hash of each file inside it
-            hashes = []
-            for root, dirs, files in os.walk(path):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    result = subprocess.run(['git', 'hash-object', file_path], capture_output=True, text=True)
-                    hashes.append(result.stdout.strip())
-            # Combine all file hashes into a single string and get its hash
-            combined_hashes = "".join(hashes)
-            result = subprocess.run(['git', 'hash-object', '-w', '--stdin'], input=combined_hashes, capture_output=True, text=True)
-            return result.stdout.strip()
+        if os.path.isfile(path) or os.path.isdir(path):
+            return hash_path(path, algorithm)
         else:
             raise ValueError(f"{path} does not exist or is not a valid file or directory.")
     except Exception as e:
@@ -772,6 +754,9 @@ def install_rclone(install_path):
     """Download and extract rclone to the specified bin folder."""
 
     def download_rclone(install_path="./bin"):
+        package_installer(required_libraries =  ['requests'])
+        import requests
+
         os_type = platform.system().lower()
         
         # Set the URL and executable name based on the OS
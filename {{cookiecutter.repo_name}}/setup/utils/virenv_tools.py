@@ -5,13 +5,12 @@ import platform
 import urllib.request
 import pathlib
 import json
+import argparse
+import hashlib
+import tempfile
 
 from .general_tools import *
 
-package_installer(required_libraries =  ['pyyaml'])
-
-import yaml
-
 # Virtual Environment
 def setup_virtual_environment(version_control, python_env_manager, r_env_manager, repo_name, conda_r_version, conda_python_version, install_path = "./bin/miniconda3"):
     """
@@ -160,21 +159,26 @@ def set_conda_packages(version_control,python_env_manager,r_env_manager,conda_py
 
     return install_packages
 
-def export_conda_env(env_path, output_file="environment.yml"):
+def export_conda_env(env_path, output_file="environment.yml", tag: bool = False):
     """
     Export the details of a conda environment to a YAML file.
     
     Parameters:
     - env_name: str, name of the conda environment to export.
     - output_file: str, name of the output YAML file. Defaults to 'environment.yml'.
+    - tag: bool, add the platform_rules selectors before writing.
+
+    Returns:
+    - bool: True if the file was written (its content changed).
     """
-    def update_conda_env_file(file_path: str):
+    def relative_conda_env(env_text: str):
+        package_installer(required_libraries =  ['pyyaml'])
+        import yaml
+
         # Get the current working directory
         current_dir = os.path.abspath(os.getcwd())
         
-        # Load the existing environment.yml file
-        with open(file_path, 'r') as f:
-            env_data = yaml.safe_load(f)
+        env_data = yaml.safe_load(env_text)
 
         # Check if 'prefix' and 'name' are defined
         if 'prefix' in env_data and 'name' in env_data:
@@ -190,23 +194,24 @@ def export_conda_env(env_path, output_file="environment.yml"):
             # Update the 'name' and 'prefix'
             env_data['name'] = new_name
             env_data['prefix'] = prefix_relative_path
+            return yaml.dump(env_data, default_flow_style=False)
 
-            # Save the updated file
-            with open(file_path, 'w') as f:
-                yaml.dump(env_data, f, default_flow_style=False)
-        else:
-            print(f"'{file_path}' does not contain both 'name' and 'prefix' fields.")
+        print(f"'{output_file}' does not contain both 'name' and 'prefix' fields.")
+        return env_text
 
     output_file= str(pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path(output_file))
 
     try:
         # Use subprocess to run the conda export command
-        with open(output_file, 'w') as f:
-            #subprocess.run(['conda', 'env', 'export', '-n', env_name], stdout=f, check=True)  
-            subprocess.run(['conda', 'env', 'export', '--prefix', env_path], stdout=f, check=True)      
+        #subprocess.run(['conda', 'env', 'export', '-n', env_name], stdout=f, check=True)  
+        result = subprocess.run(['conda', 'env', 'export', '--prefix', env_path], stdout=subprocess.PIPE, text=True, check=True)      
         
-        update_conda_env_file(output_file)
-        print(f"Conda environment '{env_path}' exported to {output_file}.")
+        env_text = relative_conda_env(result.stdout)
+        if tag:
+            env_text = _tag_env_text(env_text, get_project_config().platform_rules)
+        changed = write_if_changed(output_file, env_text)
+        print(f"Conda environment '{env_path}' exported to {output_file}." if changed else f"{output_file} is unchanged.")
+        return changed
 
     except subprocess.CalledProcessError as e:
         print(f"Failed to export conda environment: {e}")
@@ -214,6 +219,7 @@ def export_conda_env(env_path, output_file="environment.yml"):
         print("Conda is not installed or not found in the system path.")
     except Exception as e:
         print(f"An error occurred: {e}")
+    return False
 
 def init_conda():
     """
@@ -352,6 +358,9 @@ def update_env_yaml(env_file:str, repo_name:str, conda_packages:list=[], pip_pac
     Returns:
     None
     """
+    package_installer(required_libraries =  ['pyyaml'])
+    import yaml
+
     # Load the existing environment.yml file
     with open(env_file, 'r') as file:
         env_data = yaml.safe_load(file)
@@ -425,8 +434,139 @@ def create_venv_env():
 
     save_to_env(env_path,"VENV_ENV_PATH")
 
+    # Populate the environment offline if a wheelhouse has been built with 'env cache'
+    requirements_file = pathlib.Path(__file__).resolve().parent.parent.parent / "requirements.txt"
+    if wheelhouse_dir() and requirements_file.exists():
+        install_from_wheelhouse(venv_python(env_path), [str(requirements_file)])
+
     return env_path
 
+def venv_python(env_path: str):
+    """Returns the Python executable of a virtual environment."""
+    if platform.system().lower() == "windows":
+        return os.path.join(env_path, "Scripts", "python.exe")
+    return os.path.join(env_path, "bin", "python")
+
+# Wheelhouse Functions:
+def read_wheelhouse_requirements(requirement_files: list):
+    """
+    Collects the pinned requirements of requirements.txt and dependencies.txt style files.
+
+    Editable installs and local paths (such as the setup package itself) are skipped since
+    they are not fetched from an index.
+    """
+    from .install_dependencies import parse_dependencies
+
+    requirements = []
+    for requirement_file in requirement_files:
+        if not os.path.exists(requirement_file):
+            continue
+        if "dependencies" in os.path.basename(requirement_file):
+            lines = parse_dependencies(requirement_file)
+        else:
+            with open(requirement_file, "r", encoding="utf-8") as f:
+                lines = [line.split(" #", 1)[0].strip() for line in f]
+        for line in lines:
+            if not line or line.startswith(("#", "-e", "--")) or " @ file:" in line:
+                continue
+            if line not in requirements:
+                requirements.append(line)
+    return requirements
+
+def build_wheelhouse(requirement_files: list = None, wheel_dir: str = "./bin/wheels", find_links: str = None, force: bool = False):
+    """
+    Builds a local wheelhouse from requirements.txt/dependencies.txt with 'pip wheel'.
+
+    A manifest with a digest of the requirement set is stored in the wheelhouse, so the
+    build is skipped when the requirements have not changed since the last run.
+
+    Args:
+        requirement_files (list): Requirement files, defaults to requirements.txt and dependencies.txt.
+        wheel_dir (str): Output folder relative to the project root.
+        find_links (str): Optional local folder of wheels to build from without an index (offline).
+        force (bool): Rebuild even if the manifest matches.
+
+    Returns:
+        str | None: The wheelhouse folder, or None if the build failed.
+    """
+    root = pathlib.Path(__file__).resolve().parent.parent.parent
+    if not requirement_files:
+        requirement_files = ["requirements.txt", "dependencies.txt", "setup/dependencies.txt"]
+    requirement_files = [str(root / f) for f in requirement_files]
+
+    requirements = read_wheelhouse_requirements(requirement_files)
+    if not requirements:
+        print("ℹ️ No requirements found. Nothing to cache.")
+        return None
+
+    wheel_dir = root / pathlib.Path(wheel_dir)
+    wheel_dir.mkdir(parents=True, exist_ok=True)
+    manifest_file = wheel_dir / "wheelhouse.json"
+
+    digest = hashlib.sha256("\n".join(sorted(requirements)).encode("utf-8")).hexdigest()
+    if not force and manifest_file.exists():
+        try:
+            with open(manifest_file, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("digest") == digest and manifest.get("python") == platform.python_version():
+                print(f"✅ Wheelhouse is up to date: {wheel_dir}")
+                return str(wheel_dir)
+        except (OSError, ValueError):
+            pass
+
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False, encoding="utf-8") as tmp:
+        tmp.write("\n".join(requirements) + "\n")
+        tmp_requirements = tmp.name
+
+    command = [sys.executable, "-m", "pip", "wheel", "-r", tmp_requirements, "-w", str(wheel_dir)]
+    if find_links:
+        command += ["--no-index", "--find-links", os.path.abspath(find_links)]
+
+    print(f"Building wheelhouse for {len(requirements)} requirements in {wheel_dir}")
+    try:
+        subprocess.run(command, check=True)
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Failed to build the wheelhouse: {e}")
+        return None
+    finally:
+        os.remove(tmp_requirements)
+
+    with open(manifest_file, "w", encoding="utf-8") as f:
+        json.dump({"digest": digest, "python": platform.python_version(), "requirements": requirements}, f, indent=2)
+
+    print(f"✅ Wheelhouse ready: {wheel_dir}")
+    return str(wheel_dir)
+
+def install_from_wheelhouse(python_exe: str, requirement_files: list, wheel_dir: str = None):
+    """
+    Installs requirement files into an environment from the local wheelhouse only (no index).
+
+    Returns:
+        bool: True if the offline install succeeded.
+    """
+    wheel_dir = wheel_dir or wheelhouse_dir()
+    if not wheel_dir:
+        return False
+
+    requirements = read_wheelhouse_requirements(requirement_files)
+    if not requirements:
+        return False
+
+    offline_args = ["--no-index", "--find-links", wheel_dir]
+    commands = [
+        [sys.executable, "-m", "uv", "pip", "install", "--python", python_exe] + offline_args + requirements,
+        [python_exe, "-m", "pip", "install"] + offline_args + requirements,
+    ]
+    for command in commands:
+        try:
+            subprocess.run(command, check=True, stderr=subprocess.DEVNULL)
+            print(f"✅ Installed {len(requirements)} requirements from the wheelhouse {wheel_dir}")
+            return True
+        except (OSError, subprocess.CalledProcessError):
+            continue
+
+    print("⚠️ The wheelhouse does not cover all requirements. Packages will be installed from the index.")
+    return False
 
 def create_venv_env_old():
     """Create a Python virtual environment using venv and install packages."""
@@ -450,8 +590,14 @@ def create_venv_env_old():
         print(f"Error: An unexpected error occurred: {e}")
         return None
 
-def create_requirements_txt(requirements_file:str="requirements.txt"):
+def create_requirements_txt(requirements_file:str="requirements.txt", tag: bool = False):
+    """
+    Writes the `pip freeze` of the environment to requirements.txt, optionally with platform
+    tags, and only if its content changed.
 
+    Returns:
+        bool: True if the file was written.
+    """
     requirements_file = str(pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path(requirements_file))
 
     # Use subprocess to run pip freeze and capture the output
@@ -459,14 +605,19 @@ def create_requirements_txt(requirements_file:str="requirements.txt"):
     
     # Check if the pip freeze command was successful
     if result.returncode == 0:
+        content = result.stdout
+        if tag:
+            content = _tag_requirements_text(content, get_project_config().platform_rules)
         # Write the output of pip freeze to a requirements.txt file
-        with open(requirements_file, "w") as f:
-            f.write(result.stdout)
-        print("requirements.txt has been created successfully.")
+        if write_if_changed(requirements_file, content):
+            print("requirements.txt has been created successfully.")
+            return True
+        print("requirements.txt is unchanged.")
     else:
         print("Error running pip freeze:", result.stderr)
+    return False
 
-def create_conda_environment_yml(r_version=None,requirements_file:str="requirements.txt", output_file:str="environment.yml"):
+def create_conda_environment_yml(r_version=None,requirements_file:str="requirements.txt", output_file:str="environment.yml", tag: bool = False):
     """
     Creates a Conda environment.yml based on a pip requirements.txt file, 
     the current Python version, and optionally an R version.
@@ -475,6 +626,10 @@ def create_conda_environment_yml(r_version=None,requirements_file:str="requireme
     - requirements_file (str): Path to the pip requirements.txt file.
     - output_file (str): Path to output the generated environment.yml file (default 'environment.yml').
     - r_version (str, optional): R version string like "R version 4.4.3" (default None).
+    - tag (bool): Add the platform_rules selectors before writing.
+
+    Returns:
+    - bool: True if the file was written (its content changed).
     """
     requirements_file = str(pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path(requirements_file))
     output_file = str(pathlib.Path(__file__).resolve().parent.parent.parent / pathlib.Path(output_file))
@@ -487,9 +642,9 @@ def create_conda_environment_yml(r_version=None,requirements_file:str="requireme
     version_output = subprocess.check_output([sys.executable, '--version']).decode().strip()
     python_version = version_output.split()[1]  # Get '3.10.12'
 
-    # Read the requirements.txt
+    # Read the requirements.txt (environment markers become conda selectors when tagging)
     with open(requirements_file, "r", encoding="utf-8") as f:
-        pip_dependencies = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+        pip_dependencies = [line.split(";")[0].strip() for line in f if line.strip() and not line.startswith("#")]
 
     # Build the basic dependencies list
     conda_dependencies = [f'python={python_version}']
@@ -513,26 +668,22 @@ def create_conda_environment_yml(r_version=None,requirements_file:str="requireme
     }
 
     # Write the environment.yml
+    package_installer(required_libraries =  ['pyyaml'])
     import yaml
-    with open(output_file, "w", encoding="utf-8") as f:
-        yaml.dump(conda_env, f, default_flow_style=False, sort_keys=False)
-
-    print(f"✅ Conda environment file created: {output_file}")
-
-def tag_env_file(env_file: str = "environment.yml"):
-    # Paths
-    root = pathlib.Path(__file__).resolve().parent.parent.parent
-    env_path = root / env_file
-
-    if not env_path.exists():
-        print(f"❌ {env_file} not found.")
-        return
+    content = yaml.dump(conda_env, default_flow_style=False, sort_keys=False)
+    if tag:
+        content = _tag_env_text(content, get_project_config().platform_rules)
 
-    raw_rules = toml_json(folder = root,json_filename =  "platform_rules.json",tool_name = "platform_rules", toml_path = "project.toml")
+    if write_if_changed(output_file, content):
+        print(f"✅ Conda environment file created: {output_file}")
+        return True
+    print(f"{output_file} is unchanged.")
+    return False
 
+def _tag_env_text(env_text: str, raw_rules: dict):
+    """Adds Conda-style platform selectors ('# [win]') to the packages listed in platform_rules."""
     if not raw_rules:
-        print("ℹ️ No platform rules found. Skipping tagging.")
-        return
+        return env_text
 
     sys_to_conda = {
         "win32": "win",
@@ -547,14 +698,10 @@ def tag_env_file(env_file: str = "environment.yml"):
         if conda_selector:
             platform_rules[pkg.lower()] = conda_selector
 
-    # Read environment.yml
-    with open(env_path, "r", encoding="utf-8") as f:
-        lines = f.readlines()
-
     in_pip_section = False
     updated_lines = []
 
-    for line in lines:
+    for line in env_text.splitlines(keepends=True):
         stripped = line.strip()
 
         # Detect pip block
@@ -567,7 +714,8 @@ def tag_env_file(env_file: str = "environment.yml"):
         if in_pip_section and not line.startswith("  ") and line.strip():
             in_pip_section = False
 
-        if stripped.startswith("- "):
+        # Lines that already carry a selector are left as they are
+        if stripped.startswith("- ") and "# [" not in stripped:
             pkg = stripped[2:].split("==")[0].split(">=")[0].strip().lower()
             platform = platform_rules.get(pkg)
             if platform:
@@ -577,45 +725,103 @@ def tag_env_file(env_file: str = "environment.yml"):
         else:
             updated_lines.append(line)
 
+    return "".join(updated_lines)
+
+def tag_env_file(env_file: str = "environment.yml"):
+    """
+    Returns:
+        bool: True if the file was rewritten with new tags.
+    """
+    # Paths
+    root = pathlib.Path(__file__).resolve().parent.parent.parent
+    env_path = root / env_file
+
+    if not env_path.exists():
+        print(f"❌ {env_file} not found.")
+        return False
+
+    raw_rules = get_project_config(root).platform_rules
+
+    if not raw_rules:
+        print("ℹ️ No platform rules found. Skipping tagging.")
+        return False
+
+    # Read environment.yml
+    with open(env_path, "r", encoding="utf-8") as f:
+        env_text = f.read()
+
     # Write back
-    with open(env_path, "w", encoding="utf-8") as f:
-        f.writelines(updated_lines)
+    if write_if_changed(str(env_path), _tag_env_text(env_text, raw_rules)):
+        print(f"✅ Updated {env_file} with Conda-style platform tags")
+        return True
+    return False
+
+def _tag_requirements_text(requirements_text: str, platform_rules: dict):
+    """Adds 'sys_platform' markers to the requirements listed in platform_rules."""
+    if not platform_rules:
+        return requirements_text
+
+    filtered_lines = []
+    for line in requirements_text.strip().splitlines():
+        clean_line = line.strip()
+        # Comments and requirements that already carry a marker are left as they are
+        if not clean_line or clean_line.startswith("#") or ";" in clean_line:
+            filtered_lines.append(line)
+            continue
+
+        pkg = clean_line.split("==")[0].split(">=")[0].split("<=")[0].strip().lower()
+        if pkg in platform_rules:
+            platform = platform_rules[pkg]
+            filtered_lines.append(f"{clean_line} ; sys_platform == \"{platform}\"")
+        else:
+            filtered_lines.append(clean_line)
 
-    print(f"✅ Updated {env_file} with Conda-style platform tags")
+    return "\n".join(filtered_lines) + "\n"
 
 def tag_requirements_txt(requirements_file: str = "requirements.txt"):
+    """
+    Returns:
+        bool: True if the file was rewritten with new tags.
+    """
     # Resolve paths
     root = pathlib.Path(__file__).resolve().parent.parent.parent
     requirements_path = root / requirements_file
     
-    platform_rules = toml_json(folder = root,json_filename =  "platform_rules.json",tool_name = "platform_rules", toml_path = "project.toml")
+    platform_rules = get_project_config(root).platform_rules
 
     if not platform_rules:
         print("ℹ️ No platform rules found. Skipping tagging.")
-        return
+        return False
 
     if not requirements_path.exists():
         raise FileNotFoundError(f"❌ Requirements file not found: {requirements_path}")
 
     # Read the requirements.txt
     with open(requirements_path, "r", encoding="utf-8") as f:
-        lines = f.read().strip().splitlines()
+        requirements_text = f.read()
 
-    filtered_lines = []
-    for line in lines:
-        clean_line = line.strip()
-        if not clean_line or clean_line.startswith("#"):
-            filtered_lines.append(line)
-            continue
+    if write_if_changed(str(requirements_path), _tag_requirements_text(requirements_text, platform_rules)):
+        print(f"✅ requirements.txt updated with platform tags: {requirements_path}")
+        return True
+    return False
 
-        pkg = clean_line.split("==")[0].split(">=")[0].split("<=")[0].strip().lower()
-        if pkg in platform_rules:
-            platform = platform_rules[pkg]
-            filtered_lines.append(f"{clean_line} ; sys_platform == \"{platform}\"")
-        else:
-            filtered_lines.append(clean_line)
+@ensure_correct_kernel
+def main():
+    parser = argparse.ArgumentParser(description="Manage the project environment.")
+    subparsers = parser.add_subparsers(dest="command")
+
+    cache = subparsers.add_parser("cache", help="Build a local wheelhouse under ./bin/wheels for offline environment rebuilds")
+    cache.add_argument("requirement_files", nargs="*", help="Requirement files (default: requirements.txt and dependencies.txt)")
+    cache.add_argument("--find-links", default=None, help="Build offline from a local folder of wheels")
+    cache.add_argument("--force", action="store_true", help="Rebuild even if the requirements have not changed")
 
-    with open(requirements_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(filtered_lines) + "\n")
+    args = parser.parse_args()
+
+    if args.command == "cache":
+        build_wheelhouse(args.requirement_files or None, find_links=args.find_links, force=args.force)
+    else:
+        parser.print_help()
 
-    print(f"✅ requirements.txt updated with platform tags: {requirements_path}")
\ No newline at end of file
+if __name__ == "__main__":
+    os.chdir(pathlib.Path(__file__).resolve().parent.parent.parent)
+    main()
@@ -0,0 +1,229 @@
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+
+# inotify event masks (see <sys/inotify.h>)
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (_IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO
+               | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF)
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Returned by `wait` when events were lost and the caller should rescan everything
+RESCAN = None
+
+
+def _skip_name(name: str):
+    return name.startswith(".")
+
+
+class PollingWatcher:
+    """
+    Detects created, changed and deleted files by comparing (size, mtime_ns) snapshots of a tree.
+
+    Used where inotify is not available (macOS, Windows, network mounts, exhausted watch limits).
+    """
+
+    def __init__(self, root: str, interval: float = 2.0):
+        self.root = root
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        stack = [self.root]
+        while stack:
+            folder = stack.pop()
+            try:
+                with os.scandir(folder) as it:
+                    for entry in it:
+                        if _skip_name(entry.name):
+                            continue
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            else:
+                                stat = entry.stat(follow_symlinks=False)
+                                snapshot[entry.path] = (stat.st_size, stat.st_mtime_ns)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return snapshot
+
+    def wait(self, timeout: float = None):
+        """
+        Waits up to `timeout` seconds (None: until something changes) for changes.
+
+        Returns:
+            set: Changed paths (possibly empty on timeout).
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return set()
+            time.sleep(self.interval if remaining is None else min(self.interval, remaining))
+
+            snapshot = self._scan()
+            previous = self._snapshot
+            self._snapshot = snapshot
+            changed = {p for p in snapshot.keys() | previous.keys() if snapshot.get(p) != previous.get(p)}
+            if changed:
+                return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """
+    Recursive inotify watcher (Linux) built on libc through ctypes.
+
+    Every folder under `root` gets a watch; folders created later are added as they appear.
+    """
+
+    def __init__(self, root: str):
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or not libc_name:
+            raise OSError("inotify is only available on Linux.")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify is not available in this libc.")
+
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.root = root
+        self._paths = {}
+        self._add_tree(root)
+
+    def _add_watch(self, folder: str):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(folder), _WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                raise OSError(err, "inotify watch limit reached (fs.inotify.max_user_watches)")
+            return  # The folder disappeared in the meantime
+        self._paths[wd] = folder
+
+    def _add_tree(self, folder: str):
+        """Watches `folder` and its subfolders and returns the files found in them."""
+        files = set()
+        for root, dirs, names in os.walk(folder):
+            dirs[:] = [d for d in dirs if not _skip_name(d)]
+            self._add_watch(root)
+            files.update(os.path.join(root, n) for n in names if not _skip_name(n))
+        return files
+
+    def _read(self):
+        changed = set()
+        while True:
+            try:
+                buffer = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+
+            offset = 0
+            while offset < len(buffer):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+                name = buffer[offset + _EVENT_HEADER.size: offset + _EVENT_HEADER.size + length].rstrip(b"\0")
+                offset += _EVENT_HEADER.size + length
+
+                if mask & _IN_Q_OVERFLOW:
+                    return RESCAN
+                if mask & _IN_IGNORED:
+                    self._paths.pop(wd, None)
+                    continue
+
+                folder = self._paths.get(wd)
+                if folder is None:
+                    continue
+                if not name:
+                    # The watched folder itself was deleted or moved
+                    changed.add(folder)
+                    continue
+
+                name = os.fsdecode(name)
+                if _skip_name(name):
+                    continue
+                path = os.path.join(folder, name)
+                changed.add(path)
+                if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+                    # Files may already exist in a folder before its watch is in place
+                    changed.update(self._add_tree(path))
+
+    def wait(self, timeout: float = None):
+        """
+        Waits up to `timeout` seconds (None: until something changes) for changes.
+
+        Returns:
+            set | None: Changed paths (possibly empty on timeout), or `RESCAN` if the kernel queue overflowed.
+        """
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        return self._read()
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_watcher(root: str, poll_interval: float = 2.0, polling: bool = False):
+    """Returns an `InotifyWatcher` for `root`, or a `PollingWatcher` where inotify cannot be used."""
+    if not polling:
+        try:
+            return InotifyWatcher(root)
+        except OSError as e:
+            print(f"⚠️ inotify unavailable ({e}); polling every {poll_interval}s instead.")
+    return PollingWatcher(root, interval=poll_interval)
+
+
+def watch_changes(root: str, on_change, debounce: float = 2.0, poll_interval: float = 2.0, polling: bool = False):
+    """
+    Calls `on_change(paths)` with the set of changed paths under `root` once no new change
+    has arrived for `debounce` seconds. `paths` is `RESCAN` (None) if events were lost.
+    If `on_change` returns True (the batch failed), it is called again with `RESCAN` after
+    the next quiet `debounce` window.
+
+    Runs until interrupted with Ctrl+C.
+    """
+    watcher = create_watcher(root, poll_interval=poll_interval, polling=polling)
+    print(f"👀 Watching {root} for changes (Ctrl+C to stop).")
+    retry = False
+    try:
+        while True:
+            pending = watcher.wait(debounce if retry else None)
+            # Keep collecting until the tree has been quiet for the debounce window
+            while pending is not RESCAN:
+                more = watcher.wait(debounce)
+                if more is RESCAN or not more:
+                    pending = more if more is RESCAN else pending
+                    break
+                pending |= more
+            retry = bool(on_change(RESCAN if retry else pending))
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+    finally:
+        watcher.close()